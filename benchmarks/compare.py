@@ -0,0 +1,54 @@
+"""Compara dos reportes de benchmarks.run:
+
+    python -m benchmarks.compare base.json nuevo.json [--threshold 0.10]
+
+Sale con código 1 si algún caso empeoró más que `threshold` (útil en CI o antes de un merge)."""
+import sys
+import json
+import argparse
+
+
+def compare(base, new, threshold):
+    rows, regressions = [], []
+    for name, cur in new['results'].items():
+        old = base['results'].get(name)
+        if old is None or not old['value']:
+            rows.append((name, None, cur['value'], None, cur['unit'], ''))
+            continue
+        change = (cur['value'] - old['value']) / old['value']
+        # Cambio positivo = mejora, sin importar si la métrica es "más alto" o "más bajo es mejor"
+        gain = change if cur.get('better', 'higher') == 'higher' else -change
+        mark = '✅' if gain > threshold else ('❌' if gain < -threshold else '')
+        if gain < -threshold:
+            regressions.append(name)
+        rows.append((name, old['value'], cur['value'], gain, cur['unit'], mark))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos corridas de benchmarks")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Cambio relativo considerado significativo")
+    args = parser.parse_args()
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"base: {base['meta'].get('commit')} ({base['meta'].get('timestamp')})  ->  nuevo: {new['meta'].get('commit')} ({new['meta'].get('timestamp')})")
+    rows, regressions = compare(base, new, args.threshold)
+    for name, old, cur, gain, unit, mark in rows:
+        if old is None:
+            print(f"  {name:<45} {'(nuevo)':>14} {cur:>14,.2f} {unit}")
+        else:
+            print(f"  {name:<45} {old:>14,.2f} {cur:>14,.2f} {unit:<10} {gain:+7.1%} {mark}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} caso(s) empeoraron más de {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""WebDriver falso que sirve las páginas de benchmarks/pages.py sin Docker ni red.
+
+Implementa lo que usa GenericScraper: get, page_source, current_url, execute_script,
+find_element(s) y lo necesario para el botón "siguiente" (el elemento viejo queda stale al cambiar de página)."""
+from urllib.parse import urlparse, parse_qs
+
+from selenium.common.exceptions import StaleElementReferenceException, NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from .pages import build_page, no_results_page
+
+
+class FakeElement:
+    def __init__(self, driver):
+        self.driver = driver
+        self.generation = driver.generation
+
+    def _check(self):
+        if self.generation != self.driver.generation:
+            raise StaleElementReferenceException("La página cambió")
+
+    def is_enabled(self):
+        self._check()
+        return True
+
+    def is_displayed(self):
+        self._check()
+        return True
+
+    def click(self):
+        self._check()
+        self.driver.next_page()
+
+
+class FakeDriver:
+    def __init__(self, platform, platform_cfg, pages=5, cards=25, keyword='devops'):
+        self.platform = platform
+        self.p_cfg = platform_cfg
+        self.pages = pages
+        self.cards = cards
+        self.keyword = keyword
+        self.page_num = 1
+        self.generation = 0
+        self.url = "about:blank"
+        self._cache = {}
+        # Contadores para el reporte del benchmark
+        self.gets = 0
+        self.bytes_served = 0
+
+    # --- Navegación ---
+    def get(self, url):
+        self.gets += 1
+        self.url = url
+        self.page_num = self._page_from_url(url)
+        self.generation += 1
+
+    def _page_from_url(self, url):
+        pag_cfg = self.p_cfg.get('pagination', {})
+        values = parse_qs(urlparse(url).query).get(pag_cfg.get('param', ''), [])
+        if not values:
+            return 1
+        return (int(values[-1]) - pag_cfg.get('start', 0)) // pag_cfg.get('increment', 1) + 1
+
+    def next_page(self):
+        self.page_num += 1
+        self.generation += 1
+
+    @property
+    def current_url(self):
+        return self.url
+
+    @property
+    def page_source(self):
+        html = self._cache.get(self.page_num)
+        if html is None:
+            if self.page_num > self.pages:
+                html = no_results_page(self.p_cfg)
+            else:
+                html = build_page(self.platform, self.page_num, self.cards, self.keyword, last=self.page_num == self.pages)
+            self._cache[self.page_num] = html
+        self.bytes_served += len(html)
+        return html
+
+    # --- Scripts y elementos ---
+    def execute_script(self, script, *args):
+        if 'click()' in script:
+            self.next_page()
+        elif 'scrollHeight' in script:
+            return 0
+        return None
+
+    def execute_async_script(self, script, *args):
+        raise NotImplementedError("El FakeDriver solo soporta extraction: html")
+
+    def find_elements(self, by=By.ID, value=None):
+        if by == By.XPATH:
+            return []   # Sin banner de cookies
+        if self.page_num > self.pages:
+            return []
+        return [FakeElement(self)]
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+    # --- Lo que se llama al iniciar/cerrar sesión ---
+    def set_script_timeout(self, seconds): pass
+    def add_cookie(self, cookie): pass
+    def execute_cdp_cmd(self, cmd, params): return {}
+    def quit(self): pass
@@ -0,0 +1,68 @@
+"""Páginas de prueba con la forma de OCC / Indeed / LinkedIn (ver benchmarks/fixtures/*.html).
+
+Cada fixture es una página guardada donde el bloque entre <!--CARD--> y <!--/CARD--> se repite
+`cards` veces con IDs y títulos distintos. Los selectores coinciden con los de config.yaml."""
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+PLATFORMS = ('occ', 'indeed', 'linkedin')
+
+# Mezcla realista: títulos que pasan el filtro, prohibidos y sin palabras requeridas
+TITLES = [
+    "DevOps Engineer", "Site Reliability Engineer (SRE)", "AWS Cloud Engineer", "Ingeniero de Plataforma Kubernetes",
+    "Terraform / Ansible Automation Specialist", "Azure Infrastructure Administrator", "GCP Cloud Architect",
+    "Senior Java Backend Developer", "Data Engineer (Python)", "QA Automation Tester", "Frontend Developer React",
+    "SAP Basis Consultant", "Gerente de Ventas", "Analista Contable", "Soporte Técnico Nivel 1", "Full Stack Developer",
+]
+COMPANIES = ["ACME SA de CV", "Globex Corporation", "Initech", "Umbrella Systems", "Hooli México", "Stark Industries"]
+
+_templates = {}
+
+
+def load_template(platform):
+    """(antes, tarjeta, después) de la página guardada."""
+    if platform not in _templates:
+        with open(os.path.join(FIXTURE_DIR, f"{platform}.html"), 'r', encoding='utf-8') as f:
+            html = f.read()
+        head, rest = html.split('<!--CARD-->', 1)
+        card, tail = rest.split('<!--/CARD-->', 1)
+        _templates[platform] = (head, card, tail)
+    return _templates[platform]
+
+
+def job_id_for(page_num, i):
+    return f"{page_num:04d}{i:03d}"
+
+
+def build_page(platform, page_num=1, cards=25, keyword='devops', last=False, seed=None):
+    head, card, tail = load_template(platform)
+    rng = random.Random(seed if seed is not None else page_num)
+    parts = [head]
+    for i in range(cards):
+        parts.append(
+            card.replace('{job_id}', job_id_for(page_num, i))
+                .replace('{title}', rng.choice(TITLES))
+                .replace('{company}', rng.choice(COMPANIES))
+        )
+    parts.append(tail)
+    html = "".join(parts)
+
+    # Marcadores de fin de paginación de cada plataforma
+    next_link = '' if last else '<li><a data-testid="pagination-page-next" href="#">Siguiente</a></li>'
+    next_button = ('<button class="jobs-search-pagination__button--next" disabled>Next</button>' if last
+                   else '<button class="jobs-search-pagination__button--next">Next</button>')
+    return (html.replace('{keyword}', keyword).replace('{page}', str(page_num))
+                .replace('{next_class}', 'pointer-events-none' if last else '')
+                .replace('{next_link}', next_link).replace('{next_button}', next_button))
+
+
+def no_results_page(platform_cfg):
+    text = platform_cfg.get('selenium_rules', {}).get('no_results_text', 'No results')
+    return f"<html><body><main><p>{text}</p></main></body></html>"
+
+
+def random_titles(count, seed=0):
+    rng = random.Random(seed)
+    suffixes = ["", " Sr", " Jr", " - Remoto", " (Home Office)", " II", " Lead"]
+    return [rng.choice(TITLES) + rng.choice(suffixes) for _ in range(count)]
@@ -0,0 +1,316 @@
+"""Benchmarks offline de las rutas calientes (sin Docker ni red).
+
+    python -m benchmarks.run                          # todo, CSV a 10k/100k/1M filas
+    python -m benchmarks.run --quick                  # versión corta (CSV solo 10k)
+    python -m benchmarks.run --only parse,filter -o base.json
+    python -m benchmarks.compare base.json nuevo.json
+
+Cada resultado es {valor, unidad, mejor: higher|lower}; el JSON se compara entre corridas con benchmarks.compare.
+"""
+import os
+import gc
+import sys
+import copy
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+from core.config_loader import load_config
+from core.filter import filter_job_by_title, get_title_filter
+from scrapers.generic import GenericScraper
+from storage.csv_handler import CSVHandler
+from storage.near_dup_index import NearDupIndex
+
+from .pages import PLATFORMS, build_page, random_titles, job_id_for
+from .fake_driver import FakeDriver
+
+CARDS_PER_PAGE = 25
+
+
+def _best_of(fn, repeat):
+    """Menor tiempo de `repeat` ejecuciones (lo menos contaminado por ruido del sistema)."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _rate(count, seconds, unit):
+    return {'value': round(count / seconds, 2), 'unit': unit, 'better': 'higher'}
+
+
+def _seconds(seconds):
+    return {'value': round(seconds, 6), 'unit': 's', 'better': 'lower'}
+
+
+def bench_config(config, pages):
+    """Copia del config para correr contra el FakeDriver: HTML completo, sin pausas ni scroll."""
+    cfg = copy.deepcopy(config)
+    cfg['general']['debug_mode'] = False
+    for name in PLATFORMS:
+        p_cfg = cfg['platforms'][name]
+        p_cfg['fetch_mode'] = 'selenium'
+        p_cfg['max_pages'] = pages + 1
+        p_cfg['rate_limit'] = {'pages_per_minute': 1e9, 'burst': 1e9, 'jitter': 0}
+        rules = p_cfg.setdefault('selenium_rules', {})
+        rules['extraction'] = 'html'
+        rules['poll_interval'] = 0
+        rules.pop('scroll_pane_selector', None)
+        rules.pop('browser_zoom', None)
+    return cfg
+
+
+# --- Casos ---
+
+def bench_parse(config, repeat):
+    results = {}
+    for name in PLATFORMS:
+        scraper = GenericScraper(config, name)
+        html = build_page(name, 1, CARDS_PER_PAGE)
+        root = scraper.plan.parse_document(html)
+        cards = scraper.plan.card_xpath(root)
+        loops = 40
+
+        def parse_cards():
+            for _ in range(loops):
+                for card in cards:
+                    scraper.parse_job_card(card)
+
+        def extract_pages():
+            for _ in range(loops):
+                scraper.plan.extract_page(html)
+
+        results[f"parse_job_card.{name}"] = _rate(loops * len(cards), _best_of(parse_cards, repeat), 'cards/s')
+        results[f"extract_page.{name}"] = _rate(loops, _best_of(extract_pages, repeat), 'pages/s')
+    return results
+
+
+def bench_filter(config, repeat):
+    filters = config['search_filters']
+    titles = random_titles(20000)
+    title_filter = get_title_filter(filters)
+
+    def one_by_one():
+        for title in titles:
+            filter_job_by_title(title, filters)
+
+    def evaluate():
+        for title in titles:
+            title_filter.evaluate(title)
+
+    return {
+        'filter_job_by_title': _rate(len(titles), _best_of(one_by_one, repeat), 'titles/s'),
+        'filter.evaluate': _rate(len(titles), _best_of(evaluate, repeat), 'titles/s'),
+        'filter.evaluate_many': _rate(len(titles), _best_of(lambda: title_filter.evaluate_many(titles), repeat), 'titles/s'),
+    }
+
+
+def bench_scrape_keyword(cfg, repeat, pages=10):
+    results = {}
+    for name in PLATFORMS:
+        served = {}
+
+        def run():
+            driver = FakeDriver(name, cfg['platforms'][name], pages=pages, cards=CARDS_PER_PAGE)
+            scraper = GenericScraper(cfg, name, driver=driver)
+            scraper.scrape_keyword('devops', set())
+            served['pages'] = driver.page_num if driver.page_num <= pages else pages
+            served['bytes'] = driver.bytes_served
+
+        seconds = _best_of(run, repeat)
+        results[f"scrape_keyword.{name}"] = _rate(served['pages'], seconds, 'pages/s')
+        results[f"scrape_keyword.{name}.page_source_mb"] = {
+            'value': round(served['bytes'] / 1e6, 3), 'unit': 'MB', 'better': 'lower'
+        }
+    return results
+
+
+def _write_csv(path, columns, rows):
+    """CSV sintético con el formato del proyecto (se genera por bloques para no llenar la memoria)."""
+    chunk = 100_000
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(",".join(columns) + "\n")
+        for start in range(0, rows, chunk):
+            lines = []
+            for n in range(start, min(start + chunk, rows)):
+                values = {
+                    'job_id': f"hist{n}", 'platform': 'Occ', 'title': f"DevOps Engineer {n}",
+                    'company': 'ACME', 'salary': 'No especificado',
+                    'link': f"https://www.occ.com.mx/empleo/oferta/hist{n}", 'timestamp_found': '2026-01-01 00:00:00',
+                }
+                lines.append(",".join(values.get(c, '') for c in columns))
+            f.write("\n".join(lines) + "\n")
+
+
+def _new_jobs(count, columns, tag):
+    return [
+        {'job_id': f"{tag}-{job_id_for(i // 1000, i % 1000)}", 'platform': 'Indeed', 'title': 'SRE',
+         'company': 'Initech', 'salary': '$40,000', 'link': '', 'timestamp_found': '2026-10-18 00:00:00'}
+        for i in range(count)
+    ]
+
+
+def bench_csv(config, repeat, sizes):
+    columns = config['general']['final_columns_to_save']
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="jobs_bench_")
+    try:
+        for rows in sizes:
+            label = f"{rows // 1000}k" if rows < 1_000_000 else f"{rows // 1_000_000}M"
+            path = os.path.join(workdir, f"hist_{label}.csv")
+            _write_csv(path, columns, rows)
+
+            # Arranque en frío: el índice no existe y se construye desde el CSV
+            def cold():
+                for ext in ('.idx', '.idx.delta', '.bloom'):
+                    if os.path.exists(path + ext):
+                        os.remove(path + ext)
+                CSVHandler(path, columns).get_existing_ids()
+            results[f"csv.get_existing_ids.cold.{label}"] = _seconds(_best_of(cold, 1))
+
+            # Arranque normal: el índice ya existe
+            results[f"csv.get_existing_ids.warm.{label}"] = _seconds(
+                _best_of(lambda: CSVHandler(path, columns).get_existing_ids(), repeat)
+            )
+
+            ids = CSVHandler(path, columns).get_existing_ids()
+            probes = [f"hist{n}" for n in range(0, rows, max(rows // 50_000, 1))] + [f"nope{n}" for n in range(50_000)]
+            results[f"csv.id_lookup.{label}"] = _rate(
+                len(probes), _best_of(lambda: [p in ids for p in probes], repeat), 'lookups/s'
+            )
+
+            # Guardado incremental de 1000 ofertas nuevas sobre el histórico
+            runs = iter(range(1_000_000))
+            results[f"csv.save_jobs.{label}"] = _seconds(
+                _best_of(lambda: CSVHandler(path, columns).save_jobs(_new_jobs(1000, columns, f"r{next(runs)}")), repeat)
+            )
+            os.remove(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_near_dup(config, repeat, history=20000, batch=1000):
+    """Asignación de cluster_id: construcción del índice LSH desde un histórico y lote nuevo contra él."""
+    companies = [f"Empresa {n}" for n in range(2000)]
+    titles = random_titles(history + batch * repeat)
+    offers = [
+        {'job_id': f"nd{i}", 'platform': PLATFORMS[i % len(PLATFORMS)].capitalize(), 'title': title,
+         'company': companies[i % len(companies)], 'salary': None}
+        for i, title in enumerate(titles)
+    ]
+    workdir = tempfile.mkdtemp(prefix="jobs_bench_")
+    try:
+        index = NearDupIndex(os.path.join(workdir, "near_dups.sqlite"))
+        start = time.perf_counter()
+        index.assign(offers[:history])
+        results = {'near_dup.bootstrap': _rate(history, time.perf_counter() - start, 'offers/s')}
+        batches = iter(range(history, len(offers), batch))
+
+        def new_batch():
+            first = next(batches)
+            index.assign(offers[first:first + batch])
+        results['near_dup.assign'] = _rate(batch, _best_of(new_batch, repeat), 'offers/s')
+        index.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _python_seconds(*argv):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *argv], cwd=_REPO_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_startup(config, repeat):
+    """Arranque del CLI en procesos nuevos: `import main` (descontando el intérprete vacío), `--help` y
+    `validate-config`. Que `import main` no cargue módulos pesados lo revisa tests/test_startup.py."""
+    repeat = max(repeat, 3)   # Procesos nuevos: el ruido pesa más que en los demás casos
+    interpreter = _best_of(lambda: _python_seconds("-c", "pass"), repeat)
+    return {
+        'startup.import_main': _seconds(max(_best_of(lambda: _python_seconds("-c", "import main"), repeat) - interpreter, 0.0)),
+        'startup.help': _seconds(_best_of(lambda: _python_seconds("main.py", "--help"), repeat)),
+        'startup.validate_config': _seconds(_best_of(lambda: _python_seconds("main.py", "validate-config"), repeat)),
+    }
+
+
+CASES = {
+    'startup': lambda cfg, args: bench_startup(cfg, args.repeat),
+    'parse': lambda cfg, args: bench_parse(cfg, args.repeat),
+    'filter': lambda cfg, args: bench_filter(cfg, args.repeat),
+    'scrape_keyword': lambda cfg, args: bench_scrape_keyword(cfg, args.repeat),
+    'csv': lambda cfg, args: bench_csv(cfg, args.repeat, args.sizes),
+    'near_dup': lambda cfg, args: bench_near_dup(cfg, args.repeat),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline del scraper")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--only", default=",".join(CASES), help=f"Casos separados por coma: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se reporta la mejor)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Filas del CSV histórico")
+    parser.add_argument("--quick", action="store_true", help="Atajo: --repeat 1 --sizes 10000")
+    parser.add_argument("-o", "--output", help="Archivo JSON de salida (por defecto solo se imprime)")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.sizes = 1, "10000"
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    # Los logs por página del scraper distorsionan las mediciones
+    logging.basicConfig(level=logging.WARNING)
+    # Todos los casos usan la misma copia: el limitador por dominio se crea con el primer config que lo pide
+    config = bench_config(load_config(args.config), pages=10)
+
+    results = {}
+    for case in [c.strip() for c in args.only.split(",") if c.strip()]:
+        if case not in CASES:
+            parser.error(f"Caso desconocido: {case}")
+        print(f"▶ {case}...", file=sys.stderr)
+        results.update(CASES[case](config, args))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'machine': f"{platform.system()} {platform.machine()}",
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    for name, r in results.items():
+        print(f"  {name:<45} {r['value']:>14,.2f} {r['unit']}", file=sys.stderr)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"Resultados en {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
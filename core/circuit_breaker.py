@@ -0,0 +1,111 @@
+import time
+import logging
+import threading
+
+from core.scheduler import platform_domain
+
+logger = logging.getLogger(__name__)
+
+
+class BlockedError(Exception):
+    """La sesión de navegador quedó bloqueada (challenge que no se resuelve o página que nunca carga)."""
+
+    def __init__(self, platform, reason, waited):
+        super().__init__(f"[{platform.upper()}] Sesión bloqueada ({reason}) tras {int(waited)}s")
+        self.platform = platform
+        self.reason = reason      # challenge | timeout
+        self.waited = waited
+        self.page_num = None      # Página en la que se quedó (la llena scrape_keyword para reintentar desde ahí)
+
+
+class CircuitBreaker:
+    """Circuit breaker por dominio para bloqueos de navegador:
+    - cada bloqueo recicla la sesión y espera `backoff_base` * 2^(bloqueos seguidos - 1) (tope `backoff_max`)
+    - al llegar a `max_trips` bloqueos seguidos el circuito se abre: las keywords restantes se estacionan
+    - una keyword terminada sin bloqueo reinicia la cuenta
+    - con `reset_after` (segundos) un circuito abierto se vuelve a probar: un bloqueo más lo reabre"""
+
+    def __init__(self, name, max_trips=3, backoff_base=30, backoff_max=600, reset_after=None):
+        self.name = name
+        self.max_trips = max(int(max_trips), 1)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.trips = 0          # Bloqueos seguidos
+        self.total_trips = 0
+        self.reasons = {}
+        self.opened = False
+        self.opened_at = None
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, name, breaker_cfg):
+        return cls(
+            name,
+            max_trips=breaker_cfg.get('max_trips', 3),
+            backoff_base=breaker_cfg.get('backoff_base', 30),
+            backoff_max=breaker_cfg.get('backoff_max', 600),
+            reset_after=breaker_cfg['reset_after_minutes'] * 60 if breaker_cfg.get('reset_after_minutes') else None,
+        )
+
+    @property
+    def is_open(self):
+        with self._lock:
+            if self.opened and self.reset_after and time.monotonic() - self.opened_at >= self.reset_after:
+                # Semiabierto: se deja pasar una keyword; si vuelve a bloquearse se abre otra vez
+                self.opened = False
+                self.trips = self.max_trips - 1
+                logger.info(f"🔌 [{self.name}] Circuito semiabierto: se vuelve a intentar.")
+            return self.opened
+
+    def on_block(self, reason):
+        """Registra un bloqueo. Retorna los segundos de espera antes de reintentar, o None si el circuito se abrió."""
+        with self._lock:
+            self.trips += 1
+            self.total_trips += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            if self.trips >= self.max_trips:
+                self.opened = True
+                self.opened_at = time.monotonic()
+                return None
+            return min(self.backoff_base * 2 ** (self.trips - 1), self.backoff_max)
+
+    def on_success(self):
+        with self._lock:
+            if not self.opened:
+                self.trips = 0
+
+    def report(self):
+        with self._lock:
+            return {'name': self.name, 'open': self.opened, 'trips': self.total_trips, 'reasons': dict(self.reasons)}
+
+
+def breaker_config(config, platform_name):
+    """`general.circuit_breaker` con lo de `platforms.<nombre>.circuit_breaker` encima."""
+    breaker_cfg = dict(config['general'].get('circuit_breaker', {}))
+    breaker_cfg.update(config['platforms'][platform_name].get('circuit_breaker', {}))
+    return breaker_cfg
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(platform_name, config):
+    """Un breaker compartido por dominio (si Cloudflare bloquea a una sesión, las demás del sitio también cuentan)."""
+    key = platform_domain(config['platforms'][platform_name])
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker.from_config(platform_name.upper(), breaker_config(config, platform_name))
+        return breaker
+
+def log_breaker_report():
+    """Resumen al final de la corrida: qué dominios tuvieron bloqueos y cuáles quedaron con el circuito abierto."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        r = breaker.report()
+        if not r['trips']:
+            continue
+        state = "ABIERTO (keywords estacionadas)" if r['open'] else "cerrado"
+        logger.warning(f"🔌 [{r['name']}] {r['trips']} bloqueo(s) {r['reasons']} | circuito {state}")
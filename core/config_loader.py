@@ -1,20 +1,161 @@
+import re
 import yaml
 import logging
 
+from storage.base import STORAGE_BACKENDS
+
 logger = logging.getLogger(__name__)
 
+FETCH_MODES = ('http', 'selenium', 'auto')
+_NUMBER = (int, float)
+
+# Esquema mínimo: ruta -> tipo esperado. Las obligatorias deben existir; las opcionales solo se revisan si están.
+_REQUIRED = {
+    'general': dict, 'general.output_filename': str, 'general.final_columns_to_save': list,
+    'search_filters': dict, 'search_filters.search_keywords': list, 'selenium': dict, 'platforms': dict,
+}
+_OPTIONAL = {
+    'general.storage_backend': str, 'general.parse_workers': int, 'general.max_sessions_per_domain': int,
+    'general.seen_ids_stripes': int, 'general.http': dict, 'general.metrics': dict, 'general.page_cache': dict,
+    'general.incremental_crawl': dict, 'general.near_duplicates': dict, 'general.circuit_breaker': dict,
+    'general.resource_blocking': dict, 'general.enrichment': dict, 'general.daemon': dict, 'general.distributed': dict,
+    'search_filters.include_title_keywords': list, 'search_filters.exclude_title_keywords': list,
+    'selenium.image': str, 'selenium.pool': dict,
+}
+_PLATFORM_REQUIRED = {'base_url': str, 'selectors': dict}
+_PLATFORM_OPTIONAL = {
+    'max_pages': int, 'sessions': int, 'fetch_mode': str, 'link_format': str, 'pagination': dict,
+    'rate_limit': dict, 'selenium_rules': dict, 'detail': dict, 'delay_between_pages': _NUMBER, 'http_fallback_after': int,
+}
+# Selectores de selenium_rules (wait_for_selector admite varios separados por coma)
+_RULE_SELECTORS = ('wait_for_selector', 'stop_pagination_if_present', 'stop_pagination_if_missing',
+                   'next_button_selector', 'scroll_pane_selector')
+
+
+class ConfigError(Exception):
+    """config.yaml ilegible o inválido (el mensaje lista todos los problemas encontrados)."""
+
+
 def load_config(config_path):
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = yaml.safe_load(f)
-        logger.info(f"Configuración cargada desde '{config_path}'")
-        return config
     except FileNotFoundError:
-        logger.error(f"Archivo de configuración '{config_path}' no encontrado.")
-        exit(1)
+        raise ConfigError(f"Archivo de configuración '{config_path}' no encontrado.")
     except yaml.YAMLError as e:
-        logger.error(f"Archivo YAML no válido: {e}")
-        exit(1)
-    except Exception as e:
-        logger.error(f"Error inesperado al cargar la configuración: {e}")
-        exit(1)
\ No newline at end of file
+        raise ConfigError(f"Archivo YAML no válido: {e}")
+    if not isinstance(config, dict):
+        raise ConfigError(f"'{config_path}' no contiene un mapa de configuración.")
+    logger.info(f"Configuración cargada desde '{config_path}'")
+    return config
+
+
+def _lookup(config, path):
+    node = config
+    for key in path.split('.'):
+        if not isinstance(node, dict) or key not in node:
+            return False, None
+        node = node[key]
+    return True, node
+
+
+def _check_types(errors, config, required, optional, prefix=''):
+    for paths, mandatory in ((required, True), (optional, False)):
+        for path, expected in paths.items():
+            found, value = _lookup(config, path)
+            if not found or (value is None and not mandatory):
+                if mandatory:
+                    errors.append(f"{prefix}{path}: falta")
+                continue
+            if not isinstance(value, expected) or isinstance(value, bool) and expected in (int, _NUMBER):
+                names = "/".join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+                errors.append(f"{prefix}{path}: se esperaba {names}, hay {type(value).__name__}")
+
+
+def _check_selector(errors, translator, where, css):
+    from cssselect import SelectorError
+    try:
+        translator.css_to_xpath(css)
+    except SelectorError as e:
+        errors.append(f"{where}: selector CSS inválido '{css}' ({e})")
+
+
+def _check_field_rules(errors, translator, where, rules):
+    """Mismo formato que `selectors`: "NONE" o {selector, attribute, regex}."""
+    if rules in (None, "NONE"):
+        return
+    if not isinstance(rules, dict):
+        errors.append(f"{where}: se esperaba un mapa {{selector, attribute, regex}} o \"NONE\"")
+        return
+    if 'selector' in rules:
+        _check_selector(errors, translator, where, rules['selector'])
+    if 'regex' in rules:
+        try:
+            re.compile(rules['regex'])
+        except re.error as e:
+            errors.append(f"{where}: regex inválida '{rules['regex']}' ({e})")
+
+
+def _check_platform(errors, translator, name, p_cfg):
+    prefix = f"platforms.{name}."
+    _check_types(errors, p_cfg, _PLATFORM_REQUIRED, _PLATFORM_OPTIONAL, prefix)
+    if isinstance(p_cfg.get('base_url'), str) and '{keyword}' not in p_cfg['base_url']:
+        errors.append(f"{prefix}base_url: falta el marcador {{keyword}}")
+    if isinstance(p_cfg.get('link_format'), str) and p_cfg['link_format'] and '{job_id}' not in p_cfg['link_format']:
+        errors.append(f"{prefix}link_format: falta el marcador {{job_id}}")
+    if p_cfg.get('fetch_mode', 'selenium') not in FETCH_MODES:
+        errors.append(f"{prefix}fetch_mode: '{p_cfg['fetch_mode']}' no es {' | '.join(FETCH_MODES)}")
+    if p_cfg.get('delay_between_pages') is not None and p_cfg.get('rate_limit'):
+        # Con rate_limit la pausa fija se ignoraría en silencio
+        errors.append(f"{prefix}delay_between_pages: no se usa junto con rate_limit (equivale a "
+                      f"rate_limit.pages_per_minute = 60 / delay); deja solo uno")
+
+    selectors = p_cfg.get('selectors')
+    if isinstance(selectors, dict):
+        if not isinstance(selectors.get('card'), str):
+            errors.append(f"{prefix}selectors.card: falta")
+        else:
+            _check_selector(errors, translator, f"{prefix}selectors.card", selectors['card'])
+        for field in ('job_id', 'title', 'company'):
+            if field not in selectors:
+                errors.append(f"{prefix}selectors.{field}: falta")
+        for field in ('job_id', 'title', 'company', 'salary'):
+            _check_field_rules(errors, translator, f"{prefix}selectors.{field}", selectors.get(field))
+
+    rules = p_cfg.get('selenium_rules')
+    if isinstance(rules, dict):
+        for key in _RULE_SELECTORS:
+            value = str(rules.get(key) or '')
+            for css in (value.split(',') if key == 'wait_for_selector' else [value]):
+                if css.strip():
+                    _check_selector(errors, translator, f"{prefix}selenium_rules.{key}", css.strip())
+
+    detail = p_cfg.get('detail')
+    if isinstance(detail, dict):
+        for field, field_rules in (detail.get('selectors') or {}).items():
+            _check_field_rules(errors, translator, f"{prefix}detail.selectors.{field}", field_rules)
+
+
+def validate_config(config):
+    """Revisa el config contra el esquema y compila selectores CSS y regex de las plataformas habilitadas,
+    antes de levantar cualquier contenedor. Lanza ConfigError con todos los problemas juntos."""
+    from cssselect import HTMLTranslator
+
+    errors = []
+    _check_types(errors, config, _REQUIRED, _OPTIONAL)
+    if _lookup(config, 'timing.delay_between_keywords')[0]:
+        errors.append("timing.delay_between_keywords: ya no existe; el ritmo lo marca platforms.<nombre>.rate_limit "
+                      "(token bucket por dominio que también espacia el cambio de keyword). Quítalo del config")
+    backend = _lookup(config, 'general.storage_backend')[1] or 'csv'
+    if backend not in STORAGE_BACKENDS:
+        errors.append(f"general.storage_backend: '{backend}' no es {' | '.join(STORAGE_BACKENDS)}")
+    translator = HTMLTranslator()
+    platforms = config.get('platforms')
+    for name, p_cfg in (platforms.items() if isinstance(platforms, dict) else ()):
+        if not isinstance(p_cfg, dict):
+            errors.append(f"platforms.{name}: se esperaba un mapa")
+        elif p_cfg.get('enabled', False):
+            _check_platform(errors, translator, name, p_cfg)
+    if errors:
+        raise ConfigError("Configuración inválida:\n  - " + "\n  - ".join(errors))
+    return config
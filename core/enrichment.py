@@ -0,0 +1,224 @@
+import json
+import logging
+import threading
+import concurrent.futures
+
+import lxml.html
+
+from core import metrics
+from core.rate_limiter import AdaptiveRateLimiter
+from scrapers.extraction import FieldRule, NOT_SPECIFIED, compile_css
+from storage.detail_cache import DetailCache
+from utils.http_utils import HttpFetcher, BLOCK_STATUS_CODES
+
+logger = logging.getLogger(__name__)
+
+DETAIL_FIELDS = ('date_posted', 'location', 'seniority', 'description')
+
+_JSON_LD_XPATH = compile_css("script[type='application/ld+json']")
+
+
+def _spaced_text(element):
+    """Texto con espacios entre elementos (element_text los pega: sirve para campos cortos, no para descripciones)."""
+    return " ".join(s.strip() for s in element.itertext() if s.strip())
+
+
+def _ld_job_posting(root):
+    """Primer objeto schema.org JobPosting del JSON-LD (OCC, Indeed y LinkedIn lo publican en el detalle)."""
+    for script in _JSON_LD_XPATH(root):
+        try:
+            data = json.loads(script.text or '')
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get('@graph', [data]) if isinstance(data, dict) else []
+        for item in items:
+            if isinstance(item, dict) and item.get('@type') == 'JobPosting':
+                return item
+    return {}
+
+
+def _ld_location(posting):
+    locations = posting.get('jobLocation') or []
+    for location in (locations if isinstance(locations, list) else [locations]):
+        address = location.get('address', {}) if isinstance(location, dict) else {}
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ('addressLocality', 'addressRegion', 'addressCountry')]
+            parts = [p.get('name') if isinstance(p, dict) else p for p in parts]
+            if any(parts):
+                return ", ".join(str(p) for p in parts if p)
+    return 'Remoto' if posting.get('jobLocationType') == 'TELECOMMUTE' else None
+
+
+def _ld_seniority(posting):
+    experience = posting.get('experienceRequirements')
+    if isinstance(experience, dict):
+        months = experience.get('monthsOfExperience')
+        return f"{months} meses" if months else experience.get('description')
+    return experience
+
+
+class DetailPlan:
+    """Extracción de la página de detalle de una plataforma: JSON-LD JobPosting y, encima,
+    los selectores de `platforms.<nombre>.detail.selectors` (mismo formato que `selectors`)."""
+
+    def __init__(self, detail_cfg, max_description_chars=2000):
+        self.rules = {name: FieldRule(rules) for name, rules in detail_cfg.get('selectors', {}).items() if name in DETAIL_FIELDS}
+        self.max_description_chars = max_description_chars
+
+    def extract(self, html):
+        root = lxml.html.fromstring(html)
+        posting = _ld_job_posting(root)
+        fields = {
+            'date_posted': posting.get('datePosted'),
+            'location': _ld_location(posting),
+            'seniority': _ld_seniority(posting),
+            'description': _spaced_text(lxml.html.fromstring(posting['description'])) if posting.get('description') else None,
+        }
+        for name, rule in self.rules.items():
+            if name == 'description' and rule.xpath is not None and not rule.attribute:
+                matches = rule.xpath(root)
+                value = rule.finalize(_spaced_text(matches[0])) if matches else NOT_SPECIFIED
+            else:
+                value = rule.extract(root)
+            if value != NOT_SPECIFIED:
+                fields[name] = value
+        if fields['description']:
+            fields['description'] = " ".join(fields['description'].split())[:self.max_description_chars]
+        return {name: (str(value) if value else None) for name, value in fields.items()}
+
+
+class DetailEnricher:
+    """Etapa opcional que abre la página de detalle (`link`) de cada oferta NUEVA, en paralelo al crawl:
+    - los workers le entregan las ofertas de cada página y siguen paginando (no esperan)
+    - `workers` hilos con una sesión HTTP por plataforma y un limitador de ritmo propio por plataforma
+    - lo descargado se guarda por job_id en `cache_file`: una oferta nunca se descarga dos veces
+    Los campos quedan en las mismas JobOffer que junta el agregador, así se guardan por el camino de siempre."""
+
+    def __init__(self, config, cache, workers=4):
+        e_cfg = config['general'].get('enrichment', {})
+        self.cache = cache
+        self.plans = {}
+        self.fetchers = {}
+        self.limiters = {}
+        for name, p_cfg in config['platforms'].items():
+            detail_cfg = p_cfg.get('detail')
+            if not p_cfg.get('enabled', False) or not detail_cfg or not detail_cfg.get('enabled', True):
+                continue
+            self.plans[name] = DetailPlan(detail_cfg, e_cfg.get('max_description_chars', 2000))
+            self.fetchers[name] = HttpFetcher(config, name)
+            # Ritmo independiente del de los listados (mismo formato que platforms.*.rate_limit)
+            self.limiters[name] = AdaptiveRateLimiter.from_config(
+                f"{name.upper()}-DETALLE", {'rate_limit': detail_cfg.get('rate_limit', e_cfg.get('rate_limit', {}))}
+            )
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich")
+        self._closed = False
+        self._pending = {}   # id(JobOffer) -> future (las ofertas siguen vivas mientras su future esté pendiente)
+        self._lock = threading.RLock()   # _discard puede correr dentro de submit (future ya terminado)
+        self.stats = {'fetched': 0, 'cached': 0, 'blocked': 0, 'failed': 0}
+        logger.info(f"🔎 Enriquecimiento de detalle: {workers} hilo(s) para {', '.join(p.upper() for p in self.plans) or 'ninguna plataforma'}.")
+
+    @classmethod
+    def from_config(cls, config):
+        e_cfg = config['general'].get('enrichment', {})
+        if not e_cfg.get('enabled', False):
+            return None
+        return cls(config, DetailCache(e_cfg.get('cache_file', 'cache/details.sqlite')), e_cfg.get('workers', 4))
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def submit(self, platform_name, jobs):
+        """Encola las ofertas nuevas de una página; retorna de inmediato."""
+        if platform_name not in self.plans or self._closed:
+            return
+        for job in jobs:
+            if not job.link:
+                continue
+            # Registro + callback bajo el lock: si el detalle termina antes del registro, el callback
+            # (que corre en el acto sobre un future ya terminado) no se adelanta y la entrada no se queda para siempre
+            with self._lock:
+                future = self.executor.submit(self._enrich, platform_name, job)
+                self._pending[id(job)] = future
+                future.add_done_callback(lambda done, key=id(job): self._discard(key, done))
+
+    def _discard(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def fill_cached(self, jobs_dicts):
+        """Completa con el caché de detalle las ofertas recuperadas del journal (cada página se journalea
+        antes de enriquecerse). Las que no alcanzaron a descargarse se guardan sin detalle."""
+        filled = 0
+        for job in jobs_dicts:
+            if any(job.get(name) for name in DETAIL_FIELDS) or not job.get('platform'):
+                continue
+            fields = self.cache.get(str(job['platform']).lower(), job.get('job_id'))
+            if fields:
+                job.update({name: fields.get(name) for name in DETAIL_FIELDS})
+                filled += 1
+        if filled:
+            logger.info(f"🔎 {filled} oferta(s) del journal completadas con el caché de detalle.")
+        return filled
+
+    def _enrich(self, platform_name, job):
+        try:
+            fields = self.cache.get(platform_name, job.job_id)
+            if fields is not None:
+                self._count('cached')
+            else:
+                fields = self._fetch(platform_name, job)
+        except Exception as e:
+            logger.warning(f"[{platform_name.upper()}] Error enriqueciendo {job.job_id}: {e}")
+            self._count('failed')
+            return
+        if fields is None:
+            return
+        for name in DETAIL_FIELDS:
+            setattr(job, name, fields.get(name))
+
+    def _fetch(self, platform_name, job):
+        limiter = self.limiters[platform_name]
+        metrics.observe('detail_rate_limit_wait', limiter.acquire(), platform=platform_name)
+        with metrics.timer('detail_fetch', platform=platform_name):
+            status, html, _ = self.fetchers[platform_name].get(job.link)
+        if status in BLOCK_STATUS_CODES:
+            # Bloqueado: no se cachea (se queda sin detalle) y el ritmo de detalle de la plataforma baja
+            limiter.on_challenge()
+            self._count('blocked')
+            return None
+        if status != 200 or not html:
+            self._count('failed')
+            return None
+        limiter.on_success()
+        try:
+            with metrics.timer('detail_parse', platform=platform_name):
+                fields = self.plans[platform_name].extract(html)
+        except Exception as e:
+            logger.warning(f"[{platform_name.upper()}] No se pudo leer el detalle de {job.job_id}: {e}")
+            self._count('failed')
+            return None
+        self.cache.put(platform_name, job.job_id, fields)
+        self._count('fetched')
+        return fields
+
+    def wait(self, jobs=None):
+        """Espera el detalle de `jobs` (o todo lo encolado) antes de guardarlas, para que los campos ya estén en las ofertas."""
+        with self._lock:
+            if jobs is None:
+                pending = list(self._pending.values())
+            else:
+                pending = [f for f in (self._pending.get(id(job)) for job in jobs) if f is not None]
+        if pending:
+            logger.info(f"🔎 Esperando {len(pending)} detalle(s) pendientes...")
+            concurrent.futures.wait(pending)
+
+    def close(self, cancel=False):
+        self._closed = True
+        self.executor.shutdown(wait=not cancel, cancel_futures=cancel)
+        for fetcher in self.fetchers.values():
+            fetcher.close()
+        self.cache.close()
+        s = self.stats
+        logger.info(f"🔎 Detalles: {s['fetched']} descargados, {s['cached']} del caché, {s['blocked']} bloqueados, {s['failed']} fallidos.")
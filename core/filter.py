@@ -1,27 +1,113 @@
-def filter_job_by_title(title, config_filters):
-    title_lower = title.lower()
-    
-    # Aseguramos que todas las reglas del YAML también estén en minúsculas
-    exclude_keywords = [kw.lower() for kw in config_filters.get('exclude_title_keywords', [])]
-    include_keywords = [kw.lower() for kw in config_filters.get('include_title_keywords', [])]
-    
-    # 1. Mayor precedencia: Excluir (Si tiene SAP, muere aquí mismo)
-    for ex_word in exclude_keywords:
-        if ex_word in title_lower:
+import re
+
+
+class _KeywordMatcher:
+    """Un solo regex combinado para toda la lista de palabras.
+    Devuelve la PRIMERA palabra de la lista (en el orden del YAML) que aparezca en el título,
+    igual que el antiguo `for kw in lista: if kw in titulo`."""
+
+    def __init__(self, keywords, word_boundaries=False):
+        # Sin duplicados pero respetando el orden original (la precedencia importa)
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        self.regex = None
+        if not self.keywords:
+            return
+
+        if word_boundaries:
+            # (?<!\w)/(?!\w) en lugar de \b para que funcione con palabras como ".NET"
+            alternatives = [rf"(?<!\w)({re.escape(kw)})(?!\w)" for kw in self.keywords]
+        else:
+            alternatives = [f"({re.escape(kw)})" for kw in self.keywords]
+        # Lookahead de ancho cero: en cada posición gana la alternativa con menor índice,
+        # así que el mínimo sobre todas las posiciones es la primera palabra de la lista presente.
+        self.regex = re.compile("(?=" + "|".join(alternatives) + ")")
+
+    def first_match(self, text_lower):
+        if self.regex is None: return None
+        best = None
+        for match in self.regex.finditer(text_lower):
+            idx = match.lastindex - 1
+            if best is None or idx < best:
+                best = idx
+                if best == 0: break
+        return self.keywords[best] if best is not None else None
+
+
+class TitleFilter:
+    """Motor de filtrado por título precompilado a partir de `search_filters`.
+    Se construye una sola vez y se reutiliza para todas las tarjetas (o para un CSV completo)."""
+
+    def __init__(self, include_keywords=None, exclude_keywords=None, word_boundaries=False):
+        self.include = _KeywordMatcher(include_keywords or [], word_boundaries)
+        self.exclude = _KeywordMatcher(exclude_keywords or [], word_boundaries)
+        self.word_boundaries = word_boundaries
+
+    @classmethod
+    def from_config(cls, config_filters):
+        return cls(
+            include_keywords=config_filters.get('include_title_keywords') or [],
+            exclude_keywords=config_filters.get('exclude_title_keywords') or [],
+            word_boundaries=config_filters.get('title_word_boundaries', False),
+        )
+
+    def evaluate(self, title):
+        """Retorna (es_valido, tipo_resultado, palabra_clave)."""
+        title_lower = str(title).lower()
+
+        # 1. Mayor precedencia: Excluir (Si tiene SAP, muere aquí mismo)
+        ex_word = self.exclude.first_match(title_lower)
+        if ex_word is not None:
             return False, "excluded_explicit", ex_word
-            
-    # Si no hay palabras para incluir, lo damos por válido asumiendo que solo querías excluir
-    if not include_keywords:
-        return True, "included", None
-        
-    # 2. Si pasó la exclusión, revisamos si tiene alguna palabra que buscamos
-    for inc_word in include_keywords:
-        if inc_word in title_lower:
+
+        # Si no hay palabras para incluir, lo damos por válido asumiendo que solo querías excluir
+        if not self.include.keywords:
+            return True, "included", None
+
+        # 2. Si pasó la exclusión, revisamos si tiene alguna palabra que buscamos
+        inc_word = self.include.first_match(title_lower)
+        if inc_word is not None:
             return True, "included", inc_word
-            
-    # Si no tiene palabras excluidas pero TAMPOCO incluidas, se descarta por defecto
-    return False, "excluded_implicit", None
+
+        # Si no tiene palabras excluidas pero TAMPOCO incluidas, se descarta por defecto
+        return False, "excluded_implicit", None
+
+    def evaluate_many(self, titles):
+        """Evalúa un lote de títulos (lista o pandas Series).
+        Los títulos repetidos (muy comunes en el histórico) solo se evalúan una vez.
+        - Lista -> lista de tuplas (es_valido, tipo_resultado, palabra_clave)
+        - Series -> DataFrame con columnas 'valid', 'reason', 'keyword' y el mismo índice"""
+        cache = {}
+        results = []
+        for title in titles:
+            key = str(title)
+            res = cache.get(key)
+            if res is None:
+                res = cache[key] = self.evaluate(key)
+            results.append(res)
+
+        if hasattr(titles, 'index') and hasattr(titles, 'to_frame'):
+            import pandas as pd
+            return pd.DataFrame(results, columns=['valid', 'reason', 'keyword'], index=titles.index)
+        return results
+
+
+_filter_cache = {}
+
+def get_title_filter(config_filters):
+    """TitleFilter compartido por configuración (se compila una sola vez por juego de reglas)."""
+    key = (
+        tuple(config_filters.get('include_title_keywords') or []),
+        tuple(config_filters.get('exclude_title_keywords') or []),
+        bool(config_filters.get('title_word_boundaries', False)),
+    )
+    title_filter = _filter_cache.get(key)
+    if title_filter is None:
+        title_filter = _filter_cache[key] = TitleFilter.from_config(config_filters)
+    return title_filter
+
+def filter_job_by_title(title, config_filters):
+    return get_title_filter(config_filters).evaluate(title)
 
 def merge_processed_titles(global_dict, local_dict):
     for key in global_dict:
-        global_dict[key].extend(local_dict.get(key, []))
\ No newline at end of file
+        global_dict[key].extend(local_dict.get(key, []))
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+import contextlib
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los buckets (estilo Prometheus; el último bucket implícito es +Inf)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def quantile(self, q):
+        """Aproximación por buckets: interpolación lineal dentro del bucket donde cae el cuantil."""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            if c and running + c >= target:
+                lower = max(self.buckets[i - 1] if i > 0 else self.min, self.min)
+                upper = min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (target - running) / c
+            running += c
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count, 'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else None,
+            'min': _round(self.min), 'max': _round(self.max),
+            'p50': _round(self.quantile(0.5)), 'p95': _round(self.quantile(0.95)),
+        }
+
+
+class MetricsRegistry:
+    """Histogramas por (etapa, unidad, plataforma, keyword). Seguro entre hilos; si está apagado no mide nada."""
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = datetime.now()
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, value, unit='seconds', platform='', keyword=''):
+        if not self.enabled:
+            return
+        key = (stage, unit, platform or '', keyword or '')
+        with self._lock:
+            hist = self._series.get(key)
+            if hist is None:
+                hist = self._series[key] = Histogram(BYTES_BUCKETS if unit == 'bytes' else SECONDS_BUCKETS)
+            hist.observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, stage, platform='', keyword=''):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, 'seconds', platform, keyword)
+
+    def report(self):
+        with self._lock:
+            series = list(self._series.items())
+        totals = {}
+        for (stage, unit, _, _), hist in series:
+            total = totals.get((stage, unit))
+            if total is None:
+                total = totals[(stage, unit)] = Histogram(hist.buckets)
+            total.merge(hist)
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'totals': [dict(stage=stage, unit=unit, **hist.to_dict()) for (stage, unit), hist in sorted(totals.items())],
+            'series': [
+                dict(stage=stage, unit=unit, platform=platform, keyword=keyword, **hist.to_dict())
+                for (stage, unit, platform, keyword), hist in sorted(series, key=lambda item: item[0])
+            ],
+        }
+
+    def export_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+
+    def export_prometheus(self, path):
+        """Formato textfile del node_exporter (un .prom que se reescribe completo en cada corrida)."""
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+        lines = []
+        for unit in ('seconds', 'bytes'):
+            name = f"jobs_scraper_stage_{unit}"
+            unit_series = [(k, h) for k, h in series if k[1] == unit]
+            if not unit_series:
+                continue
+            lines.append(f"# HELP {name} Duración/tamaño por etapa del scraper.")
+            lines.append(f"# TYPE {name} histogram")
+            for (stage, _, platform, keyword), hist in unit_series:
+                labels = f'stage="{_esc(stage)}",platform="{_esc(platform)}",keyword="{_esc(keyword)}"'
+                running = 0
+                for bound, count in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                    running += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        lines.append(f"jobs_scraper_last_run_timestamp_seconds {time.time():.0f}")
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+    def log_summary(self):
+        for row in self.report()['totals']:
+            if row['unit'] == 'bytes':
+                logger.info(f"  {row['stage']:<22} n={row['count']:<6} total={row['sum'] / 1e6:.1f} MB  p50={row['p50']:.0f} B")
+            else:
+                logger.info(f"  {row['stage']:<22} n={row['count']:<6} total={row['sum']:.1f}s  p50={row['p50']:.3f}s  p95={row['p95']:.3f}s")
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+def _esc(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Registro global de la corrida (igual que el limitador, lo comparten todos los hilos)
+registry = MetricsRegistry()
+timer = registry.timer
+observe = registry.observe
+
+
+def configure(config):
+    registry.enabled = config['general'].get('metrics', {}).get('enabled', False)
+
+
+def export(config):
+    """Escribe el reporte JSON y el textfile de Prometheus configurados en `general.metrics`."""
+    metrics_cfg = config['general'].get('metrics', {})
+    if not registry.enabled:
+        return
+    logger.info("=== TIEMPOS POR ETAPA ===")
+    registry.log_summary()
+    if metrics_cfg.get('report_file'):
+        registry.export_json(metrics_cfg['report_file'])
+        logger.info(f"📊 Reporte de métricas: {metrics_cfg['report_file']}")
+    if metrics_cfg.get('prometheus_file'):
+        registry.export_prometheus(metrics_cfg['prometheus_file'])
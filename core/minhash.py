@@ -0,0 +1,56 @@
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+
+# Primo de Mersenne 2^61 - 1 para las permutaciones universales (a*x + b) mod p
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+_NO_SALARY = {'', 'no especificado', 'none', 'nan'}
+# Razón social y ruido que cambia entre plataformas para la misma empresa ("ACME S.A. de C.V." == "ACME")
+_COMPANY_NOISE = {'s', 'a', 'de', 'c', 'v', 'r', 'l', 'sa', 'cv', 'rl', 'sapi', 'inc', 'llc', 'ltd', 'corp', 'mexico', 'mx'}
+
+
+def normalize_text(text):
+    """minúsculas, sin acentos ni puntuación (se conservan + y # por C++/C#) y espacios colapsados."""
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii').lower()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def offer_shingles(title, company, salary=None, k=3):
+    """Shingles de una oferta: n-gramas de caracteres del título (tolera abreviaturas y orden distinto
+    de palabras) + palabras de la empresa y del salario marcadas para que solo crucen con su mismo campo."""
+    title = normalize_text(title)
+    shingles = {title[i:i + k] for i in range(max(len(title) - k + 1, 1))}
+    shingles.update(f"c:{word}" for word in normalize_text(company).split() if word not in _COMPANY_NOISE)
+    salary = normalize_text(salary)
+    if salary not in _NO_SALARY:
+        shingles.update(f"s:{word}" for word in salary.split())
+    return shingles
+
+
+class MinHasher:
+    """Firmas MinHash de `num_perm` valores (uint32). La semilla es fija: las firmas guardadas en disco
+    siguen siendo comparables entre corridas."""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles):
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # (num_shingles, num_perm): el desbordamiento de uint64 es intencional y determinista
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimación de Jaccard: fracción de posiciones iguales."""
+        return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
@@ -8,4 +8,10 @@ class JobOffer:
     salary: str
     link: str
     platform: str
-    timestamp_found: str
\ No newline at end of file
+    timestamp_found: str
+    cluster_id: str = None   # Grupo de casi-duplicados entre plataformas (general.near_duplicates)
+    # Página de detalle (general.enrichment); None si no se enriqueció
+    date_posted: str = None
+    location: str = None
+    seniority: str = None
+    description: str = None
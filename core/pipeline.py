@@ -0,0 +1,170 @@
+import time
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+
+from core.filter import TitleFilter, merge_processed_titles
+
+logger = logging.getLogger(__name__)
+
+# --- Etapa de parseo en procesos hijos ---
+
+_worker_plans = {}
+_worker_filter = None
+
+def _init_parse_worker(config):
+    """Cada proceso hijo compila UNA vez los planes de extracción y el filtro de títulos."""
+    global _worker_filter
+    # Ctrl+C lo maneja solo el proceso principal (apaga el pool de forma ordenada)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from scrapers.extraction import ExtractionPlan
+    for name, p_cfg in config['platforms'].items():
+        if p_cfg.get('enabled', False):
+            _worker_plans[name] = ExtractionPlan(p_cfg)
+    _worker_filter = TitleFilter.from_config(config['search_filters'])
+
+def _parse_in_worker(platform_name, html):
+    start = time.perf_counter()
+    page = _worker_plans[platform_name].extract_page(html)
+    parsed = time.perf_counter()
+    # El filtro de títulos también corre aquí: el hilo de I/O recibe la página ya evaluada
+    page.verdicts = [_worker_filter.evaluate(card['title']) if card else None for card in page.cards]
+    page.timings = {'parse_cpu': parsed - start, 'filter': time.perf_counter() - parsed}
+    return page
+
+
+class ParseStage:
+    """Pool de procesos para el trabajo CPU (lxml + regex + filtro), separado de los hilos de navegador.
+    `max_pending` limita las páginas en vuelo: si el pool va atrasado, los hilos de fetch esperan (backpressure)."""
+
+    def __init__(self, config, workers, max_pending=None):
+        # Sin fork: el pool se crea con hilos (agregador, limitadores, docker) ya corriendo y un fork
+        # copiaría sus locks tomados. forkserver donde existe (Linux/macOS), spawn en Windows
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_parse_worker, initargs=(config,),
+            mp_context=multiprocessing.get_context(method)
+        )
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        logger.info(f"Etapa de parseo: {workers} proceso(s).")
+
+    def parse(self, platform_name, html):
+        with self._slots:
+            future = self.executor.submit(_parse_in_worker, platform_name, html)
+            # El hilo espera sin el GIL mientras otro núcleo parsea
+            return future.result()
+
+    def shutdown(self, cancel=False):
+        self.executor.shutdown(wait=not cancel, cancel_futures=cancel)
+
+
+# --- Agregador único de resultados ---
+
+_STOP = object()
+
+
+class PipelineClosed(Exception):
+    """El agregador ya se cerró (Ctrl+C): la página no se journalea y --resume la vuelve a hacer."""
+
+
+class ResultAggregator:
+    """Único dueño de los resultados compartidos: journal, ofertas y títulos procesados.
+    (La deduplicación ya ocurrió al reclamar cada ID en SeenIds.)
+    Los hilos de scraping solo encolan eventos (cola acotada = backpressure)."""
+
+    def __init__(self, journal, queue_size=1000):
+        self.journal = journal
+        self.results = []
+        self.titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="result-aggregator", daemon=True)
+        self._thread.start()
+
+    def _put(self, event):
+        # Con la cola llena se reintenta en lugar de bloquear para siempre: tras close() nadie la vacía
+        while not self._closed.is_set():
+            try:
+                self._queue.put(event, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise PipelineClosed()
+
+    def submit_page(self, platform, keyword, page_num, jobs):
+        self._put(('page', platform, keyword, page_num, jobs))
+
+    def submit_keyword_done(self, platform, keyword, titles):
+        self._put(('keyword_done', platform, keyword, titles))
+
+    def flush(self, save):
+        """Entrega a `save(ofertas)` lo acumulado hasta ahora y vacía resultados y journal (modo --daemon).
+        Corre en el hilo del agregador, así ninguna página queda a medias entre el guardado y el journal."""
+        done = threading.Event()
+        self._queue.put(('flush', save, done))
+        done.wait()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                break
+            try:
+                self._handle(event)
+            except Exception as e:
+                logger.error(f"Agregador: error procesando evento {event[0]}: {e}", exc_info=True)
+
+    def _handle(self, event):
+        if event[0] == 'page':
+            _, platform, keyword, page_num, jobs = event
+            self.journal.record_page(platform, keyword, page_num, jobs)
+            self.results.extend(jobs)
+        elif event[0] == 'keyword_done':
+            _, platform, keyword, titles = event
+            self.journal.record_keyword_done(platform, keyword)
+            merge_processed_titles(self.titles, titles)
+        elif event[0] == 'flush':
+            _, save, done = event
+            # Los títulos solo se acumulan por corrida: en el daemon se vacían en cada flush para no crecer sin fin
+            self.titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
+            try:
+                # Si el guardado falla, las ofertas siguen en memoria y en el journal
+                save(self.results)
+                self.results = []
+                self.journal.clear()
+            finally:
+                done.set()
+
+    def close(self):
+        """Procesa lo que quede en la cola y detiene el hilo (también tras Ctrl+C).
+        Desde aquí submit_* lanza PipelineClosed: las sesiones que sigan vivas terminan en el siguiente borde de página."""
+        self._closed.set()
+        self._queue.put(_STOP)
+        self._thread.join()
+
+
+class QueueResultSink:
+    """Reemplaza al ResultAggregator en el modo worker (multi-nodo): cada página terminada va directo
+    a la cola compartida (ofertas + checkpoint de la tarea), así un nodo que muere no pierde lo scrapeado.
+    El coordinador las pasa a su almacenamiento; aquí solo se juntan los títulos procesados."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit_page(self, platform, keyword, page_num, jobs):
+        if self._closed:
+            raise PipelineClosed()
+        self.scheduler.record_page(platform, keyword, page_num, jobs)
+
+    def submit_keyword_done(self, platform, keyword, titles):
+        with self._lock:
+            merge_processed_titles(self.titles, titles)
+
+    def close(self):
+        self._closed = True
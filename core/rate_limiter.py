@@ -0,0 +1,87 @@
+import time
+import random
+import logging
+import threading
+
+from core.scheduler import platform_domain
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket por dominio con jitter y ritmo adaptativo (AIMD):
+    - cada carga limpia acelera un poco hacia `max_pages_per_minute`
+    - cada bloqueo/challenge reduce el ritmo a la mitad (sin bajar de `min_pages_per_minute`)
+    Todas las navegaciones pasan por `acquire()`, que solo duerme lo necesario."""
+
+    def __init__(self, name, pages_per_minute, max_pages_per_minute=None, min_pages_per_minute=None,
+                 burst=1, jitter=0.3, speedup=1.0, backoff=0.5):
+        self.name = name
+        self.rate = float(pages_per_minute)
+        self.max_rate = float(max_pages_per_minute or pages_per_minute)
+        self.min_rate = float(min_pages_per_minute or min(1.0, pages_per_minute))
+        self.burst = max(float(burst), 1.0)
+        self.jitter = float(jitter)
+        self.speedup = float(speedup)
+        self.backoff = float(backoff)
+        self.tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, name, platform_cfg):
+        rl = platform_cfg.get('rate_limit', {})
+        # Compatibilidad: si no hay rate_limit se deriva de delay_between_pages
+        default_rate = 60.0 / max(platform_cfg.get('delay_between_pages', 4), 0.1)
+        return cls(
+            name,
+            pages_per_minute=rl.get('pages_per_minute', default_rate),
+            max_pages_per_minute=rl.get('max_pages_per_minute'),
+            min_pages_per_minute=rl.get('min_pages_per_minute'),
+            burst=rl.get('burst', 1),
+            jitter=rl.get('jitter', 0.3),
+            speedup=rl.get('speedup', 1.0),
+            backoff=rl.get('backoff', 0.5),
+        )
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate / 60.0)
+        self._last = now
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible. Retorna los segundos esperados."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1   # Se reserva el token (puede quedar negativo: el siguiente espera más)
+            interval = 60.0 / self.rate
+            wait = -self.tokens * interval if self.tokens < 0 else 0.0
+        if wait > 0:
+            wait += random.uniform(0, self.jitter) * interval
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.speedup)
+
+    def on_challenge(self):
+        with self._lock:
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            # Se vacía el bucket para que la siguiente navegación sí espere
+            self.tokens = min(self.tokens, 0.0)
+        logger.warning(f"🐢 [{self.name}] Bloqueo detectado: ritmo {old_rate:.1f} -> {self.rate:.1f} págs/min.")
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(platform_name, platform_cfg):
+    """Un limitador compartido por dominio (todas las sesiones que pegan al mismo sitio lo comparten)."""
+    key = platform_domain(platform_cfg)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = AdaptiveRateLimiter.from_config(platform_name.upper(), platform_cfg)
+        return limiter
@@ -0,0 +1,543 @@
+"""Corrida de scraping (`python main.py run`): sesiones de navegador/HTTP, pipeline de parseo y guardado.
+Aquí viven los imports pesados (selenium, docker, pandas, lxml); main.py solo lo importa cuando hace falta."""
+import os
+import time
+import pstats
+import socket
+import cProfile
+import logging
+import threading
+import concurrent.futures
+
+from core import metrics
+from core.scheduler import TaskScheduler, AdaptiveScheduler, QueueScheduler, plan_tasks
+from core.pipeline import ParseStage, ResultAggregator, QueueResultSink, PipelineClosed
+from core.seen_ids import SeenIds
+from core.circuit_breaker import BlockedError, get_circuit_breaker, log_breaker_report
+from core.enrichment import DetailEnricher
+
+from utils.selenium_utils import setup_driver, resource_blocking
+from utils.docker_utils import ContainerPool
+from storage.base import create_storage
+from storage.journal import RunJournal, JournalState
+from storage.page_cache import PageCache
+from storage.crawl_state import CrawlState
+from storage.parked_keywords import ParkedKeywords
+from storage.near_dup_index import NearDupIndex
+from storage.yield_stats import YieldStats
+from storage.task_queue import TaskQueue
+
+from scrapers.generic import GenericScraper
+
+# Silenciar los logs molestos de reconexión de Selenium cuando matamos el contenedor
+logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+logging.getLogger("selenium.webdriver.remote.remote_connection").setLevel(logging.ERROR)
+
+def scraper_worker(scraper_name, session_num, config, scheduler, seen_ids, aggregator, resume_state, parse_stage, page_cache, crawl_state, container_pool, parked, enricher=None):
+    logger = logging.getLogger(__name__)
+    container_manager = None
+    driver = None
+    
+    scraper = None
+    healthy = True
+    breaker = get_circuit_breaker(scraper_name, config)
+
+    # El contenedor + driver se crean solo cuando el scraper realmente necesita navegador
+    def start_browser():
+        nonlocal container_manager, driver
+        # El pool presta una sesión en un contenedor ya arrancado (prewarm o caliente de otra corrida) o en uno nuevo
+        with metrics.timer('container_start', platform=scraper_name):
+            container_manager = container_pool.acquire(f"{scraper_name}-{session_num}")
+            command_executor_url = container_manager.executor_url
+        if container_manager.ready_seconds is not None:
+            metrics.observe('container_ready_wait', container_manager.ready_seconds, platform=scraper_name)
+
+        with metrics.timer('driver_connect', platform=scraper_name):
+            driver = setup_driver(
+                command_executor_url, session_name=f"{scraper_name}-{session_num}",
+                network_log=resource_blocking(config, scraper_name).get('accounting', False)
+            )
+        if not driver:
+            raise Exception("No se pudo conectar al driver remoto.")
+        return driver
+
+    # Sesión bloqueada: se tira el navegador (y el contenedor) y la siguiente página levanta uno nuevo con cookies frescas
+    def recycle_browser():
+        nonlocal container_manager, driver
+        if driver:
+            try: driver.quit()
+            except: pass
+        if container_manager:
+            container_pool.release(container_manager, healthy=False)
+        driver = container_manager = None
+        scraper.driver = None
+
+    # Tarea en curso ('kw') y página desde la que se retoma; si la sesión se cae, vuelve al planificador
+    progress = {}
+    def release_task():
+        kw = progress.pop('kw', None)
+        if kw is None:
+            return
+        try:
+            scheduler.requeue(scraper_name, kw, progress['next_page'])
+            logger.warning(f"↩️ [{scraper_name.upper()}] '{kw}' vuelve a la cola desde la pág {progress['next_page'] or 1}.")
+        except Exception as e:
+            logger.warning(f"[{scraper_name.upper()}] No se pudo devolver '{kw}' a la cola: {e}")
+
+    try:
+        scraper = GenericScraper(config, scraper_name, driver_factory=start_browser, parse_stage=parse_stage, page_cache=page_cache, crawl_state=crawl_state)
+        if scraper.fetch_mode == 'selenium':
+            scraper.ensure_browser()
+
+        # Cada página terminada va al agregador (journal + resultados compartidos)
+        def on_page(kw, page_num, page_jobs):
+            if enricher and page_jobs:
+                # El detalle se descarga en otros hilos mientras esta sesión sigue paginando. Se encola ANTES
+                # de entregar la página: toda oferta que el agregador guarde ya tiene su detalle en curso
+                enricher.submit(scraper_name, page_jobs)
+            aggregator.submit_page(scraper_name, kw, page_num, page_jobs)
+            progress['pages'] += 1
+            progress['next_page'] = page_num + 1
+            if page_jobs:
+                progress['new'] += len(page_jobs)
+                progress['deepest_new'] = max(progress['deepest_new'], page_num)
+
+        # Cada sesión toma keywords de la cola de su plataforma hasta vaciarla
+        while (kw := scheduler.next_task(scraper_name)) is not None:
+            if breaker.is_open:
+                # Plataforma bloqueada: lo que queda se estaciona para la siguiente corrida
+                parked.park(scraper_name, kw, 'circuit_open')
+                scheduler.task_done(scraper_name, kw, parked=True)
+                continue
+            start_page = scheduler.retry_page(scraper_name, kw) or resume_state.resume_page(scraper_name, kw)
+            progress.update(kw=kw, next_page=start_page, pages=0, new=0, deepest_new=0)
+            try:
+                with scheduler.domain_slot(scraper_name):
+                    # Los IDs se reclaman en el servicio compartido: lo que encuentre otra sesión se ve al instante
+                    _, titulos_procesados = scraper.scrape_keyword(
+                        kw, seen_ids, start_page=start_page, on_page=on_page, max_pages=scheduler.max_pages_for(scraper_name, kw)
+                    )
+            except BlockedError as e:
+                metrics.observe('circuit_breaker_trip', 1, 'count', platform=scraper_name, keyword=kw)
+                delay = breaker.on_block(e.reason)
+                recycle_browser()
+                progress.pop('kw')
+                if delay is None:
+                    logger.error(f"🔌 {e}. Circuito abierto: las keywords restantes de {scraper_name.upper()} se estacionan.")
+                    parked.park(scraper_name, kw, e.reason)
+                    scheduler.task_done(scraper_name, kw, parked=True)
+                    continue
+                logger.warning(f"♻️ {e}. Sesión reciclada; '{kw}' se reintenta desde la pág {e.page_num} en {int(delay)}s.")
+                time.sleep(delay)
+                scheduler.requeue(scraper_name, kw, e.page_num)
+                continue
+            breaker.on_success()
+            parked.done(scraper_name, kw)
+            progress.pop('kw')
+            scheduler.task_done(scraper_name, kw, progress['new'], progress['pages'], progress['deepest_new'])
+            aggregator.submit_keyword_done(scraper_name, kw, titulos_procesados)
+
+    except PipelineClosed:
+        logger.info(f"[{scraper_name.upper()}] Sesión {session_num} detenida (la página en curso se rehace con --resume).")
+    except Exception as e:
+        healthy = False
+        # Solo imprimimos el error si NO fue porque apagamos el contenedor a la fuerza
+        if "Max retries exceeded" not in str(e) and "Connection refused" not in str(e):
+            logger.error(f"[{scraper_name.upper()}] Error crítico: {e}", exc_info=True)
+        # Sin esto la keyword quedaría "en curso" para siempre (reserva de páginas del daemon, lease de la cola compartida)
+        release_task()
+    finally:
+        if scraper:
+            scraper.close()
+        if driver:
+            try: driver.quit()
+            except: pass
+        if container_manager:
+            # Con keep_warm el contenedor sigue vivo para la próxima corrida (si la sesión terminó bien)
+            container_pool.release(container_manager, healthy=healthy)
+
+def open_near_dups(config, storage):
+    """Índice de casi-duplicados (None si está desactivado). La primera vez se llena con el histórico."""
+    near_dups = NearDupIndex.from_config(config)
+    if near_dups is not None and not len(near_dups):
+        history = storage.load_jobs(columns=['job_id', 'platform', 'title', 'company', 'salary'])
+        if len(history):
+            near_dups.bootstrap(history)
+    return near_dups
+
+def save_new_jobs(config, storage, jobs_dicts, near_dups):
+    """Guarda las ofertas nuevas. Con general.near_duplicates cada una lleva el cluster_id de su grupo
+    (action: skip además descarta las que ya tenían un casi-duplicado guardado)."""
+    logger = logging.getLogger(__name__)
+    if near_dups is not None:
+        with metrics.timer('near_dup'):
+            matched = near_dups.assign(jobs_dicts)
+        if matched:
+            logger.info(f"🧬 {matched} oferta(s) casi-duplicadas de otras ya vistas (mismo cluster_id).")
+        if config['general']['near_duplicates'].get('action', 'tag') == 'skip':
+            jobs_dicts = [j for j in jobs_dicts if j.get('cluster_id') in (None, NearDupIndex.own_cluster(j))]
+    with metrics.timer('save_jobs'):
+        storage.save_jobs(jobs_dicts)
+
+def run_replay(config, storage, existing_ids, page_cache, near_dups):
+    """--replay: re-parsea las páginas del caché (sin navegador ni red) y guarda lo nuevo."""
+    logger = logging.getLogger(__name__)
+    found_job_ids = SeenIds(existing_ids)
+    results = []
+    for name, p_cfg in config['platforms'].items():
+        if not p_cfg.get('enabled', False):
+            continue
+        scraper = GenericScraper(config, name, page_cache=page_cache)
+        try:
+            for kw in page_cache.keywords(name):
+                new_jobs, _ = scraper.replay_keyword(kw, found_job_ids)
+                results.extend(new_jobs)
+        finally:
+            scraper.close()
+
+    found_job_ids.overlap_report()
+    logger.info(f"=== REPLAY TERMINADO: {len(results)} ofertas nuevas ===")
+    if results:
+        save_new_jobs(config, storage, [job.__dict__ for job in results], near_dups)
+
+def flush_daemon(config, storage, aggregator, near_dups, crawl_state, parked, yield_stats, page_cache, enricher, seen_ids):
+    """--daemon: guarda lo acumulado (ofertas, marcas, estadísticas, métricas) sin detener las sesiones."""
+    def save(jobs):
+        if jobs:
+            if enricher:
+                # Dentro del evento de flush (hilo del agregador): se espera el detalle justo de lo que se guarda
+                enricher.wait(jobs)
+            save_new_jobs(config, storage, [job.__dict__ for job in jobs], near_dups)
+            # Ya están en el histórico: SeenIds los sigue respondiendo desde ahí
+            seen_ids.forget(job.job_id for job in jobs)
+    aggregator.flush(save)
+    if crawl_state:
+        crawl_state.save()
+    parked.save()
+    yield_stats.save()
+    if page_cache:
+        page_cache.evict()
+    metrics.export(config)
+
+def run(config, resume=False, replay=False, daemon=False):
+    """`config` ya cargado y validado (ver main.py)."""
+    logger = logging.getLogger(__name__)
+    metrics.configure(config)
+
+    # csv | sqlite | parquet (general.storage_backend)
+    storage = create_storage(config)
+    existing_ids = storage.get_existing_ids()
+    # MinHash/LSH sobre título + empresa (+ salario): agrupa la misma vacante publicada en varias plataformas
+    near_dups = open_near_dups(config, storage)
+
+    page_cache = PageCache.from_config(config)
+    if replay:
+        if page_cache is None:
+            logger.error("--replay necesita general.page_cache.enabled: true en config.yaml.")
+            return
+        run_replay(config, storage, existing_ids, page_cache, near_dups)
+        page_cache.close()
+        if near_dups:
+            near_dups.close()
+        metrics.export(config)
+        return
+
+    # Detalle de las ofertas nuevas (opcional), en paralelo al crawl de listados
+    enricher = DetailEnricher.from_config(config)
+
+    # --- JOURNAL: lo que quedó de una corrida interrumpida nunca se pierde ---
+    journal = RunJournal(config['general'].get('journal_file', 'run_journal.jsonl'))
+    resume_state = JournalState()
+    if journal.has_data():
+        previous = journal.load()
+        if previous.jobs:
+            logger.info(f"♻️ Recuperando {len(previous.jobs)} ofertas del journal de la corrida anterior...")
+            if enricher:
+                enricher.fill_cached(previous.jobs)
+            save_new_jobs(config, storage, previous.jobs, near_dups)
+        if resume:
+            resume_state = previous
+            logger.info(f"▶️ --resume: {len(previous.completed_keywords)} keyword(s) completas y {len(previous.last_pages)} con checkpoint.")
+        else:
+            journal.clear()
+    elif resume:
+        logger.info("--resume: no hay journal de una corrida anterior. Se empieza desde cero.")
+    if daemon and resume_state.last_pages:
+        # En el daemon cada keyword se recorre muchas veces: un checkpoint viejo no aplica
+        logger.info("--resume no aplica con --daemon: lo del journal ya se guardó y se empieza desde la pág 1.")
+        resume_state = JournalState()
+
+    # Marcas de agua por keyword para el modo incremental (None si está desactivado)
+    crawl_state = CrawlState.from_config(config)
+
+    # Keywords que el circuit breaker estacionó en la corrida anterior: van primero
+    parked = ParkedKeywords.from_config(config)
+    if len(parked):
+        logger.info(f"🅿️ {len(parked)} keyword(s) estacionadas en la corrida anterior se reintentan primero.")
+
+    # Histórico (índice en disco) + IDs reclamados en esta corrida, compartido por todas las sesiones sin copias
+    seen_ids = SeenIds(existing_ids, config['general'].get('seen_ids_stripes', 64))
+
+    scrapers_activos = [k for k, v in config['platforms'].items() if v.get('enabled', False)]
+    
+    if not scrapers_activos:
+        logger.info("No hay plataformas habilitadas en config.yaml.")
+        if enricher:
+            enricher.close()
+        return
+
+    yield_stats = None
+    if daemon:
+        # Cada (plataforma, keyword) se revisa según su rendimiento histórico, con presupuesto de páginas por hora
+        yield_stats = YieldStats.from_config(config)
+        scheduler = AdaptiveScheduler(
+            config, scrapers_activos, config['search_filters']['search_keywords'], yield_stats, priority=parked.pending()
+        )
+    else:
+        # Matriz keyword × plataforma -> cola de tareas (las keywords ya completas en el journal se omiten)
+        scheduler = TaskScheduler(
+            config, scrapers_activos, config['search_filters']['search_keywords'],
+            skip=resume_state.completed_keywords, priority=parked.pending()
+        )
+    total_sessions = scheduler.total_sessions()
+    if not total_sessions:
+        logger.info("No hay keywords pendientes.")
+    else:
+        logger.info(f"=== INICIANDO {'DAEMON' if daemon else 'SCRAPING'} ({total_sessions} hilos/contenedores) ===")
+
+    # Pipeline: hilos de navegador (I/O) -> pool de procesos (parseo + filtro) -> agregador único (dedup + journal)
+    parse_workers = config['general'].get('parse_workers', 0)
+    parse_stage = ParseStage(config, parse_workers, config['general'].get('parse_max_pending')) if parse_workers else None
+    aggregator = ResultAggregator(journal, config['general'].get('aggregator_queue_size', 1000))
+
+    # Imagen descargada una vez y contenedores arrancando en paralelo mientras se preparan los scrapers
+    container_pool = ContainerPool.from_config(config)
+    if config['selenium'].get('pool', {}).get('prewarm', True):
+        container_pool.prewarm(container_pool.containers_for(sum(
+            scheduler.sessions_for(name) for name in scrapers_activos
+            if config['platforms'][name].get('fetch_mode', 'selenium') == 'selenium'
+        )))
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(total_sessions, 1))
+    def submit(name, session_num):
+        return executor.submit(
+            scraper_worker, 
+            name, session_num, config, scheduler, 
+            seen_ids, aggregator, resume_state, parse_stage, page_cache, crawl_state, container_pool, parked, enricher
+        )
+
+    try:
+        futuros = {}
+        for name in scrapers_activos:
+            for session_num in range(1, scheduler.sessions_for(name) + 1):
+                futuros[submit(name, session_num)] = (name, session_num)
+
+        if daemon:
+            # Las sesiones no terminan: cada `flush_minutes` se guarda lo acumulado y una sesión caída se relanza
+            flush_every = config['general'].get('daemon', {}).get('flush_minutes', 15) * 60
+            while futuros:
+                done, _ = concurrent.futures.wait(futuros, timeout=flush_every)
+                for futuro in done:
+                    name, session_num = futuros.pop(futuro)
+                    logger.warning(f"🔁 La sesión {name.upper()}-{session_num} terminó. Se relanza en 30s...")
+                    time.sleep(30)
+                    futuros[submit(name, session_num)] = (name, session_num)
+                flush_daemon(config, storage, aggregator, near_dups, crawl_state, parked, yield_stats, page_cache, enricher, seen_ids)
+
+        for futuro in concurrent.futures.as_completed(futuros):
+            futuro.result() 
+
+    except KeyboardInterrupt:
+        logger.warning("🛑 Interrupción por teclado (Ctrl+C) detectada. Apagando sistema...")
+        scheduler.stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Lo que ya estaba en la cola del agregador también se journalea antes de salir; desde aquí las
+        # sesiones vivas ya no entregan páginas (PipelineClosed) y terminan en el siguiente borde de página
+        aggregator.close()
+        if enricher:
+            enricher.close(cancel=True)
+        logger.warning("⏳ Esperando a que las sesiones suelten la página en curso...")
+        executor.shutdown(wait=True)
+        if parse_stage:
+            parse_stage.shutdown(cancel=True)
+        journal.close()
+        if crawl_state:
+            crawl_state.save()
+        parked.save()
+        if yield_stats:
+            yield_stats.save()
+        metrics.export(config)
+        logger.warning("💾 Lo scrapeado hasta ahora quedó en el journal. Ejecuta con --resume para continuar.")
+        # Aquí el script terminará y 'atexit' de docker_utils matará los contenedores de forma limpia.
+        return
+
+    if parse_stage:
+        parse_stage.shutdown()
+    aggregator.close()
+    container_pool.close()
+    if enricher:
+        enricher.close()
+
+    logger.info("=== TODOS LOS SCRAPERS TERMINARON ===")
+    seen_ids.overlap_report()
+    log_breaker_report()
+    parked.save()
+    if len(parked):
+        logger.warning(f"🅿️ {len(parked)} keyword(s) estacionadas en '{parked.path}' para la siguiente corrida.")
+    if aggregator.results:
+        save_new_jobs(config, storage, [job.__dict__ for job in aggregator.results], near_dups)
+    else:
+        logger.info("No hay nuevas ofertas para guardar.")
+    storage.close()
+    if near_dups:
+        near_dups.close()
+    journal.clear()
+    if crawl_state:
+        crawl_state.save()
+
+    if page_cache:
+        page_cache.evict()
+        page_cache.close()
+    metrics.export(config)
+
+def merge_queue_results(config, storage, task_queue, near_dups, batch_size=5000):
+    """Pasa al almacenamiento las ofertas que dejaron los nodos. Es idempotente: el almacenamiento y el índice
+    de casi-duplicados deduplican por job_id, así que repetir un lote (crash antes de marcarlo) no duplica."""
+    merged = 0
+    while rows := task_queue.unmerged(batch_size):
+        save_new_jobs(config, storage, [job for _, _, job in rows], near_dups)
+        task_queue.mark_merged([(platform, job_id) for platform, job_id, _ in rows])
+        merged += len(rows)
+    return merged
+
+def run_coordinator(config, enqueue=True):
+    """Modo multi-nodo, lado coordinador: reparte la matriz keyword × plataforma en tareas por rangos de páginas
+    en la cola compartida y va juntando en su almacenamiento lo que los workers dejan, hasta que no quede nada abierto."""
+    logger = logging.getLogger(__name__)
+    d_cfg = config['general'].get('distributed', {})
+    storage = create_storage(config)
+    storage.get_existing_ids()
+    near_dups = open_near_dups(config, storage)
+    task_queue = TaskQueue.from_config(config)
+    try:
+        if enqueue:
+            # Los nodos deduplican contra el histórico sin acceso a este almacenamiento
+            task_queue.add_known_ids(storage.load_jobs(columns=['job_id'])['job_id'])
+            platforms = [k for k, v in config['platforms'].items() if v.get('enabled', False)]
+            tasks = plan_tasks(config, platforms, config['search_filters']['search_keywords'])
+            round_num = task_queue.enqueue(tasks)
+            logger.info(f"📤 Ronda {round_num}: {len(tasks)} tarea(s) en '{task_queue.path}'. Arranca los workers con: python main.py worker")
+        while True:
+            merged = merge_queue_results(config, storage, task_queue, near_dups)
+            status = task_queue.status()
+            logger.info(f"🛰️ Cola: {status} | +{merged} oferta(s) de los nodos")
+            if not status.get('pending') and not status.get('leased') and not status.get('expired'):
+                break
+            time.sleep(d_cfg.get('merge_seconds', 60))
+    except KeyboardInterrupt:
+        logger.warning("🛑 Coordinador detenido. Las tareas siguen en la cola; 'python main.py coordinator --no-enqueue' retoma la mezcla.")
+    finally:
+        merge_queue_results(config, storage, task_queue, near_dups)
+        task_queue.close()
+        storage.close()
+        if near_dups:
+            near_dups.close()
+
+def run_worker(config):
+    """Modo multi-nodo, lado worker: toma tareas de la cola compartida con sus propios contenedores
+    (mismo worker, pool y pipeline de parseo que una corrida normal) y deja las ofertas en la cola."""
+    logger = logging.getLogger(__name__)
+    metrics.configure(config)
+    task_queue = TaskQueue.from_config(config)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    scrapers_activos = [k for k, v in config['platforms'].items() if v.get('enabled', False)]
+    scheduler = QueueScheduler(config, scrapers_activos, task_queue, worker_id)
+    total_sessions = scheduler.total_sessions()
+    if not total_sessions:
+        logger.info(f"No hay tareas abiertas en '{task_queue.path}'.")
+        scheduler.stop()
+        task_queue.close()
+        return
+    logger.info(f"=== WORKER {worker_id} ({total_sessions} hilos/contenedores) ===")
+
+    # Histórico del coordinador + lo que ya dejaron todos los nodos
+    seen_ids = SeenIds(task_queue.known_ids(), config['general'].get('seen_ids_stripes', 64))
+    parse_workers = config['general'].get('parse_workers', 0)
+    parse_stage = ParseStage(config, parse_workers, config['general'].get('parse_max_pending')) if parse_workers else None
+    sink = QueueResultSink(scheduler)
+    page_cache = PageCache.from_config(config)
+    crawl_state = CrawlState.from_config(config)
+    parked = ParkedKeywords.from_config(config)
+    container_pool = ContainerPool.from_config(config)
+    if config['selenium'].get('pool', {}).get('prewarm', True):
+        container_pool.prewarm(container_pool.containers_for(sum(
+            scheduler.sessions_for(name) for name in scrapers_activos
+            if config['platforms'][name].get('fetch_mode', 'selenium') == 'selenium'
+        )))
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=total_sessions)
+    try:
+        futuros = [
+            executor.submit(
+                scraper_worker, name, session_num, config, scheduler, seen_ids, sink, JournalState(),
+                parse_stage, page_cache, crawl_state, container_pool, parked
+            )
+            for name in scrapers_activos for session_num in range(1, scheduler.sessions_for(name) + 1)
+        ]
+        for futuro in concurrent.futures.as_completed(futuros):
+            futuro.result()
+    except KeyboardInterrupt:
+        logger.warning("🛑 Worker detenido: sus tareas en curso vuelven a la cola.")
+        executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        # Las sesiones vivas dejan de entregar páginas y se esperan antes de cerrar la cola compartida
+        sink.close()
+        scheduler.stop()
+        executor.shutdown(wait=True)
+        if parse_stage:
+            parse_stage.shutdown(cancel=True)
+        container_pool.close()
+        task_queue.close()
+        if crawl_state:
+            crawl_state.save()
+        if page_cache:
+            page_cache.evict()
+            page_cache.close()
+        log_breaker_report()
+        metrics.export(config)
+
+def run_profiled(output_path, *args, **kwargs):
+    """--profile: corre run() bajo cProfile, guarda el .prof y loguea las funciones más costosas.
+    cProfile solo engancha el hilo que lo activa, y casi todo el trabajo (navegación, esperas, parseo,
+    guardado, detalle) corre en hilos de los executors: cada hilo nuevo arranca su propio perfil
+    y al final se juntan todos en uno. Los procesos del ParseStage no se perfilan."""
+    logger = logging.getLogger(__name__)
+    profiler = cProfile.Profile()
+    thread_profilers = []
+    lock = threading.Lock()
+
+    def start_thread_profiler(frame, event, arg):
+        # Primer evento de un hilo nuevo: este gancho se reemplaza por un cProfile propio del hilo
+        thread_profiler = cProfile.Profile()
+        try:
+            thread_profiler.enable()
+        except ValueError:
+            # Python 3.12+: cProfile usa sys.monitoring y el perfil principal ya ve todos los hilos
+            threading.setprofile(None)
+            return
+        with lock:
+            thread_profilers.append(thread_profiler)
+
+    threading.setprofile(start_thread_profiler)
+    try:
+        profiler.runcall(run, *args, **kwargs)
+    finally:
+        threading.setprofile(None)
+        stats = pstats.Stats(profiler)
+        with lock:
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+        stats.dump_stats(output_path)
+        logger.info(f"🔬 Perfil guardado en {output_path}: hilo principal + {len(thread_profilers)} hilo(s) "
+                    f"(ver con: python -m pstats {output_path})")
+        stats.sort_stats('cumulative').print_stats(25)
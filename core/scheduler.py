@@ -0,0 +1,327 @@
+import time
+import queue
+import logging
+import threading
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def platform_domain(platform_cfg):
+    """Dominio de la plataforma (ej. 'mx.indeed.com') a partir de su base_url."""
+    return urlparse(platform_cfg['base_url']).netloc.lower()
+
+
+def unique_keywords(keywords):
+    """Quita keywords repetidas (sin distinguir mayúsculas ni espacios extra): cada búsqueda se hace una vez."""
+    unique, seen = [], set()
+    for kw in keywords:
+        norm = " ".join(kw.lower().split())
+        if norm in seen:
+            logger.info(f"Keyword repetida en la configuración, se omite: '{kw}'")
+            continue
+        seen.add(norm)
+        unique.append(kw)
+    return unique
+
+
+class TaskScheduler:
+    """Convierte la matriz keyword × plataforma en colas de tareas (una cola por plataforma,
+    porque cada sesión de navegador pertenece a una plataforma). Varias sesiones por plataforma
+    toman tareas de la misma cola; un semáforo por dominio limita cuántas golpean el mismo sitio a la vez."""
+
+    def __init__(self, config, platforms, keywords, skip=None, priority=None):
+        """`skip`: (plataforma, keyword) ya completas. `priority`: (plataforma, keyword) que van primero
+        (ej. las que quedaron estacionadas en la corrida anterior)."""
+        skip = skip or set()
+        priority = priority or set()
+        self.config = config
+        self.queues = {}
+        self._retry_pages = {}
+        self._retry_lock = threading.Lock()
+        self._domain_slots = {}
+        self._platform_domains = {}
+        max_per_domain = config['general'].get('max_sessions_per_domain', 2)
+        keywords = unique_keywords(keywords)
+
+        for name in platforms:
+            q = queue.Queue()
+            pending = [kw for kw in keywords if (name, kw) not in skip]
+            for kw in sorted(pending, key=lambda kw: (name, kw) not in priority):
+                q.put(kw)
+            self.queues[name] = q
+
+            domain = platform_domain(config['platforms'][name])
+            self._platform_domains[name] = domain
+            if domain not in self._domain_slots:
+                self._domain_slots[domain] = threading.BoundedSemaphore(max_per_domain)
+
+    def sessions_for(self, platform):
+        """Sesiones (contenedor + driver) a levantar para la plataforma: nunca más que tareas pendientes."""
+        wanted = max(int(self.config['platforms'][platform].get('sessions', 1)), 1)
+        return min(wanted, self.queues[platform].qsize())
+
+    def next_task(self, platform):
+        """Siguiente keyword pendiente de la plataforma, o None si ya no hay."""
+        try:
+            return self.queues[platform].get_nowait()
+        except queue.Empty:
+            return None
+
+    def requeue(self, platform, keyword, start_page=None):
+        """Devuelve la keyword al final de la cola (ej. tras un bloqueo); se retoma desde `start_page`."""
+        if start_page and start_page > 1:
+            with self._retry_lock:
+                self._retry_pages[(platform, keyword)] = start_page
+        self.queues[platform].put(keyword)
+
+    def retry_page(self, platform, keyword):
+        """Página desde la que se reintenta una keyword devuelta con requeue (None si no hay)."""
+        with self._retry_lock:
+            return self._retry_pages.pop((platform, keyword), None)
+
+    def max_pages_for(self, platform, keyword):
+        """Profundidad de la pasada (None = la max_pages de la plataforma)."""
+        return None
+
+    def task_done(self, platform, keyword, new_jobs=0, pages=0, deepest_new_page=0, parked=False):
+        """Resultado de una tarea (solo lo usa el planificador del modo --daemon)."""
+        pass
+
+    def stop(self):
+        pass
+
+    def domain_slot(self, platform):
+        """Context manager: se mantiene tomado mientras dure la tarea (cortesía por dominio)."""
+        return self._domain_slots[self._platform_domains[platform]]
+
+    def total_sessions(self):
+        return sum(self.sessions_for(p) for p in self.queues)
+
+
+class PageBudget:
+    """Presupuesto global de cargas de página por hora (token bucket). Cada tarea reserva su profundidad
+    al empezar y devuelve lo que no usó al terminar."""
+
+    def __init__(self, pages_per_hour, burst=None):
+        self.rate = pages_per_hour / 3600.0
+        self.capacity = float(burst or max(pages_per_hour / 6.0, 1.0))   # ~10 minutos de presupuesto acumulable
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_take(self, pages):
+        pages = min(pages, self.capacity)
+        with self._lock:
+            self._refill()
+            if self.tokens >= pages:
+                self.tokens -= pages
+                return True
+            return False
+
+    def refund(self, pages):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + pages)
+
+    def seconds_until(self, pages):
+        pages = min(pages, self.capacity)
+        with self._lock:
+            self._refill()
+            return max(pages - self.tokens, 0.0) / self.rate if self.rate else float('inf')
+
+
+class AdaptiveScheduler(TaskScheduler):
+    """Planificador del modo --daemon: las sesiones nunca se quedan sin tareas, piden la siguiente
+    (plataforma, keyword) que ya "venció" según su rendimiento histórico (YieldStats):
+    - primero las más calientes (más ofertas nuevas por pasada)
+    - cada pasada carga a lo mucho la profundidad aprendida para el par
+    - todas juntas no pasan de `daemon.pages_per_hour` cargas de página"""
+
+    def __init__(self, config, platforms, keywords, stats, priority=None):
+        super().__init__(config, platforms, keywords)
+        d_cfg = config['general'].get('daemon', {})
+        self.stats = stats
+        self.keywords = unique_keywords(keywords)
+        self.budget = PageBudget(d_cfg.get('pages_per_hour', 300))
+        self.tick = d_cfg.get('tick_seconds', 30)
+        self.parked_delay = d_cfg.get('parked_retry_minutes', 60) * 60
+        self._in_flight = {}   # (plataforma, keyword) -> páginas reservadas
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        for name in platforms:
+            for kw in self.keywords:
+                self.stats.get(name, kw, self._platform_max(name))
+                if (name, kw) in (priority or set()):
+                    self.stats.postpone(name, kw, 0)
+
+    def _platform_max(self, platform):
+        return self.config['platforms'][platform].get('max_pages', 50)
+
+    def next_task(self, platform):
+        """Bloquea hasta que haya una keyword vencida y presupuesto para su profundidad. None al detener el daemon."""
+        max_pages = self._platform_max(platform)
+        while not self._stop.is_set():
+            wake = self.tick
+            with self._lock:
+                now = time.time()
+                due = []
+                for kw in self.keywords:
+                    if (platform, kw) in self._in_flight:
+                        continue
+                    entry = self.stats.get(platform, kw, max_pages)
+                    if entry['next_due'] <= now:
+                        due.append((-entry['ewma'], entry['next_due'], kw, entry['depth']))
+                    else:
+                        wake = min(wake, entry['next_due'] - now)
+                if due:
+                    _, _, kw, depth = min(due)
+                    if self.budget.try_take(depth):
+                        self._in_flight[(platform, kw)] = depth
+                        return kw
+                    wake = min(wake, self.budget.seconds_until(depth))
+            self._stop.wait(max(wake, 0.5))
+        return None
+
+    def max_pages_for(self, platform, keyword):
+        with self._lock:
+            return self._in_flight.get((platform, keyword))
+
+    def requeue(self, platform, keyword, start_page=None):
+        """Tras un bloqueo: se libera la reserva y el par queda vencido para reintentarse enseguida."""
+        if start_page and start_page > 1:
+            with self._retry_lock:
+                self._retry_pages[(platform, keyword)] = start_page
+        with self._lock:
+            self.budget.refund(self._in_flight.pop((platform, keyword), 0))
+
+    def task_done(self, platform, keyword, new_jobs=0, pages=0, deepest_new_page=0, parked=False):
+        with self._lock:
+            reserved = self._in_flight.pop((platform, keyword), 0)
+        self.budget.refund(max(reserved - pages, 0))
+        if parked:
+            self.stats.postpone(platform, keyword, self.parked_delay)
+            return
+        entry = self.stats.record(platform, keyword, new_jobs, pages, deepest_new_page, self._platform_max(platform))
+        logger.info(
+            f"📈 [{platform.upper()}] '{keyword}': +{new_jobs} nuevas en {pages} pág(s). "
+            f"Próxima pasada en {entry['interval'] / 60:.0f} min, hasta {entry['depth']} pág(s)."
+        )
+
+    def stop(self):
+        self._stop.set()
+
+
+def plan_tasks(config, platforms, keywords):
+    """Tareas (plataforma, keyword, pág desde, pág hasta) para la cola multi-nodo: la profundidad de cada
+    plataforma en rangos de `distributed.pages_per_task` páginas. Las que paginan con botón no pueden
+    saltar a una página, así que van en un solo rango."""
+    pages_per_task = max(int(config['general'].get('distributed', {}).get('pages_per_task', 10)), 1)
+    tasks = []
+    for name in platforms:
+        p_cfg = config['platforms'][name]
+        max_pages = p_cfg.get('max_pages', 50)
+        step = pages_per_task if p_cfg.get('pagination') and not p_cfg.get('selenium_rules', {}).get('next_button_selector') else max_pages
+        for kw in unique_keywords(keywords):
+            for start in range(1, max_pages + 1, step):
+                tasks.append((name, kw, start, min(start + step - 1, max_pages)))
+    return tasks
+
+
+class QueueScheduler(TaskScheduler):
+    """Planificador del modo worker (multi-nodo): las tareas salen de la cola compartida (TaskQueue).
+    Cada sesión trabaja una tarea a la vez; su estado vive en el hilo (threading.local), así el worker
+    de siempre (next_task -> retry_page/max_pages_for -> task_done) no cambia. Un hilo renueva los
+    leases de las tareas en curso; si el nodo muere, vencen y otro nodo las retoma."""
+
+    def __init__(self, config, platforms, task_queue, worker_id):
+        super().__init__(config, platforms, [])
+        d_cfg = config['general'].get('distributed', {})
+        self.task_queue = task_queue
+        self.worker_id = worker_id
+        self.poll = d_cfg.get('poll_seconds', 15)
+        self.parked_delay = d_cfg.get('parked_retry_minutes', 30) * 60
+        self._local = threading.local()
+        self._active = {}   # id de tarea -> tarea (para renovar leases)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _renew_leases(self):
+        while not self._stop.wait(max(self.task_queue.lease_seconds / 3, 1)):
+            with self._lock:
+                task_ids = list(self._active)
+            try:
+                self.task_queue.renew(task_ids, self.worker_id)
+            except Exception as e:
+                logger.warning(f"No se pudieron renovar los leases: {e}")
+
+    def sessions_for(self, platform):
+        wanted = max(int(self.config['platforms'][platform].get('sessions', 1)), 1)
+        return min(wanted, self.task_queue.open_tasks(platform))
+
+    def next_task(self, platform):
+        """Toma una tarea de la cola; si las que quedan las tiene otro nodo (o esperan su turno), espera
+        por si su lease vence. None cuando ya no queda nada abierto para la plataforma."""
+        while not self._stop.is_set():
+            task = self.task_queue.lease(platform, self.worker_id)
+            if task is not None:
+                self._local.task = task
+                with self._lock:
+                    self._active[task['id']] = task
+                logger.info(f"📥 [{platform.upper()}] Tarea {task['id']}: '{task['keyword']}' págs {task['next_page']}-{task['end_page']}.")
+                return task['keyword']
+            if not self.task_queue.open_tasks(platform):
+                return None
+            self._stop.wait(self.poll)
+        return None
+
+    def _finish(self):
+        task = self._local.task
+        self._local.task = None
+        with self._lock:
+            self._active.pop(task['id'], None)
+        return task
+
+    def retry_page(self, platform, keyword):
+        return self._local.task['next_page']
+
+    def max_pages_for(self, platform, keyword):
+        return self._local.task['end_page']
+
+    def record_page(self, platform, keyword, page_num, jobs):
+        """Ofertas de una página terminada -> cola compartida, junto con el checkpoint de la tarea."""
+        task = self._local.task
+        owned = self.task_queue.record_page(task['id'], self.worker_id, platform, page_num, [job.__dict__ for job in jobs])
+        if not owned and not task.get('lost'):
+            # El lease venció y la tarea ya es de otro nodo: lo scrapeado se guarda, pero el checkpoint es suyo
+            task['lost'] = True
+            logger.warning(f"⌛ [{platform.upper()}] Tarea {task['id']}: el lease venció y la tomó otro nodo.")
+        task['next_page'] = max(task['next_page'], page_num + 1)
+
+    def requeue(self, platform, keyword, start_page=None):
+        task = self._finish()
+        self.task_queue.release(task['id'], self.worker_id, next_page=start_page)
+
+    def task_done(self, platform, keyword, new_jobs=0, pages=0, deepest_new_page=0, parked=False):
+        task = self._finish()
+        if parked:
+            self.task_queue.release(task['id'], self.worker_id, delay=self.parked_delay)
+            return
+        # next_page <= end_page: la keyword se acabó antes del final del rango
+        self.task_queue.complete(task['id'], self.worker_id, ended_early=task['next_page'] <= task['end_page'])
+
+    def stop(self):
+        """Apagado del nodo: las tareas en curso vuelven a la cola para que otro nodo las tome sin esperar el lease."""
+        self._stop.set()
+        with self._lock:
+            active = list(self._active.values())
+            self._active.clear()
+        for task in active:
+            self.task_queue.release(task['id'], self.worker_id)
@@ -0,0 +1,91 @@
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class SeenIds:
+    """Servicio compartido de IDs vistos: histórico (índice en disco, solo lectura) + los reclamados en esta corrida.
+    `claim()` es un check-and-add atómico con locks por franja (lock striping): dos sesiones que encuentran
+    la misma oferta a la vez nunca la cuentan dos veces, y ningún hilo necesita copiar el histórico.
+    También lleva estadísticas de traslape entre keywords (cuántas ofertas de una keyword ya las trajo otra)."""
+
+    def __init__(self, base, stripes=64):
+        self.base = base
+        self._stripes = [({}, threading.Lock()) for _ in range(stripes)]
+        self._stats_lock = threading.Lock()
+        self._claimed = Counter()     # owner -> ofertas nuevas que reclamó
+        self._overlap = Counter()     # (owner que la vio después, owner que la reclamó) -> repetidas
+
+    def _stripe(self, job_id):
+        return self._stripes[hash(job_id) % len(self._stripes)]
+
+    def __contains__(self, job_id):
+        added, lock = self._stripe(job_id)
+        with lock:
+            if job_id in added:
+                return True
+        return job_id in self.base
+
+    def claim(self, job_id, owner=None):
+        """True si el ID es nuevo y queda reservado para `owner` (ej. (plataforma, keyword)); False si ya se conocía."""
+        added, lock = self._stripe(job_id)
+        with lock:
+            first_owner = added.get(job_id)
+            if first_owner is None and job_id not in added:
+                if job_id in self.base:
+                    return False
+                added[job_id] = owner
+                new = True
+            else:
+                new = False
+        with self._stats_lock:
+            if new:
+                self._claimed[owner] += 1
+            elif first_owner is not None and first_owner != owner:
+                self._overlap[(owner, first_owner)] += 1
+        return new
+
+    def add(self, job_id):
+        self.claim(job_id)
+
+    def forget(self, job_ids):
+        """Suelta los IDs de la corrida que ya quedaron en el histórico (--daemon, tras cada guardado):
+        `base` los responde desde el almacenamiento y las franjas no crecen sin fin.
+        Los que no llegaron al histórico (ej. casi-duplicados con action: skip) se quedan reclamados."""
+        dropped = 0
+        for job_id in job_ids:
+            if job_id not in self.base:
+                continue
+            added, lock = self._stripe(job_id)
+            with lock:
+                if added.pop(job_id, _MISSING) is not _MISSING:
+                    dropped += 1
+        return dropped
+
+    def __len__(self):
+        return len(self.base) + sum(len(added) for added, _ in self._stripes)
+
+    def overlap_report(self, top=10):
+        """Loguea cuántas ofertas repetidas aportó cada par de keywords en esta corrida."""
+        with self._stats_lock:
+            seen_total = Counter(self._claimed)
+            for (seen_by, _), count in self._overlap.items():
+                seen_total[seen_by] += count
+            overlap = self._overlap.most_common(top)
+        if not overlap:
+            return
+        logger.info("=== TRASLAPE ENTRE KEYWORDS (esta corrida) ===")
+        for (seen_by, owner), count in overlap:
+            total = seen_total[seen_by]
+            logger.info(f"  {_label(seen_by)} repitió {count} oferta(s) ya traídas por {_label(owner)} "
+                        f"({count / max(total, 1):.0%} de lo que encontró)")
+
+
+def _label(owner):
+    if isinstance(owner, tuple):
+        return "/".join(str(part) for part in owner)
+    return str(owner)
@@ -1,111 +1,163 @@
-import time
+"""Punto de entrada: python main.py <comando> [--config config.yaml]
+
+Solo importa lo liviano (argparse, yaml, logging); cada comando importa lo que usa, así `--help`,
+`validate-config` o una corrida sin plataformas habilitadas no cargan selenium, docker ni pandas.
+Sin comando (o empezando con una opción) se asume `run`: `python main.py --resume` sigue funcionando."""
+import sys
 import argparse
 import logging
-import threading
-import concurrent.futures
 
-from core.config_loader import load_config
+from core.config_loader import load_config, validate_config, ConfigError
 from core.logger import setup_logger
-from core.filter import merge_processed_titles
-
-from utils.selenium_utils import setup_driver
-from utils.docker_utils import SeleniumContainerManager
-from storage.csv_handler import CSVHandler
+from storage.base import STORAGE_BACKENDS
 
-from scrapers.generic import GenericScraper
+COMMANDS = ('run', 'validate-config', 'stats', 'compact', 'rebuild-index', 'migrate', 'stop-containers', 'coordinator', 'worker')
 
-# Silenciar los logs molestos de reconexión de Selenium cuando matamos el contenedor
-logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
-logging.getLogger("selenium.webdriver.remote.remote_connection").setLevel(logging.ERROR)
 
-def scraper_worker(scraper_name, config, keywords, shared_job_ids, shared_results, shared_titles, data_lock):
+def cmd_run(config, args):
     logger = logging.getLogger(__name__)
-    container_manager = None
-    driver = None
-    
-    try:
-        # Aquí pasamos el scraper_name
-        container_manager = SeleniumContainerManager(scraper_name=scraper_name, image_name=config['selenium']['image'])
-        command_executor_url = container_manager.start()
-        
-        driver = setup_driver(command_executor_url)
-        if not driver:
-            raise Exception("No se pudo conectar al driver remoto.")
-
-        scraper = GenericScraper(config, scraper_name, driver)
-
-        scraper.initialize_session()
-
-        for kw in keywords:
-            local_job_ids = set(shared_job_ids)
-            jobs_encontrados, titulos_procesados = scraper.scrape_keyword(kw, local_job_ids)
-            
-            with data_lock:
-                shared_results.extend(jobs_encontrados)
-                merge_processed_titles(shared_titles, titulos_procesados)
-                for j in jobs_encontrados:
-                    shared_job_ids.add(j.job_id)
-            
-            time.sleep(config['timing']['delay_between_keywords'])
-
-    except Exception as e:
-        # Solo imprimimos el error si NO fue porque apagamos el contenedor a la fuerza
-        if "Max retries exceeded" not in str(e) and "Connection refused" not in str(e):
-            logger.error(f"[{scraper_name.upper()}] Error crítico: {e}", exc_info=True)
-    finally:
-        if driver:
-            try: driver.quit()
-            except: pass
-        if container_manager:
-            container_manager.stop()
-
-def main(config_path):
-    config = load_config(config_path)
-    logger = setup_logger()
-    
-    storage = CSVHandler(config['general']['output_filename'], config['general']['final_columns_to_save'])
-    shared_job_ids = storage.get_existing_ids()
-
-    shared_results = []
-    shared_titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
-    
-    data_lock = threading.Lock()
-
-    scrapers_activos = [k for k, v in config['platforms'].items() if v.get('enabled', False)]
-    
-    if not scrapers_activos:
+    # Flags de antes de los subcomandos (python main.py --compact ...)
+    if args.compact or args.rebuild_index:
+        return cmd_compact(config, args)
+    if args.migrate:
+        return cmd_migrate(config, args)
+    if args.stop_containers:
+        return cmd_stop_containers(config, args)
+    if not args.replay and not any(p.get('enabled', False) for p in config['platforms'].values()):
         logger.info("No hay plataformas habilitadas en config.yaml.")
         return
 
-    logger.info(f"=== INICIANDO SCRAPING ({len(scrapers_activos)} hilos/contenedores) ===")
+    from core import runner
+    run_kwargs = dict(resume=args.resume, replay=args.replay, daemon=args.daemon)
+    if args.profile:
+        runner.run_profiled(args.profile, config, **run_kwargs)
+    else:
+        runner.run(config, **run_kwargs)
+
+
+def cmd_coordinator(config, args):
+    from core import runner
+    runner.run_coordinator(config, enqueue=not args.no_enqueue)
+
 
-    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(scrapers_activos))
+def cmd_worker(config, args):
+    from core import runner
+    runner.run_worker(config)
+
+
+def cmd_validate_config(config, args):
+    logger = logging.getLogger(__name__)
+    enabled = [name.upper() for name, p in config['platforms'].items() if p.get('enabled', False)]
+    logger.info(f"✅ Configuración válida: {len(config['search_filters']['search_keywords'])} keyword(s), "
+                f"plataformas habilitadas: {', '.join(enabled) or 'ninguna'}.")
+
+
+def cmd_stats(config, args):
+    """Resumen del histórico guardado y de lo pendiente entre corridas."""
+    from storage.base import create_storage
+    from storage.journal import RunJournal
+    from storage.parked_keywords import ParkedKeywords
+    logger = logging.getLogger(__name__)
+
+    storage = create_storage(config)
     try:
-        futuros = []
-        for name in scrapers_activos:
-            futuros.append(executor.submit(
-                scraper_worker, 
-                name, config, config['search_filters']['search_keywords'], 
-                shared_job_ids, shared_results, shared_titles, data_lock
-            ))
-
-        for futuro in concurrent.futures.as_completed(futuros):
-            futuro.result() 
-
-    except KeyboardInterrupt:
-        logger.warning("🛑 Interrupción por teclado (Ctrl+C) detectada. Apagando sistema...")
-        executor.shutdown(wait=False, cancel_futures=True)
-        # Aquí el script terminará y 'atexit' de docker_utils matará los contenedores de forma limpia.
-        return
+        df = storage.load_jobs(columns=['platform', 'timestamp_found'])
+    finally:
+        storage.close()
+    logger.info(f"📦 {len(df)} ofertas en el almacenamiento '{storage.name}'.")
+    if len(df):
+        summary = df.groupby('platform')['timestamp_found'].agg(['count', 'max'])
+        for platform, row in summary.sort_values('count', ascending=False).iterrows():
+            logger.info(f"  {str(platform):<12} {row['count']:>8}  última: {row['max']}")
+
+    journal_path = config['general'].get('journal_file', 'run_journal.jsonl')
+    journal = RunJournal(journal_path)
+    if journal.has_data():
+        logger.info(f"♻️ Journal pendiente en '{journal_path}': se recupera en la siguiente corrida (--resume para continuarla).")
+    journal.close()
+    parked = ParkedKeywords.from_config(config)
+    if len(parked):
+        logger.info(f"🅿️ {len(parked)} keyword(s) estacionadas en '{parked.path}'.")
+
+
+def cmd_compact(config, args):
+    from storage.base import create_storage
+    storage = create_storage(config)
+    try:
+        storage.rebuild_index() if args.command == 'rebuild-index' or getattr(args, 'rebuild_index', False) else storage.compact()
+    finally:
+        storage.close()
+
+
+def cmd_migrate(config, args):
+    from storage.base import migrate_storage
+    source, target = args.migrate if args.command == 'run' else (args.source, args.target)
+    migrate_storage(config, source, target)
+
+
+def cmd_stop_containers(config, args):
+    from utils.docker_utils import stop_pool_containers
+    stop_pool_containers(config['selenium'].get('pool', {}).get('name', 'default'))
+
+
+HANDLERS = {
+    'run': cmd_run, 'validate-config': cmd_validate_config, 'stats': cmd_stats, 'compact': cmd_compact,
+    'rebuild-index': cmd_compact, 'migrate': cmd_migrate, 'stop-containers': cmd_stop_containers,
+    'coordinator': cmd_coordinator, 'worker': cmd_worker,
+}
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", type=str, default="config.yaml")
+
+    parser = argparse.ArgumentParser(description="Scraper de ofertas de trabajo (OCC, Indeed, LinkedIn).")
+    commands = parser.add_subparsers(dest="command", metavar="COMANDO")
+
+    run = commands.add_parser("run", parents=[common], help="Scrapea las keywords de las plataformas habilitadas (por defecto).")
+    run.add_argument("--resume", action="store_true", help="Retoma la corrida interrumpida desde el último checkpoint del journal.")
+    run.add_argument("--replay", action="store_true", help="Re-parsea las páginas del caché (general.page_cache) sin abrir navegador.")
+    run.add_argument("--daemon", action="store_true",
+                     help="Corre sin parar: revisa cada (plataforma, keyword) según su rendimiento, con presupuesto de páginas por hora.")
+    run.add_argument("--profile", nargs="?", const="run.prof", default=None, metavar="ARCHIVO",
+                     help="Corre todo bajo cProfile y guarda el perfil (por defecto run.prof).")
+    # Compatibilidad con los flags de antes de los subcomandos
+    run.add_argument("--compact", action="store_true", help=argparse.SUPPRESS)
+    run.add_argument("--rebuild-index", action="store_true", help=argparse.SUPPRESS)
+    run.add_argument("--migrate", nargs=2, choices=STORAGE_BACKENDS, help=argparse.SUPPRESS)
+    run.add_argument("--stop-containers", action="store_true", help=argparse.SUPPRESS)
+
+    coordinator = commands.add_parser("coordinator", parents=[common],
+                                      help="Multi-nodo: reparte las tareas en la cola compartida (general.distributed) y junta los resultados.")
+    coordinator.add_argument("--no-enqueue", action="store_true", help="No abre una ronda nueva: solo junta lo que dejen los workers.")
+    commands.add_parser("worker", parents=[common], help="Multi-nodo: toma tareas de la cola compartida con los contenedores de este host.")
+    commands.add_parser("validate-config", parents=[common],
+                        help="Valida config.yaml (esquema, selectores CSS y regex) sin scrapear.")
+    commands.add_parser("stats", parents=[common], help="Ofertas guardadas por plataforma y pendientes (journal, estacionadas).")
+    commands.add_parser("compact", parents=[common], help="Compacta el almacenamiento (CSV: deduplica y reescribe).")
+    commands.add_parser("rebuild-index", parents=[common], help="Reconstruye el índice de IDs (<csv>.idx) desde el CSV.")
+    migrate = commands.add_parser("migrate", parents=[common], help="Copia las ofertas entre backends (csv, sqlite, parquet).")
+    migrate.add_argument("source", metavar="ORIGEN", choices=STORAGE_BACKENDS)
+    migrate.add_argument("target", metavar="DESTINO", choices=STORAGE_BACKENDS)
+    commands.add_parser("stop-containers", parents=[common], help="Elimina los contenedores calientes del pool (selenium.pool.keep_warm).")
+    return parser
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'run')
+    args = build_parser().parse_args(argv)
+    logger = setup_logger()
+    try:
+        # El config se valida completo (selectores y regex incluidos) antes de levantar cualquier contenedor
+        config = validate_config(load_config(args.config))
+    except ConfigError as e:
+        logger.error(str(e))
+        return 1
+    HANDLERS[args.command](config, args)
+    return 0
 
-    logger.info("=== TODOS LOS SCRAPERS TERMINARON ===")
-    if shared_results:
-        storage.save_jobs([job.__dict__ for job in shared_results])
-    else:
-        logger.info("No hay nuevas ofertas para guardar.")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", type=str, default="config.yaml")
-    args = parser.parse_args()
-    main(args.config)
\ No newline at end of file
+    sys.exit(main())
@@ -7,6 +7,6 @@ class BaseScraper(ABC):
         self.cfg = config['platforms'][platform_name] # Configuración específica de la plataforma
 
     @abstractmethod
-    def scrape_keyword(self, keyword: str, found_job_ids: set):
+    def scrape_keyword(self, keyword: str, found_job_ids: set, start_page: int = 1, on_page=None):
         """Debe retornar (lista_de_JobOffers, diccionario_de_titulos_procesados)"""
         pass
\ No newline at end of file
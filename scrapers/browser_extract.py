@@ -0,0 +1,119 @@
+"""Extracción de tarjetas DENTRO del navegador con un solo `execute_async_script`.
+
+En lugar de traer `page_source` completo por Remote WebDriver en cada revisión, el script:
+1. espera (MutationObserver, sin polling desde Python) a que aparezca `wait_for_selector`,
+   el texto de "sin resultados" o un challenge,
+2. extrae los valores crudos de cada campo de cada tarjeta y los marcadores de paginación,
+3. regresa solo eso (unos KB) a Python, donde se aplican las regex compiladas del ExtractionPlan.
+"""
+
+WAIT_AND_EXTRACT_JS = r"""
+const spec = arguments[0];
+const done = arguments[arguments.length - 1];
+const deadline = Date.now() + spec.timeout_ms;
+
+// Igual que BeautifulSoup.get_text(strip=True): ignora <script>/<style>/<template>
+function textOf(el) {
+    const parts = [];
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, {
+        acceptNode(node) {
+            for (let p = node.parentNode; p && p !== el.parentNode; p = p.parentNode) {
+                const tag = p.nodeName;
+                if (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'TEMPLATE') return NodeFilter.FILTER_REJECT;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    while (walker.nextNode()) {
+        const t = walker.currentNode.nodeValue.trim();
+        if (t) parts.push(t);
+    }
+    return parts.join('');
+}
+
+function rawField(card, rule) {
+    if (!rule) return null;
+    const target = rule.selector ? card.querySelector(rule.selector) : card;
+    if (!target) return null;
+    return rule.attribute ? target.getAttribute(rule.attribute) : textOf(target);
+}
+
+// Marcadores baratos del challenge (sin serializar el DOM): URL, título y el contenedor de Cloudflare
+function isChallengeMarker() {
+    const title = (document.title || '').toLowerCase();
+    return location.href.toLowerCase().includes('challenge') || title.includes('just a moment')
+        || title.includes('security check') || !!document.querySelector('[id*="cf-wrapper"], [class*="cf-wrapper"]');
+}
+
+// Texto plano del body: textContent no serializa el DOM (outerHTML) ni fuerza layout (innerText)
+function bodyText() {
+    return document.body ? document.body.textContent.toLowerCase() : '';
+}
+
+function isReady() {
+    return spec.wait_selectors.some(sel => document.querySelector(sel));
+}
+
+function paginationLoaded() {
+    for (const el of document.querySelectorAll('[class]')) {
+        const cls = (el.getAttribute('class') || '').toLowerCase();
+        if (cls.includes('pagination') || cls.includes('serp-page')) return true;
+    }
+    return false;
+}
+
+function extract() {
+    const cards = Array.from(document.querySelectorAll(spec.card));
+    const rows = cards.map(card => {
+        const row = {};
+        for (const [name, rule] of Object.entries(spec.fields)) row[name] = rawField(card, rule);
+        return row;
+    });
+    let stop = false;
+    if (spec.stop_present && document.querySelector(spec.stop_present)) stop = true;
+    if (!stop && spec.stop_missing && paginationLoaded() && !document.querySelector(spec.stop_missing)) stop = true;
+    return {status: 'ready', cards: rows, stop_pagination: stop};
+}
+
+const noResultsText = (spec.no_results_text || '').toLowerCase();
+
+function check() {
+    if (isChallengeMarker()) return {status: 'challenge'};
+    if (spec.wait_selectors.length && isReady()) return spec.extract ? extract() : {status: 'ready'};
+    // El texto solo se revisa mientras la página aún no está lista
+    const text = bodyText();
+    if (text.includes('security check') || text.includes('just a moment')) return {status: 'challenge'};
+    if (noResultsText && text.includes(noResultsText)) return {status: 'no_results'};
+    return null;
+}
+
+const first = check();
+if (first) { done(first); return; }
+
+let finished = false;
+let scheduled = false;
+function finish(res) {
+    finished = true;
+    observer.disconnect();
+    clearInterval(timer);
+    done(res);
+}
+// Las mutaciones se agrupan: como mucho una revisión cada 100 ms
+const observer = new MutationObserver(() => {
+    if (finished || scheduled) return;
+    scheduled = true;
+    setTimeout(() => {
+        scheduled = false;
+        if (finished) return;
+        const res = check();
+        if (res) finish(res);
+    }, 100);
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+// Red de seguridad por si la página no dispara mutaciones (o se cumple el tiempo)
+const timer = setInterval(() => {
+    if (finished) return;
+    const res = check();
+    if (res || Date.now() > deadline) finish(res || {status: 'timeout'});
+}, 500);
+"""
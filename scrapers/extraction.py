@@ -0,0 +1,177 @@
+import re
+from dataclasses import dataclass, field
+
+import lxml.html
+from lxml import etree
+from cssselect import HTMLTranslator
+
+NOT_SPECIFIED = "No especificado"
+
+# Igual que BeautifulSoup: el texto de <script>/<style>/<template> no cuenta en get_text()
+_TEXT_XPATH = etree.XPath(
+    "descendant-or-self::text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+)
+_PAGINATION_XPATH = etree.XPath(
+    "//*[contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'pagination') "
+    "or contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'serp-page')][1]"
+)
+
+_translator = HTMLTranslator()
+
+
+def compile_css(css, include_self=False):
+    """Traduce un selector CSS a un XPath compilado de lxml.
+    Por defecto solo busca en descendientes, igual que soup.select() / select_one()."""
+    prefix = 'descendant-or-self::' if include_self else 'descendant::'
+    return etree.XPath(_translator.css_to_xpath(css, prefix=prefix))
+
+
+def element_text(element):
+    """Equivalente a BeautifulSoup.get_text(strip=True)."""
+    return "".join(s.strip() for s in _TEXT_XPATH(element) if s.strip())
+
+
+class FieldRule:
+    """Regla de extracción de un campo ya compilada (selector, atributo y regex)."""
+
+    def __init__(self, rules):
+        self.enabled = bool(rules) and rules != "NONE"
+        self.selector = None
+        self.xpath = None
+        self.attribute = None
+        self.regex = None
+        if not self.enabled:
+            return
+        if 'selector' in rules:
+            self.selector = rules['selector']
+            self.xpath = compile_css(rules['selector'])
+        self.attribute = rules.get('attribute')
+        if 'regex' in rules:
+            self.regex = re.compile(rules['regex'])
+
+    def extract(self, element):
+        if not self.enabled: return NOT_SPECIFIED
+        if self.xpath is not None:
+            matches = self.xpath(element)
+            if not matches: return NOT_SPECIFIED
+            target = matches[0]
+        else:
+            target = element
+
+        return self.finalize(target.get(self.attribute) if self.attribute else element_text(target))
+
+    def finalize(self, val):
+        """Aplica la regex al valor crudo (sirve también para valores extraídos en el navegador)."""
+        if not val: return NOT_SPECIFIED
+
+        if self.regex is not None:
+            match = self.regex.search(val)
+            if match:
+                return match.group(1) if match.groups() else match.group(0)
+        return val
+
+
+@dataclass
+class PageResult:
+    """Resultado de extraer una página: campos de cada tarjeta + marcadores de paginación."""
+    cards: list = field(default_factory=list)   # dict de campos por tarjeta, o None si no se pudo parsear
+    card_count: int = 0                          # tarjetas encontradas en el HTML
+    stop_pagination: bool = False                # algún marcador de fin de paginación se activó
+    verdicts: list = None                        # (valido, motivo, palabra) por tarjeta si ya se filtró en otro proceso
+    timings: dict = None                         # segundos de parseo/filtro medidos en el proceso hijo
+
+
+class ExtractionPlan:
+    """Compila una sola vez el bloque `selectors`/`selenium_rules` de una plataforma
+    y extrae todos los campos de todas las tarjetas en una sola pasada sobre el árbol lxml."""
+
+    def __init__(self, platform_cfg):
+        selectors = platform_cfg['selectors']
+        sel_rules = platform_cfg.get('selenium_rules', {})
+
+        self.card_css = selectors['card']
+        self.card_xpath = compile_css(selectors['card'])
+        self.fields = {
+            'job_id': FieldRule(selectors['job_id']),
+            'title': FieldRule(selectors['title']),
+            'company': FieldRule(selectors['company']),
+            'salary': FieldRule(selectors.get('salary', 'NONE')),
+        }
+
+        wait_sel = sel_rules.get('wait_for_selector', '')
+        self.wait_css = [s.strip() for s in wait_sel.split(',')] if wait_sel else []
+        self.wait_xpaths = [compile_css(s) for s in self.wait_css]
+
+        self.stop_present_css = sel_rules.get('stop_pagination_if_present')
+        self.stop_present_xpath = compile_css(self.stop_present_css) if self.stop_present_css else None
+        self.stop_missing_css = sel_rules.get('stop_pagination_if_missing')
+        self.stop_missing_xpath = compile_css(self.stop_missing_css) if self.stop_missing_css else None
+
+    def browser_spec(self, no_results_text='', timeout=30, extract=True):
+        """Reglas en formato JSON para el script de extracción dentro del navegador (ver browser_extract)."""
+        fields = {
+            name: {'selector': rule.selector, 'attribute': rule.attribute} if rule.enabled else None
+            for name, rule in self.fields.items()
+        }
+        return {
+            'card': self.card_css, 'fields': fields, 'wait_selectors': self.wait_css,
+            'stop_present': self.stop_present_css, 'stop_missing': self.stop_missing_css,
+            'no_results_text': no_results_text or '', 'timeout_ms': int(timeout * 1000), 'extract': extract,
+        }
+
+    def page_from_browser(self, result):
+        """Convierte la respuesta del navegador (valores crudos) en el mismo PageResult que extract_page()."""
+        rows = result.get('cards') or []
+        return PageResult(
+            cards=[self._build_card(lambda name, row=row: self._finalize_raw(name, row.get(name))) for row in rows],
+            card_count=len(rows),
+            stop_pagination=bool(result.get('stop_pagination')),
+        )
+
+    def _finalize_raw(self, name, raw):
+        rule = self.fields[name]
+        return rule.finalize(raw) if rule.enabled else NOT_SPECIFIED
+
+    @staticmethod
+    def parse_document(html):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml no acepta str con declaración de encoding (<?xml ... encoding=...?>)
+            return lxml.html.document_fromstring(html.encode('utf-8'))
+
+    def is_ready(self, root):
+        """¿Ya cargó alguno de los selectores de `wait_for_selector`?"""
+        return any(xp(root) for xp in self.wait_xpaths)
+
+    def extract_card(self, card):
+        return self._build_card(lambda name: self.fields[name].extract(card))
+
+    def _build_card(self, get_field):
+        job_id = get_field('job_id')
+        if job_id == NOT_SPECIFIED: return None
+
+        title = get_field('title')
+        company = get_field('company')
+        salary = get_field('salary')
+        if title == NOT_SPECIFIED: return None
+
+        return {'job_id': job_id, 'title': title, 'company': company, 'salary': salary}
+
+    def should_stop(self, root):
+        # --- DETECCIÓN VISUAL DE FIN DE PAGINACIÓN ---
+        if self.stop_present_xpath is not None and self.stop_present_xpath(root):
+            return True
+        if self.stop_missing_xpath is not None:
+            if _PAGINATION_XPATH(root) and not self.stop_missing_xpath(root):
+                return True
+        return False
+
+    def extract_page(self, html_or_root):
+        root = self.parse_document(html_or_root) if isinstance(html_or_root, (str, bytes)) else html_or_root
+        cards = self.card_xpath(root)
+        return PageResult(
+            cards=[self.extract_card(card) for card in cards],
+            card_count=len(cards),
+            stop_pagination=self.should_stop(root),
+        )
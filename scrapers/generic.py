@@ -1,22 +1,83 @@
-import re
 import time
 import logging
-from bs4 import BeautifulSoup
 from datetime import datetime
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
 
 from .base import BaseScraper
+from .extraction import ExtractionPlan
+from .browser_extract import WAIT_AND_EXTRACT_JS
+from core import metrics
 from core.models import JobOffer
-from core.filter import filter_job_by_title
-from utils.selenium_utils import close_cookie_popup, block_heavy_content, apply_stealth, load_cookies
+from core.filter import get_title_filter
+from core.rate_limiter import get_rate_limiter
+from core.circuit_breaker import BlockedError, breaker_config
+from utils.selenium_utils import close_cookie_popup, block_heavy_content, apply_stealth, load_cookies, resource_blocking, network_usage
+from utils.http_utils import HttpFetcher, BLOCK_STATUS_CODES
 
 logger = logging.getLogger(__name__)
 
 class GenericScraper(BaseScraper):
-    def __init__(self, config, platform_name, driver):
+    def __init__(self, config, platform_name, driver=None, driver_factory=None, parse_stage=None, page_cache=None, crawl_state=None):
+        """`driver_factory` crea el navegador bajo demanda (modos http/auto solo lo levantan si hace falta).
+        `parse_stage` (opcional) manda el parseo + filtro de cada página a un pool de procesos.
+        `page_cache` (opcional) guarda el HTML de cada página para re-parsearlo después con --replay.
+        `crawl_state` (opcional) activa el modo incremental: corta la paginación al llegar a ofertas ya conocidas."""
         super().__init__(config, platform_name)
         self.driver = driver
+        self.driver_factory = driver_factory
+        self.parse_stage = parse_stage
+        self.page_cache = page_cache
+        self.crawl_state = crawl_state
+        self.current_keyword = ''
         self.p_cfg = self.config['platforms'][self.platform_name]
+        # http | selenium | auto (http primero; navegador solo si se detecta challenge o HTTP falla seguido)
+        self.fetch_mode = self.p_cfg.get('fetch_mode', 'selenium')
+        self.http = HttpFetcher(self.config, self.platform_name) if self.fetch_mode in ('http', 'auto') else None
+        self.browser_fallback = False
+        self.http_misses = 0           # Páginas seguidas sin tarjetas o con error de red por HTTP
+        self.http_worked = False       # HTTP ya trajo tarjetas de esta plataforma alguna vez
+        self.http_fallback_after = self.p_cfg.get('http_fallback_after', 3)
+        # Selectores y regex compilados una sola vez por scraper
+        self.plan = ExtractionPlan(self.p_cfg)
+        self.title_filter = get_title_filter(self.config['search_filters'])
+        # Todas las navegaciones al dominio pasan por aquí (compartido entre sesiones)
+        self.rate_limiter = get_rate_limiter(self.platform_name, self.p_cfg)
+        # Bloqueo de recursos por CDP (general.resource_blocking + lo de la plataforma)
+        self.blocking = resource_blocking(self.config, self.platform_name)
+        # Límites de espera antes de dar la sesión por bloqueada (el breaker vive en el worker)
+        self.breaker_cfg = breaker_config(self.config, self.platform_name)
+
+    def _labels(self):
+        return {'platform': self.platform_name, 'keyword': self.current_keyword}
+
+    def _throttle(self):
+        metrics.observe('rate_limit_wait', self.rate_limiter.acquire(), **self._labels())
+
+    def _navigate(self, url):
+        self._throttle()
+        with metrics.timer('navigate', **self._labels()):
+            self.driver.get(url)
+
+    def _page_source(self):
+        with metrics.timer('page_source', **self._labels()):
+            html = self.driver.page_source
+        metrics.observe('page_source_bytes', len(html), 'bytes', **self._labels())
+        return html
+
+    def ensure_browser(self):
+        """Levanta el navegador (si aún no existe) e inicializa la sesión."""
+        if self.driver is None:
+            if self.driver_factory is None:
+                raise RuntimeError(f"[{self.platform_name.upper()}] Se necesita navegador pero no hay driver_factory.")
+            self.driver = self.driver_factory()
+            self.initialize_session()
+        return self.driver
+
+    def close(self):
+        if self.http is not None:
+            self.http.close()
 
     def initialize_session(self):
         """Se ejecuta UNA SOLA VEZ cuando el contenedor nace."""
@@ -29,34 +90,36 @@ class GenericScraper(BaseScraper):
         # Usamos una URL genérica tonta (como un 404 o robots.txt) para no alertar al servidor
         base_url = self.p_cfg['base_url']
         domain = "/".join(base_url.split('/')[:3]) 
-        self.driver.get(domain + "/robots.txt")
-        time.sleep(1)
+        self._navigate(domain + "/robots.txt")
         
-        # 3. Inyectamos cookies e instruimos bloqueo de imágenes
+        # 3. Inyectamos cookies y bloqueamos lo que no se parsea (imágenes, fuentes, analítica...)
         load_cookies(self.driver, self.platform_name)
-        block_heavy_content(self.driver)
-
-    def _extract_field(self, soup_element, rules):
-        if not rules or rules == "NONE": return "No especificado"
-        target = soup_element.select_one(rules['selector']) if 'selector' in rules else soup_element
-        if not target: return "No especificado"
+        block_heavy_content(self.driver, self.blocking)
+        # Lo que se descargó al entrar al dominio no cuenta para la primera página
+        if self.blocking.get('accounting', False):
+            network_usage(self.driver)
 
-        val = target.get(rules['attribute']) if 'attribute' in rules else target.get_text(strip=True)
-        if not val: return "No especificado"
+    def _check_blocked(self, waited, challenge_since):
+        """Lanza BlockedError si el challenge dura más de `challenge_timeout` o la carga más de `load_timeout`."""
+        challenge_timeout = self.breaker_cfg.get('challenge_timeout', 90)
+        load_timeout = self.breaker_cfg.get('load_timeout', 180)
+        if challenge_since is not None and challenge_timeout and time.monotonic() - challenge_since >= challenge_timeout:
+            raise BlockedError(self.platform_name, 'challenge', waited)
+        if load_timeout and waited >= load_timeout:
+            raise BlockedError(self.platform_name, 'timeout', waited)
 
-        if 'regex' in rules:
-            match = re.search(rules['regex'], val)
-            if match:
-                return match.group(1) if match.groups() else match.group(0)
-        return val
+    def _is_challenge(self, html, url):
+        html_lower = html.lower()
+        return "cf-wrapper" in html or "challenge" in url or "security check" in html_lower or "just a moment" in html_lower
 
     def _get_html_selenium(self, url=None):
         sel_rules = self.p_cfg.get('selenium_rules', {})
+        poll_interval = sel_rules.get('poll_interval', 1.0)
         html = None
         
         if url:
             # Como ya inyectamos cookies en initialize_session, solo navegamos directo
-            self.driver.get(url)
+            self._navigate(url)
             
             # --- APLICAR ZOOM CONFIGURABLE ---
             zoom_level = sel_rules.get('browser_zoom', 1.0)
@@ -64,44 +127,42 @@ class GenericScraper(BaseScraper):
                 percentage = int(zoom_level * 100)
                 logger.info(f"🔍 [{self.platform_name.upper()}] Aplicando zoom del {percentage}%...")
                 self.driver.execute_script(f"document.body.style.zoom='{percentage}%'")
-            
-            time.sleep(2)
 
-        wait_seconds = 0
+        start_time = time.monotonic()
+        next_block_log = 0
+        next_wait_log = 60
+        challenged = False
+        challenge_since = None
         while True:
             # Re-aplicar zoom si la plataforma resetea el body al navegar
             zoom_level = sel_rules.get('browser_zoom', 1.0)
             if zoom_level != 1.0:
                 self.driver.execute_script(f"document.body.style.zoom='{int(zoom_level * 100)}%'")
 
-            current_html = self.driver.page_source
+            current_html = self._page_source()
             current_url = self.driver.current_url.lower()
+            waited = time.monotonic() - start_time
             
             try: close_cookie_popup(self.driver, None)
             except: pass
 
-            if "cf-wrapper" in current_html or "challenge" in current_url or "security check" in current_html.lower() or "just a moment" in current_html.lower():
-                if wait_seconds % 15 == 0:
-                    logger.warning(f"🚨 [{self.platform_name.upper()}] Bloqueo detectado. ({wait_seconds}s)")
+            if self._is_challenge(current_html, current_url):
+                if not challenged:
+                    # Bloqueo en esta carga: el limitador del dominio frena
+                    challenged = True
+                    self.rate_limiter.on_challenge()
+                if challenge_since is None:
+                    challenge_since = time.monotonic()
+                if waited >= next_block_log:
+                    logger.warning(f"🚨 [{self.platform_name.upper()}] Bloqueo detectado. ({int(waited)}s)")
+                    next_block_log += 15
             else:
-                soup = BeautifulSoup(current_html, 'lxml')
-                wait_sel = sel_rules.get('wait_for_selector', '')
-                selectors = [s.strip() for s in wait_sel.split(',')] if wait_sel else []
-                
-                if wait_sel and any(soup.select(sel) for sel in selectors):
-                    scroll_pane = sel_rules.get('scroll_pane_selector')
-                    if scroll_pane:
-                        try:
-                            pane = self.driver.find_element(By.CSS_SELECTOR, scroll_pane)
-                            last_height = self.driver.execute_script("return arguments[0].scrollHeight", pane)
-                            for _ in range(5):
-                                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", pane)
-                                time.sleep(1.5)
-                                new_height = self.driver.execute_script("return arguments[0].scrollHeight", pane)
-                                if new_height == last_height: break
-                                last_height = new_height
-                        except: pass
-                    html = self.driver.page_source
+                challenge_since = None
+                if self.plan.wait_xpaths and self.plan.is_ready(self.plan.parse_document(current_html)):
+                    self._scroll_results_pane()
+                    html = self._page_source()
+                    if not challenged:
+                        self.rate_limiter.on_success()
                     break
                     
                 no_res = sel_rules.get('no_results_text', 'xxxxxx')
@@ -109,33 +170,294 @@ class GenericScraper(BaseScraper):
                     logger.info(f"[{self.platform_name.upper()}] No hay resultados en esta página.")
                     break
                 
-            time.sleep(4)
-            wait_seconds += 4
-            if wait_seconds > 0 and wait_seconds % 60 == 0:
+            self._check_blocked(waited, challenge_since)
+            time.sleep(poll_interval)
+            if time.monotonic() - start_time >= next_wait_log:
                 logger.warning(f"⏳ [{self.platform_name.upper()}] Sigue esperando carga...")
-            
+                next_wait_log += 60
+
+        metrics.observe('wait', time.monotonic() - start_time, **self._labels())
         return html
 
-    def parse_job_card(self, card_soup):
-        selectors = self.p_cfg['selectors']
-        job_id = self._extract_field(card_soup, selectors['job_id'])
-        if job_id == "No especificado": return None
+    def _cache_page(self, cache_key, url, html):
+        if self.page_cache is None or cache_key is None or not html:
+            return
+        keyword, page_num = cache_key
+        try:
+            self.page_cache.put(self.platform_name, keyword, page_num, url or self.driver.current_url, html)
+        except Exception as e:
+            logger.warning(f"[{self.platform_name.upper()}] No se pudo guardar la pág {page_num} en caché: {e}")
+
+    def _get_page_browser(self, url=None, cache_key=None):
+        """Modo `extraction: browser`: espera y extrae dentro del navegador con un solo execute_async_script.
+        Solo viajan los valores de las tarjetas, nunca el page_source completo."""
+        sel_rules = self.p_cfg.get('selenium_rules', {})
+        poll_interval = sel_rules.get('poll_interval', 1.0)
+        wait_timeout = sel_rules.get('browser_wait_timeout', 30)
+
+        if url:
+            self._navigate(url)
+
+        has_scroll = bool(sel_rules.get('scroll_pane_selector'))
+        spec = self.plan.browser_spec(sel_rules.get('no_results_text', ''), timeout=wait_timeout, extract=not has_scroll)
+        self.driver.set_script_timeout(wait_timeout + 10)
+
+        start_time = time.monotonic()
+        next_block_log = 0
+        challenged = False
+        challenge_since = None
+        while True:
+            zoom_level = sel_rules.get('browser_zoom', 1.0)
+            if zoom_level != 1.0:
+                self.driver.execute_script(f"document.body.style.zoom='{int(zoom_level * 100)}%'")
+
+            try: close_cookie_popup(self.driver, None)
+            except: pass
+
+            with metrics.timer('browser_extract', **self._labels()):
+                result = self.driver.execute_async_script(WAIT_AND_EXTRACT_JS, spec) or {}
+            status = result.get('status')
+            waited = time.monotonic() - start_time
+
+            if status == 'challenge':
+                if not challenged:
+                    challenged = True
+                    self.rate_limiter.on_challenge()
+                if challenge_since is None:
+                    challenge_since = time.monotonic()
+                if waited >= next_block_log:
+                    logger.warning(f"🚨 [{self.platform_name.upper()}] Bloqueo detectado. ({int(waited)}s)")
+                    next_block_log += 15
+                self._check_blocked(waited, challenge_since)
+                time.sleep(poll_interval)
+            elif status == 'no_results':
+                metrics.observe('wait', waited, **self._labels())
+                logger.info(f"[{self.platform_name.upper()}] No hay resultados en esta página.")
+                return None
+            elif status == 'ready':
+                metrics.observe('wait', waited, **self._labels())
+                if has_scroll:
+                    self._scroll_results_pane()
+                    result = self.driver.execute_async_script(WAIT_AND_EXTRACT_JS, dict(spec, extract=True)) or {}
+                if not challenged:
+                    self.rate_limiter.on_success()
+                # En este modo el HTML no viaja; solo se trae si se pidió grabarlo
+                if self.page_cache is not None and sel_rules.get('cache_browser_pages', False):
+                    self._cache_page(cache_key, url, self._page_source())
+                return self.plan.page_from_browser(result)
+            else:
+                challenge_since = None
+                logger.warning(f"⏳ [{self.platform_name.upper()}] Sigue esperando carga... ({int(waited)}s)")
+                self._check_blocked(waited, challenge_since)
+
+    def _get_page_http(self, url, cache_key=None):
+        """Retorna (PageResult | None, motivo). motivo: ready, no_results, challenge, no_cards, error."""
+        self._throttle()
+        with metrics.timer('http_get', **self._labels()):
+            status, html, final_url = self.http.get(url)
+        if html is None:
+            return None, 'error'
+        metrics.observe('http_bytes', len(html), 'bytes', **self._labels())
+        if status in BLOCK_STATUS_CODES or self._is_challenge(html, final_url.lower()):
+            self.rate_limiter.on_challenge()
+            return None, 'challenge'
+
+        no_res = self.p_cfg.get('selenium_rules', {}).get('no_results_text')
+        if no_res and no_res.lower() in html.lower():
+            return None, 'no_results'
 
-        title = self._extract_field(card_soup, selectors['title'])
-        company = self._extract_field(card_soup, selectors['company'])
-        salary = self._extract_field(card_soup, selectors.get('salary', 'NONE'))
-        if title == "No especificado": return None
+        page = self._parse_html(html)
+        if not page.card_count:
+            return None, 'no_cards'
+        self.rate_limiter.on_success()
+        self._cache_page(cache_key, final_url, html)
+        return page, 'ready'
 
+    def _load_page(self, url=None, cache_key=None):
+        """Navega (si hay url) y regresa el PageResult de la página actual, o None si no hay resultados.
+        `cache_key` = (keyword, página) con la que se graba el HTML en el caché de páginas."""
+        if url and self.http is not None and not self.browser_fallback:
+            page, reason = self._get_page_http(url, cache_key)
+            if reason == 'ready':
+                self.http_misses = 0
+                self.http_worked = True
+                return page
+            if reason == 'no_results':
+                logger.info(f"[{self.platform_name.upper()}] No hay resultados en esta página.")
+                return None
+            if self.fetch_mode == 'http':
+                logger.warning(f"[{self.platform_name.upper()}] HTTP sin tarjetas ({reason}) en {url}.")
+                return None
+            # auto: un challenge pasa la plataforma a navegador; una página vacía o un error de red no,
+            # salvo que se repita `http_fallback_after` veces seguidas
+            self.http_misses += 1
+            if reason == 'challenge' or self.http_misses >= self.http_fallback_after:
+                logger.warning(f"🔁 [{self.platform_name.upper()}] HTTP falló ({reason}, {self.http_misses} seguida(s)). Cambiando a navegador...")
+                self.browser_fallback = True
+            elif self.http_worked:
+                # HTTP ya funcionaba: lo normal es la última página vacía (o un error suelto), no hace falta navegador
+                logger.warning(f"[{self.platform_name.upper()}] HTTP sin tarjetas ({reason}) en {url}. Se sigue con HTTP.")
+                return None
+            else:
+                logger.info(f"[{self.platform_name.upper()}] HTTP sin tarjetas ({reason}); esta página se intenta con navegador.")
+
+        self.ensure_browser()
+        if self.p_cfg.get('selenium_rules', {}).get('extraction', 'html') == 'browser':
+            page = self._get_page_browser(url, cache_key)
+        else:
+            html = self._get_html_selenium(url)
+            page = None
+            if html:
+                self._cache_page(cache_key, url, html)
+                page = self._parse_html(html)
+        self._record_network()
+        return page
+
+    def _record_network(self):
+        """Peticiones y bytes de la carga de la página contra lo que se bloqueó (resource_blocking.accounting)."""
+        if not self.blocking.get('accounting', False):
+            return
+        usage = network_usage(self.driver)
+        if usage is None:
+            return
+        metrics.observe('page_requests', usage['requests'], 'count', **self._labels())
+        metrics.observe('page_transfer_bytes', usage['bytes'], 'bytes', **self._labels())
+        metrics.observe('page_blocked_requests', usage['blocked'], 'count', **self._labels())
+        logger.debug(
+            f"[{self.platform_name.upper()}] Red: {usage['requests']} peticiones, {usage['bytes'] / 1024:.0f} KB, "
+            f"{usage['blocked']} bloqueadas {usage['blocked_types']}"
+        )
+
+    def _parse_html(self, html):
+        with metrics.timer('parse', **self._labels()):
+            if self.parse_stage is not None:
+                page = self.parse_stage.parse(self.platform_name, html)
+            else:
+                page = self.plan.extract_page(html)
+        # Lo medido dentro del proceso hijo (sin contar el viaje entre procesos)
+        for stage, seconds in (page.timings or {}).items():
+            metrics.observe(stage, seconds, **self._labels())
+        return page
+
+    def _scroll_results_pane(self):
+        scroll_pane = self.p_cfg.get('selenium_rules', {}).get('scroll_pane_selector')
+        if not scroll_pane: return
+        try:
+            pane = self.driver.find_element(By.CSS_SELECTOR, scroll_pane)
+            last_height = self.driver.execute_script("return arguments[0].scrollHeight", pane)
+            for _ in range(5):
+                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", pane)
+                time.sleep(1.5)
+                new_height = self.driver.execute_script("return arguments[0].scrollHeight", pane)
+                if new_height == last_height: break
+                last_height = new_height
+        except: pass
+
+    def _click_next_page(self, next_btn_sel):
+        """Click en 'siguiente' y espera a que la lista vieja desaparezca (en lugar de un sleep fijo)."""
+        old_cards = self.driver.find_elements(By.CSS_SELECTOR, self.p_cfg['selectors']['card'])[:1]
+        btn = self.driver.find_element(By.CSS_SELECTOR, next_btn_sel)
+        self._throttle()
+        with metrics.timer('next_page_click', **self._labels()):
+            self.driver.execute_script("arguments[0].click();", btn)
+            if old_cards:
+                timeout = self.p_cfg.get('selenium_rules', {}).get('page_change_timeout', 15)
+                try:
+                    WebDriverWait(self.driver, timeout, poll_frequency=0.25).until(EC.staleness_of(old_cards[0]))
+                except Exception:
+                    pass
+
+    def _build_job_offer(self, fields, timestamp_found=None):
+        if not fields: return None
+        job_id = fields['job_id']
         link_format = self.p_cfg.get('link_format', '')
         link = link_format.format(job_id=job_id) if link_format else ""
 
         return JobOffer(
-            job_id=str(job_id), title=title, company=company, 
-            salary=salary, link=link, platform=self.platform_name.capitalize(), 
-            timestamp_found=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            job_id=str(job_id), title=fields['title'], company=fields['company'], 
+            salary=fields['salary'], link=link, platform=self.platform_name.capitalize(), 
+            timestamp_found=timestamp_found or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         )
 
-    def scrape_keyword(self, keyword: str, found_job_ids: set):
+    def parse_job_card(self, card_element):
+        """Parsea una tarjeta (elemento lxml) con el plan de extracción compilado."""
+        return self._build_job_offer(self.plan.extract_card(card_element))
+
+    def _process_page(self, page, keyword, page_num, found_job_ids, new_jobs, processed_titles, debug_mode=False):
+        """Filtra y deduplica las tarjetas de una página. Retorna (IDs de la página en orden de aparición, ofertas nuevas).
+        Si `found_job_ids` es un servicio compartido (SeenIds) cada ID se reclama de forma atómica."""
+        claim = getattr(found_job_ids, 'claim', None)
+        owner = (self.platform_name, keyword)
+        timestamp_found = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        found_on_page = 0
+        page_new_jobs = []
+        parsed_count = 0
+        current_page_job_ids = {}   # dict como set ordenado: la marca incremental guarda los más recientes primero
+        page_debug_info = []
+        filter_time = 0.0
+
+        for i, fields in enumerate(page.cards):
+            job_offer = self._build_job_offer(fields, timestamp_found)
+            if not job_offer:
+                if debug_mode:
+                    page_debug_info.append("  [⚠️ Error Parseo] No se pudo extraer ID o Título de una tarjeta HTML.")
+                continue
+
+            parsed_count += 1
+            current_page_job_ids[job_offer.job_id] = None
+
+            if page.verdicts:
+                is_valid, r_type, r_kw = page.verdicts[i]
+            else:
+                t0 = time.perf_counter()
+                is_valid, r_type, r_kw = self.title_filter.evaluate(job_offer.title)
+                filter_time += time.perf_counter() - t0
+
+            if not is_valid:
+                if r_type in processed_titles:
+                    processed_titles[r_type].append(job_offer.title)
+                if debug_mode:
+                    motivo = f"Prohibida: '{r_kw}'" if r_type == 'excluded_explicit' else "No tiene palabras requeridas"
+                    page_debug_info.append(f"  [❌ Descartada] {job_offer.title} | Motivo: {motivo}")
+                continue
+
+            if claim is not None:
+                is_new = claim(job_offer.job_id, owner)
+            elif job_offer.job_id not in found_job_ids:
+                found_job_ids.add(job_offer.job_id)
+                is_new = True
+            else:
+                is_new = False
+
+            if is_new:
+                new_jobs.append(job_offer)
+                page_new_jobs.append(job_offer)
+                processed_titles['included'].append(job_offer.title)
+                found_on_page += 1
+                if debug_mode:
+                    page_debug_info.append(f"  [✨ NUEVA] {job_offer.title} | Empresa: {job_offer.company} | ID: {job_offer.job_id}")
+            else:
+                if debug_mode:
+                    page_debug_info.append(f"  [🔄 Duplicada] {job_offer.title} | (Ya está en tu CSV o ya salió en esta corrida)")
+
+        if not page.verdicts:
+            metrics.observe('filter', filter_time, **self._labels())
+        logger.info(f"[{self.platform_name.upper()}] Pág {page_num} lista. Tarjetas HTML: {page.card_count} | Extraídas: {parsed_count} | Nuevas para CSV: +{found_on_page}")
+
+        if debug_mode and page_debug_info:
+            logger.info(f"--- REPORTE DEBUG PÁG {page_num} ({self.platform_name.upper()}) ---")
+            for info in page_debug_info:
+                logger.info(info)
+            logger.info("-" * 45)
+
+        return list(current_page_job_ids), page_new_jobs
+
+    def scrape_keyword(self, keyword: str, found_job_ids: set, start_page: int = 1, on_page=None, max_pages=None):
+        """`start_page` permite retomar desde un checkpoint; `on_page(keyword, page_num, nuevas)`
+        se llama al terminar cada página (ej. para escribir el journal).
+        `max_pages` limita la profundidad de esta pasada (por defecto la `max_pages` de la plataforma)."""
+        self.current_keyword = keyword
         keyword_formatted = keyword.replace(' ', '%20')
         base_url = self.p_cfg['base_url'].format(keyword=keyword_formatted)
         sel_rules = self.p_cfg.get('selenium_rules', {})
@@ -143,113 +465,140 @@ class GenericScraper(BaseScraper):
         current_pag_val = pag_cfg.get('start', 0)
         
         debug_mode = self.config['general'].get('debug_mode', False)
+        platform_max = self.p_cfg.get('max_pages', 50)
+        max_pages = min(max_pages or platform_max, platform_max)
         
         page_num = 1
         new_jobs = []
         processed_titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
-        previous_page_job_ids = set()
+        previous_page_job_ids = []
 
-        logger.info(f"[{self.platform_name.upper()}] Scrapeando '{keyword}' - Pág {page_num}...")
-        html = self._get_html_selenium(base_url)
+        # --- MODO INCREMENTAL: los resultados vienen ordenados por fecha ---
+        known_ids = set()
+        run_ids = []
+        known_streak = 0
+        stop_after = 0
+        incremental_stop = False
+        depth_capped = False
+        if self.crawl_state is not None:
+            known_ids = self.crawl_state.seen_ids(self.platform_name, keyword)
+            stop_after = self.config['general'].get('incremental_crawl', {}).get('known_pages_to_stop', 2)
+            stop_after = self.p_cfg.get('known_pages_to_stop', stop_after)
 
-        while page_num <= self.p_cfg.get('max_pages', 50):
-            if not html: break
+        # --- RETOMAR DESDE UN CHECKPOINT ---
+        first_url = base_url
+        if start_page > 1:
+            if pag_cfg and not sel_rules.get('next_button_selector'):
+                page_num = start_page
+                current_pag_val += pag_cfg.get('increment', 1) * (start_page - 1)
+                first_url = f"{base_url}&{pag_cfg['param']}={current_pag_val}"
+            else:
+                logger.info(f"[{self.platform_name.upper()}] '{keyword}' pagina con botón; no se puede saltar a la pág {start_page}, se retoma desde la 1.")
+        if page_num > max_pages:
+            return new_jobs, processed_titles
 
-            soup = BeautifulSoup(html, 'lxml')
-            card_selector = self.p_cfg['selectors']['card']
-            job_cards = soup.select(card_selector)
-            
-            if not job_cards: break
-
-            found_on_page = 0
-            parsed_count = 0
-            current_page_job_ids = set()
-            page_debug_info = []
-
-            for card in job_cards:
-                job_offer = self.parse_job_card(card)
-                if not job_offer:
-                    if debug_mode:
-                        page_debug_info.append("  [⚠️ Error Parseo] No se pudo extraer ID o Título de una tarjeta HTML.")
-                    continue
-                
-                parsed_count += 1
-                current_page_job_ids.add(job_offer.job_id)
+        logger.info(f"[{self.platform_name.upper()}] Scrapeando '{keyword}' - Pág {page_num}...")
+        page = self._load_keyword_page(first_url, keyword, page_num)
 
-                filtro_resultado = filter_job_by_title(job_offer.title, self.config['search_filters'])
-                
-                if isinstance(filtro_resultado, tuple):
-                    if len(filtro_resultado) == 3:
-                        is_valid, r_type, r_kw = filtro_resultado
-                    elif len(filtro_resultado) == 2:
-                        is_valid, r_type = filtro_resultado
-                        r_kw = None
-                    else:
-                        is_valid, r_type, r_kw = False, "excluded_implicit", None
-                else:
-                    is_valid, r_type, r_kw = False, "excluded_implicit", None
+        while page_num <= max_pages:
+            if not page or not page.card_count: break
+            current_page_job_ids, page_new_jobs = self._process_page(
+                page, keyword, page_num, found_job_ids, new_jobs, processed_titles, debug_mode
+            )
 
-                
-                if not is_valid:
-                    if r_type in processed_titles:
-                        processed_titles[r_type].append(job_offer.title)
-                    if debug_mode:
-                        motivo = f"Prohibida: '{r_kw}'" if r_type == 'excluded_explicit' else "No tiene palabras requeridas"
-                        page_debug_info.append(f"  [❌ Descartada] {job_offer.title} | Motivo: {motivo}")
-                    continue
-
-                if job_offer.job_id not in found_job_ids:
-                    new_jobs.append(job_offer)
-                    found_job_ids.add(job_offer.job_id)
-                    processed_titles['included'].append(job_offer.title)
-                    found_on_page += 1
-                    if debug_mode:
-                        page_debug_info.append(f"  [✨ NUEVA] {job_offer.title} | Empresa: {job_offer.company} | ID: {job_offer.job_id}")
-                else:
-                    if debug_mode:
-                        page_debug_info.append(f"  [🔄 Duplicada] {job_offer.title} | (Ya está en tu CSV)")
+            if on_page:
+                on_page(keyword, page_num, page_new_jobs)
 
-            logger.info(f"[{self.platform_name.upper()}] Pág {page_num} lista. Tarjetas HTML: {len(job_cards)} | Extraídas: {parsed_count} | Nuevas para CSV: +{found_on_page}")
-            
-            if debug_mode and page_debug_info:
-                logger.info(f"--- REPORTE DEBUG PÁG {page_num} ({self.platform_name.upper()}) ---")
-                for info in page_debug_info:
-                    logger.info(info)
-                logger.info("-" * 45)
+            if self.crawl_state is not None:
+                run_ids.extend(current_page_job_ids)
+                # Página "conocida": nada nuevo y todo ya estaba en el CSV o en la marca de la corrida anterior
+                # (las descartadas por el filtro nunca llegan al CSV; por eso se recuerdan en la marca).
+                # Una página donde no se pudo extraer ninguna tarjeta no cuenta como conocida.
+                if current_page_job_ids and not page_new_jobs and all(i in found_job_ids or i in known_ids for i in current_page_job_ids):
+                    known_streak += 1
+                else:
+                    known_streak = 0
+                if stop_after and known_streak >= stop_after:
+                    incremental_stop = True
+                    break
 
             # --- DETECCIÓN VISUAL DE FIN DE PAGINACIÓN ---
-            stop_present = sel_rules.get('stop_pagination_if_present')
-            if stop_present and soup.select_one(stop_present):
+            if page.stop_pagination:
                 break
-                
-            stop_missing = sel_rules.get('stop_pagination_if_missing')
-            if stop_missing:
-                pagination_container_loaded = soup.find(class_=lambda x: x and any('pagination' in c.lower() or 'serp-page' in c.lower() for c in (x if isinstance(x, list) else [str(x)])))
-                if pagination_container_loaded and not soup.select_one(stop_missing):
-                    break
 
-            if current_page_job_ids and current_page_job_ids == previous_page_job_ids:
+            if current_page_job_ids and set(current_page_job_ids) == set(previous_page_job_ids):
                 break
             
             previous_page_job_ids = current_page_job_ids
 
+            # Tope de profundidad: se corta ANTES de navegar (la página max_pages + 1 nunca se carga;
+            # el presupuesto del daemon y los rangos de la cola cuentan exactamente max_pages)
+            if page_num >= max_pages:
+                depth_capped = True
+                break
+
             # --- TRANSICIÓN A LA SIGUIENTE PÁGINA ---
             next_btn_sel = sel_rules.get('next_button_selector')
             
             if next_btn_sel:
                 try:
-                    btn = self.driver.find_element(By.CSS_SELECTOR, next_btn_sel)
-                    self.driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(self.p_cfg.get('delay_between_pages', 4))
-                    html = self._get_html_selenium(url=None)
+                    self.ensure_browser()
+                    self._click_next_page(next_btn_sel)
+                    page = self._load_keyword_page(None, keyword, page_num + 1)
+                except BlockedError:
+                    raise
                 except Exception:
                     break
             else:
                 if not pag_cfg: break
                 current_pag_val += pag_cfg.get('increment', 1)
                 url = f"{base_url}&{pag_cfg['param']}={current_pag_val}"
-                html = self._get_html_selenium(url)
+                page = self._load_keyword_page(url, keyword, page_num + 1)
 
             page_num += 1
 
-        return new_jobs, processed_titles
\ No newline at end of file
+        if self.crawl_state is not None:
+            # Si la pasada se cortó antes de la profundidad de la plataforma, no se sabe cuántas páginas tiene
+            complete = start_page == 1 and (max_pages == platform_max or not depth_capped)
+            self._record_high_water(keyword, run_ids, page_num, complete, incremental_stop)
+
+        return new_jobs, processed_titles
+
+    def _load_keyword_page(self, url, keyword, page_num):
+        """_load_page de una página de la keyword; si la sesión se bloquea, el error lleva la página para reintentar."""
+        try:
+            return self._load_page(url, (keyword, page_num))
+        except BlockedError as e:
+            e.page_num = page_num
+            raise
+
+    def _record_high_water(self, keyword, run_ids, page_num, complete, incremental_stop):
+        max_pages = self.p_cfg.get('max_pages', 50)
+        if incremental_stop:
+            expected = self.crawl_state.last_depth(self.platform_name, keyword) or max_pages
+            saved = max(min(expected, max_pages) - page_num, 0)
+            logger.info(f"⏩ [{self.platform_name.upper()}] '{keyword}': corte incremental en la pág {page_num} (~{saved} págs ahorradas).")
+        # La profundidad solo es confiable si se recorrió la keyword completa desde la pág 1
+        depth = min(page_num, max_pages) if not incremental_stop and complete else None
+        self.crawl_state.record(self.platform_name, keyword, run_ids, depth)
+
+    def replay_keyword(self, keyword, found_job_ids, on_page=None):
+        """Re-procesa las páginas de `keyword` guardadas en el caché: mismo parseo, filtro y dedup,
+        sin navegador ni red. Útil para probar selectores o filtros nuevos sobre páginas ya descargadas."""
+        self.current_keyword = keyword
+        debug_mode = self.config['general'].get('debug_mode', False)
+        new_jobs = []
+        processed_titles = {'included': [], 'excluded_explicit': [], 'excluded_implicit': []}
+
+        for page_num, url, digest in self.page_cache.pages(self.platform_name, keyword):
+            try:
+                html = self.page_cache.get(digest)
+            except OSError as e:
+                logger.warning(f"[{self.platform_name.upper()}] Caché: falta la pág {page_num} de '{keyword}' ({e}).")
+                continue
+            page = self._parse_html(html)
+            _, page_new_jobs = self._process_page(page, keyword, page_num, found_job_ids, new_jobs, processed_titles, debug_mode)
+            if on_page:
+                on_page(keyword, page_num, page_new_jobs)
+
+        return new_jobs, processed_titles
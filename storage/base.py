@@ -0,0 +1,79 @@
+import logging
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ('csv', 'sqlite', 'parquet')
+
+
+class BaseStorage(ABC):
+    """Interfaz común de almacenamiento de ofertas (CSV, SQLite, Parquet)."""
+    name = 'base'
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @abstractmethod
+    def get_existing_ids(self):
+        """IDs ya guardados: cualquier objeto que soporte `in` y `len`."""
+        pass
+
+    @abstractmethod
+    def save_jobs(self, new_jobs_dicts: list):
+        """Guarda las ofertas nuevas (dicts de JobOffer) sin duplicar las existentes."""
+        pass
+
+    @abstractmethod
+    def load_jobs(self, platform=None, since=None, columns=None):
+        """DataFrame con las ofertas guardadas. `platform` (ej. 'Indeed') y `since` ('YYYY-MM-DD')
+        filtran; `columns` limita las columnas leídas. Cada backend empuja los filtros lo más abajo que puede."""
+        pass
+
+    def compact(self):
+        logger.info(f"El almacenamiento '{self.name}' no necesita compactarse.")
+
+    def rebuild_index(self):
+        logger.info(f"El almacenamiento '{self.name}' no usa un índice de IDs aparte.")
+
+    def close(self):
+        pass
+
+
+def create_storage(config, backend=None):
+    """Instancia el backend de `general.storage_backend` (o el indicado). Los opcionales se importan solo si se usan."""
+    general = config['general']
+    backend = backend or general.get('storage_backend', 'csv')
+    columns = general['final_columns_to_save']
+
+    if backend == 'csv':
+        from .csv_handler import CSVHandler
+        return CSVHandler(
+            general['output_filename'], columns,
+            incremental=general.get('incremental_save', True),
+            use_index=general.get('id_index', True),
+            use_bloom=general.get('id_index_bloom', True)
+        )
+    if backend == 'sqlite':
+        from .sqlite_store import SQLiteStorage
+        return SQLiteStorage(general.get('sqlite_path', 'ofertas_trabajo.db'), columns)
+    if backend == 'parquet':
+        from .parquet_store import ParquetStorage
+        return ParquetStorage(general.get('parquet_dir', 'ofertas_parquet'), columns)
+    raise ValueError(f"storage_backend desconocido: '{backend}'. Opciones: {', '.join(STORAGE_BACKENDS)}")
+
+
+def migrate_storage(config, source, target, batch_size=50000):
+    """Copia todas las ofertas de un backend a otro (el destino deduplica como en cualquier guardado)."""
+    src = create_storage(config, source)
+    dst = create_storage(config, target)
+    try:
+        df = src.load_jobs()
+        logger.info(f"Migrando {len(df)} ofertas de '{source}' a '{target}'...")
+        dst.get_existing_ids()
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        for start in range(0, len(records), batch_size):
+            dst.save_jobs(records[start:start + batch_size])
+        logger.info(f"✅ Migración terminada: {len(dst.get_existing_ids())} ofertas en '{target}'.")
+    finally:
+        src.close()
+        dst.close()
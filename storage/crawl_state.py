@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlState:
+    """Marcas de agua (high-water marks) por (plataforma, keyword) entre corridas, para el modo incremental:
+    - seen: los IDs más recientes vistos en la keyword (incluye los descartados por el filtro de títulos)
+    - depth: cuántas páginas tuvo el último recorrido completo (para estimar las páginas ahorradas)"""
+
+    def __init__(self, path, remember_ids=1000):
+        self.path = path
+        self.remember_ids = remember_ids
+        self._lock = threading.Lock()
+        self._marks = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._marks = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Estado incremental ilegible ({path}): {e}. Se empieza sin marcas.")
+
+    @classmethod
+    def from_config(cls, config):
+        inc_cfg = config['general'].get('incremental_crawl', {})
+        if not inc_cfg.get('enabled', False):
+            return None
+        return cls(inc_cfg.get('state_file', 'crawl_state.json'), inc_cfg.get('remember_ids', 1000))
+
+    @staticmethod
+    def _key(platform, keyword):
+        return f"{platform}|{keyword}"
+
+    def seen_ids(self, platform, keyword):
+        with self._lock:
+            return set(self._marks.get(self._key(platform, keyword), {}).get('seen', []))
+
+    def last_depth(self, platform, keyword):
+        with self._lock:
+            return self._marks.get(self._key(platform, keyword), {}).get('depth')
+
+    def record(self, platform, keyword, page_ids, depth=None):
+        """`page_ids`: IDs de esta corrida en orden de aparición (los más nuevos primero).
+        `depth` solo se actualiza cuando la keyword se recorrió completa (sin corte incremental)."""
+        key = self._key(platform, keyword)
+        with self._lock:
+            mark = self._marks.get(key, {})
+            merged = list(dict.fromkeys(list(page_ids) + mark.get('seen', [])))
+            mark['seen'] = merged[:self.remember_ids]
+            if depth is not None:
+                mark['depth'] = depth
+            mark['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._marks[key] = mark
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._marks, ensure_ascii=False)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
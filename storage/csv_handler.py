@@ -1,48 +1,224 @@
 import os
+import csv
 import pandas as pd
 import logging
 
+from .base import BaseStorage
+from .id_index import JobIdIndex
+
 logger = logging.getLogger(__name__)
 
-class CSVHandler:
-    def __init__(self, filepath, columns):
+class CSVHandler(BaseStorage):
+    name = 'csv'
+
+    def __init__(self, filepath, columns, incremental=True, use_index=True, use_bloom=True):
+        super().__init__(columns)
         self.filepath = filepath
-        self.columns = columns
+        self.incremental = incremental
         self.existing_df = None
+        self.existing_ids = set()
+        # Índice persistente de IDs (<csv>.idx) para no cargar el CSV completo al arrancar
+        self.index = JobIdIndex(filepath, use_bloom=use_bloom) if use_index else None
+        # Marcador de "append en curso": guarda el tamaño del CSV antes de escribir
+        self.append_marker = f"{filepath}.append"
+        self._recover_interrupted_append()
+
+    def get_existing_ids(self):
+        """IDs ya guardados. Con índice retorna el JobIdIndex (soporta `in` y `len`), si no un set."""
+        if self.index is not None:
+            if not self.index.open():
+                logger.info("Índice de IDs ausente o desactualizado. Reconstruyendo desde el CSV...")
+                self.index.rebuild()
+            self.existing_ids = self.index
+            logger.info(f"Se cargaron {len(self.index)} IDs existentes (índice '{self.index.index_path}').")
+            return self.index
 
-    def get_existing_ids(self) -> set:
         found_job_ids = set()
+        self.existing_df = self._load_existing_df()
+        if 'job_id' in self.existing_df.columns:
+            found_job_ids = set(self.existing_df['job_id'].dropna().tolist())
+        logger.info(f"Se cargaron {len(found_job_ids)} IDs existentes.")
+        self.existing_ids = found_job_ids
+        return found_job_ids
+
+    def rebuild_index(self):
+        if self.index is None:
+            logger.warning("El índice de IDs está desactivado en la configuración.")
+            return
+        self.index.rebuild()
+
+    def _load_existing_df(self):
         if os.path.exists(self.filepath):
             try:
-                self.existing_df = pd.read_csv(self.filepath)
-                if 'job_id' in self.existing_df.columns:
-                    self.existing_df['job_id'] = self.existing_df['job_id'].astype(str)
-                    found_job_ids = set(self.existing_df['job_id'].dropna().tolist())
-                logger.info(f"Se cargaron {len(found_job_ids)} IDs existentes.")
+                df = pd.read_csv(self.filepath)
+                if 'job_id' in df.columns:
+                    df['job_id'] = df['job_id'].astype(str)
+                return df
             except Exception as e:
                 logger.error(f"Error al leer CSV: {e}. Se creará uno nuevo.")
-                self.existing_df = pd.DataFrame(columns=self.columns)
+        return pd.DataFrame(columns=self.columns)
+
+    def load_jobs(self, platform=None, since=None, columns=None):
+        """El CSV no tiene índices: se lee por bloques (solo las columnas necesarias) y se filtra en pandas."""
+        if not os.path.exists(self.filepath):
+            return pd.DataFrame(columns=columns or self.columns)
+        wanted = list(columns or self.columns)
+        usecols = list(dict.fromkeys(wanted + [c for c, v in (('platform', platform), ('timestamp_found', since)) if v]))
+        chunks = []
+        for chunk in pd.read_csv(self.filepath, usecols=lambda c: c in usecols, dtype=str, chunksize=200_000):
+            if platform:
+                chunk = chunk[chunk['platform'] == platform]
+            if since:
+                chunk = chunk[chunk['timestamp_found'] >= str(since)]
+            chunks.append(chunk)
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=usecols)
+        if 'link' in df.columns:
+            # En el CSV los links se guardan entre comillas literales (ver _format_for_csv)
+            df['link'] = df['link'].str.strip('"')
+        return df[[c for c in wanted if c in df.columns]]
+
+    def _remember_ids(self, job_ids, full_rewrite=False):
+        if self.index is None:
+            self.existing_ids.update(job_ids)
+        elif full_rewrite:
+            self.index.rebuild(job_ids)
         else:
-            self.existing_df = pd.DataFrame(columns=self.columns)
-            
-        return found_job_ids
+            self.index.add_many(job_ids)
+
+    def _format_for_csv(self, df):
+        """Mismo formato de columnas y comillas para el guardado completo y para el append."""
+        df = df.dropna(subset=['job_id'])
+        df = df[df['job_id'] != 'None']
+        df = df.drop_duplicates(subset=['job_id'], keep='first').copy()
+
+        # Limpieza agresiva de caracteres basura en los links para evitar las triples comillas
+        if 'link' in df.columns:
+            df['link'] = "\"" + df['link'].astype(str).str.replace('"', '').str.strip() + "\""
+
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = pd.NA
+        return df[self.columns]
 
     def save_jobs(self, new_jobs_dicts: list):
+        if self.incremental and self._can_append():
+            self.append_jobs(new_jobs_dicts)
+        else:
+            self.rewrite_jobs(new_jobs_dicts)
+
+    def rewrite_jobs(self, new_jobs_dicts: list):
+        """Guardado completo (histórico + nuevos). Se usa para crear el archivo o si cambian las columnas."""
+        if self.existing_df is None:
+            self.existing_df = self._load_existing_df()
+
         new_df = pd.DataFrame(new_jobs_dicts)
         new_df['job_id'] = new_df['job_id'].astype(str)
-        
-        combined_df = pd.concat([self.existing_df, new_df], ignore_index=True)
-        combined_df.dropna(subset=['job_id'], inplace=True)
-        combined_df = combined_df[combined_df['job_id'] != 'None']
-        combined_df.drop_duplicates(subset=['job_id'], keep='first', inplace=True)
-        
-        # Limpieza agresiva de caracteres basura en los links para evitar las triples comillas
-        if 'link' in combined_df.columns:
-            combined_df['link'] = "\"" + combined_df['link'].astype(str).str.replace('"', '').str.strip() + "\""
 
-        for col in self.columns:
-            if col not in combined_df.columns: 
-                combined_df[col] = pd.NA
-                
-        combined_df[self.columns].to_csv(self.filepath, index=False, encoding='utf-8-sig')
-        logger.info(f"Datos combinados guardados en '{self.filepath}' ({len(combined_df)} ofertas en total).")
\ No newline at end of file
+        combined_df = self._format_for_csv(pd.concat([self.existing_df, new_df], ignore_index=True))
+        self._atomic_write(combined_df)
+        self.existing_df = combined_df
+        self._remember_ids(combined_df['job_id'], full_rewrite=True)
+        logger.info(f"Datos combinados guardados en '{self.filepath}' ({len(combined_df)} ofertas en total).")
+
+    def append_jobs(self, new_jobs_dicts: list):
+        """Agrega al final del CSV solo las filas nuevas (ya deduplicadas contra el histórico)."""
+        new_df = pd.DataFrame(new_jobs_dicts)
+        new_df['job_id'] = new_df['job_id'].astype(str)
+        new_df = new_df[[job_id not in self.existing_ids for job_id in new_df['job_id']]]
+
+        new_df = self._format_for_csv(new_df)
+        if new_df.empty:
+            logger.info("Todas las ofertas ya estaban en el CSV. Nada que agregar.")
+            return
+
+        chunk = new_df.to_csv(index=False, header=False).encode('utf-8')
+        self._atomic_append(chunk)
+        self._remember_ids(new_df['job_id'])
+        logger.info(f"Se agregaron {len(new_df)} ofertas nuevas a '{self.filepath}'.")
+
+    def compact(self):
+        """Deduplicación y reescritura completa del CSV (operación ocasional)."""
+        if not os.path.exists(self.filepath):
+            logger.info(f"No existe '{self.filepath}'. Nada que compactar.")
+            return
+        df = pd.read_csv(self.filepath)
+        before = len(df)
+        df['job_id'] = df['job_id'].astype(str)
+        df = self._format_for_csv(df)
+        self._atomic_write(df)
+        self.existing_df = None
+        if self.index is None:
+            self.existing_ids = set(df['job_id'])
+        else:
+            self.index.rebuild(df['job_id'])
+        logger.info(f"CSV compactado: {before} -> {len(df)} filas en '{self.filepath}'.")
+
+    # --- Escritura segura ---
+
+    def _can_append(self):
+        """Solo se puede hacer append si el archivo existe y su cabecera coincide con las columnas configuradas."""
+        if not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0:
+            return False
+        with open(self.filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            header = next(csv.reader(f), [])
+        if header != list(self.columns):
+            logger.warning("Las columnas del CSV no coinciden con 'final_columns_to_save'. Se reescribirá completo.")
+            return False
+        return True
+
+    def _atomic_write(self, df):
+        tmp_path = f"{self.filepath}.tmp"
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.filepath)
+
+    def _atomic_append(self, chunk: bytes):
+        """Append todo-o-nada: si el proceso muere a la mitad, el siguiente arranque
+        trunca el CSV al tamaño que tenía antes (ver _recover_interrupted_append)."""
+        original_size = os.path.getsize(self.filepath)
+
+        # El archivo podría no terminar en salto de línea (editado a mano)
+        with open(self.filepath, 'rb') as f:
+            f.seek(max(original_size - 1, 0))
+            if original_size and f.read(1) not in (b'\n', b'\r'):
+                chunk = os.linesep.encode() + chunk
+
+        self._write_marker(original_size)
+        try:
+            with open(self.filepath, 'ab') as f:
+                f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            self._truncate(original_size)
+            os.remove(self.append_marker)
+            raise
+        os.remove(self.append_marker)
+
+    def _write_marker(self, size):
+        tmp_marker = f"{self.append_marker}.tmp"
+        with open(tmp_marker, 'w', encoding='utf-8') as f:
+            f.write(str(size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_marker, self.append_marker)
+
+    def _truncate(self, size):
+        with open(self.filepath, 'r+b') as f:
+            f.truncate(size)
+            os.fsync(f.fileno())
+
+    def _recover_interrupted_append(self):
+        if not os.path.exists(self.append_marker):
+            return
+        try:
+            with open(self.append_marker, 'r', encoding='utf-8') as f:
+                size = int(f.read().strip())
+            if os.path.exists(self.filepath) and os.path.getsize(self.filepath) > size:
+                logger.warning(f"Se detectó un append interrumpido en '{self.filepath}'. Restaurando a {size} bytes...")
+                self._truncate(size)
+        except (ValueError, OSError) as e:
+            logger.error(f"No se pudo recuperar el append interrumpido: {e}")
+        finally:
+            os.remove(self.append_marker)
@@ -0,0 +1,50 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DetailCache:
+    """Campos de la página de detalle por (plataforma, job_id) en SQLite.
+    Una oferta enriquecida nunca se vuelve a descargar (los IDs no cambian de contenido)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS details (
+                    platform TEXT NOT NULL, job_id TEXT NOT NULL, fields TEXT NOT NULL, fetched_at REAL NOT NULL,
+                    PRIMARY KEY (platform, job_id)
+                ) WITHOUT ROWID""")
+
+    def get(self, platform, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields FROM details WHERE platform = ? AND job_id = ?", (platform, str(job_id))
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, platform, job_id, fields):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?)",
+                (platform, str(job_id), json.dumps(fields, ensure_ascii=False), time.time())
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM details").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
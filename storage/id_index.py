@@ -0,0 +1,326 @@
+import os
+import sys
+import csv
+import mmap
+import struct
+import bisect
+import hashlib
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Cabecera: magic, versión, número de IDs, tamaño del CSV al que corresponde el índice
+_HEADER = struct.Struct('<4sIQQ')
+_MAGIC = b'JIDX'
+_VERSION = 1
+_BLOOM_HEADER = struct.Struct('<4sIQ')
+_BLOOM_MAGIC = b'JBLM'
+_BLOOM_BITS_PER_ID = 10   # ~1% de falsos positivos con 7 funciones hash
+_BLOOM_HASHES = 7
+# Segmento delta: magic, versión, IDs y tamaño de CSV del índice base al que pertenece, tamaño actual del CSV
+_DELTA_HEADER = struct.Struct('<4sIQQQ')
+_DELTA_MAGIC = b'JIDD'
+_DELTA_MIN = 10_000       # El delta se fusiona al pasar de max(_DELTA_MIN, 1/8 del índice base)
+_MERGE_CHUNK = 1 << 20    # IDs del índice base leídos por bloque al fusionar
+
+
+def hash_job_id(job_id) -> int:
+    """Hash estable de 64 bits (la probabilidad de colisión es despreciable para millones de IDs)."""
+    return int.from_bytes(hashlib.blake2b(str(job_id).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _is_valid_id(job_id):
+    return job_id not in (None, '', 'None', 'nan')
+
+
+class _SortedHashes:
+    """Vista de solo lectura sobre el arreglo ordenado de uint64 del mmap (para usar con bisect)."""
+
+    def __init__(self, buf, count):
+        self.buf = buf
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<Q', self.buf, _HEADER.size + i * 8)[0]
+
+
+class _BloomFilter:
+    """Filtro de Bloom persistido: descarta rápido los IDs que seguro NO están en el índice."""
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.nbits = len(bits) * 8
+        self.capacity = self.nbits // _BLOOM_BITS_PER_ID
+
+    @classmethod
+    def for_capacity(cls, capacity):
+        nbytes = max((capacity * _BLOOM_BITS_PER_ID) // 8, 1024)
+        return cls(bytearray(nbytes))
+
+    def _positions(self, h):
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return ((h1 + i * h2) % self.nbits for i in range(_BLOOM_HASHES))
+
+    def add(self, h):
+        for pos in self._positions(h):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, h):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
+
+
+class JobIdIndex:
+    """Índice persistente de job_ids junto al CSV (`<csv>.idx`): arreglo ordenado de hashes
+    de 64 bits leído con mmap + filtro de Bloom opcional (`<csv>.bloom`).
+    Los IDs de cada guardado van a un segmento delta (`<csv>.idx.delta`, solo append) que se fusiona con
+    el arreglo ordenado en una sola pasada cuando crece: un guardado cuesta lo que trae, no lo que ya hay.
+    Permite preguntar `job_id in index` sin cargar el CSV en pandas.
+    Las consultas y el cambio de mmap tras una escritura van bajo el mismo lock: en --daemon se guarda
+    mientras las sesiones siguen preguntando, y nunca deben ver un mmap cerrado o a medio cambiar."""
+
+    def __init__(self, csv_path, use_bloom=True):
+        self.csv_path = csv_path
+        self.index_path = f"{csv_path}.idx"
+        self.bloom_path = f"{csv_path}.bloom"
+        self.delta_path = f"{csv_path}.idx.delta"
+        self.use_bloom = use_bloom
+        self._file = None
+        self._mmap = None
+        self._hashes = _SortedHashes(b'', 0)
+        self._delta = set()
+        self._bloom = None
+        self.base_csv_size = -1
+        self.csv_size = -1
+        self._lock = threading.RLock()
+
+    # --- Lectura ---
+
+    def open(self) -> bool:
+        """Abre el índice existente. Retorna False si no existe o está desactualizado respecto al CSV."""
+        self.close()
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            f = open(self.index_path, 'rb')
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                f.close()
+                return False
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, csv_size = _HEADER.unpack_from(buf, 0)
+            if magic != _MAGIC or version != _VERSION or len(buf) != _HEADER.size + count * 8:
+                buf.close(); f.close()
+                return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo abrir el índice de IDs '{self.index_path}': {e}")
+            return False
+
+        base_csv_size = csv_size
+        delta, csv_size = self._load_delta(count, base_csv_size)
+        current_size = os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+        if csv_size != current_size:
+            buf.close(); f.close()
+            return False
+
+        bloom = self._load_bloom(count) if self.use_bloom else None
+        if bloom is not None:
+            for h in delta:
+                bloom.add(h)
+        with self._lock:
+            self.close()
+            self._file, self._mmap = f, buf
+            self._hashes = _SortedHashes(buf, count)
+            self._delta = delta
+            self.base_csv_size = base_csv_size
+            self.csv_size = csv_size
+            self._bloom = bloom
+        return True
+
+    def _load_delta(self, base_count, base_csv_size):
+        """(hashes del delta, tamaño de CSV sellado). Sin delta vale el sello del índice base; uno de otro
+        índice base (quedó de una fusión interrumpida) se borra. Uno truncado invalida el índice."""
+        try:
+            with open(self.delta_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return set(), base_csv_size
+        except OSError as e:
+            logger.warning(f"No se pudo leer el delta del índice '{self.delta_path}': {e}")
+            return set(), None
+        try:
+            magic, version, delta_base_count, delta_base_csv_size, csv_size = _DELTA_HEADER.unpack_from(data, 0)
+        except struct.error:
+            return set(), None
+        if magic != _DELTA_MAGIC or version != _VERSION or (len(data) - _DELTA_HEADER.size) % 8:
+            return set(), None
+        if (delta_base_count, delta_base_csv_size) != (base_count, base_csv_size):
+            os.remove(self.delta_path)
+            return set(), base_csv_size
+        hashes = array('Q', data[_DELTA_HEADER.size:])
+        if sys.byteorder == 'big': hashes.byteswap()
+        return set(hashes), csv_size
+
+    def _load_bloom(self, count):
+        try:
+            with open(self.bloom_path, 'rb') as f:
+                data = f.read()
+            magic, version, bloom_count = _BLOOM_HEADER.unpack_from(data, 0)
+            if magic == _BLOOM_MAGIC and version == _VERSION and bloom_count == count:
+                return _BloomFilter(bytearray(data[_BLOOM_HEADER.size:]))
+        except (OSError, struct.error):
+            pass
+        logger.info("Filtro de Bloom ausente o desactualizado; se usará solo el índice ordenado.")
+        return None
+
+    def __contains__(self, job_id):
+        return self._contains_hash(hash_job_id(job_id))
+
+    def _contains_hash(self, h):
+        with self._lock:
+            if self._bloom is not None and h not in self._bloom:
+                return False
+            if h in self._delta:
+                return True
+            i = bisect.bisect_left(self._hashes, h)
+            return i < len(self._hashes) and self._hashes[i] == h
+
+    def __len__(self):
+        return len(self._hashes) + len(self._delta)
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+            self._mmap = self._file = None
+            self._hashes = _SortedHashes(b'', 0)
+            self._delta = set()
+            self._bloom = None
+
+    # --- Escritura ---
+
+    def rebuild(self, job_ids=None):
+        """Reconstruye el índice leyendo SOLO la columna job_id del CSV (streaming, sin pandas).
+        Si ya se tienen los IDs en memoria (tras una reescritura completa) se pueden pasar directo."""
+        hashes = set()
+        if job_ids is not None:
+            hashes = {hash_job_id(j) for j in job_ids if _is_valid_id(j)}
+        elif os.path.exists(self.csv_path):
+            with open(self.csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                if 'job_id' in header:
+                    col = header.index('job_id')
+                    for row in reader:
+                        if len(row) > col and _is_valid_id(row[col]):
+                            hashes.add(hash_job_id(row[col]))
+        self._write([array('Q', sorted(hashes))], len(hashes))
+        logger.info(f"Índice de IDs reconstruido: {len(self)} IDs en '{self.index_path}'.")
+
+    def add_many(self, job_ids):
+        """Agrega IDs nuevos (tras un append al CSV) y sella el índice con el tamaño actual del CSV."""
+        new_hashes = {h for h in map(hash_job_id, filter(_is_valid_id, job_ids)) if not self._contains_hash(h)}
+        csv_size = os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+        with self._lock:
+            base_count, delta_count, bloom = len(self._hashes), len(self._delta), self._bloom
+        if self._mmap is None or delta_count + len(new_hashes) > max(_DELTA_MIN, base_count // 8) \
+                or (bloom is not None and base_count + delta_count + len(new_hashes) > bloom.capacity):
+            self._compact(new_hashes)
+            return
+
+        self._append_delta(sorted(new_hashes), csv_size)
+        with self._lock:
+            self._delta.update(new_hashes)
+            if self._bloom is not None:
+                for h in new_hashes:
+                    self._bloom.add(h)
+            self.csv_size = csv_size
+
+    def _append_delta(self, hashes, csv_size):
+        """Agrega al delta y después actualiza su sello: si se corta a la mitad, el sello viejo ya no coincide
+        con el CSV y el índice se reconstruye al abrir."""
+        raw = array('Q', hashes)
+        if sys.byteorder == 'big': raw.byteswap()
+        header = _DELTA_HEADER.pack(_DELTA_MAGIC, _VERSION, len(self._hashes), self.base_csv_size, csv_size)
+        exists = os.path.exists(self.delta_path)
+        with open(self.delta_path, 'r+b' if exists else 'wb') as f:
+            if not exists:
+                f.write(header)
+            f.seek(0, os.SEEK_END)
+            f.write(raw.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self, new_hashes):
+        """Fusiona índice base + delta + `new_hashes` en un índice base nuevo, en una sola pasada por bloques."""
+        with self._lock:
+            extra = sorted(self._delta.union(new_hashes))
+            count = len(self._hashes) + len(extra)
+            bloom = self._bloom
+        if bloom is not None and count <= bloom.capacity:
+            for h in new_hashes:
+                bloom.add(h)
+        else:
+            bloom = None   # Sin filtro o se quedó chico: se reconstruye completo
+        self._write(self._merged_blocks(extra), count, bloom)
+
+    def _merged_blocks(self, extra):
+        """Bloques ordenados del índice base (leídos del mmap por partes) con `extra` (ordenado) intercalado."""
+        pos = 0
+        for start in range(0, len(self._hashes), _MERGE_CHUNK):
+            with self._lock:
+                offset = _HEADER.size + start * 8
+                block = array('Q', self._mmap[offset:offset + _MERGE_CHUNK * 8])
+            if sys.byteorder == 'big': block.byteswap()
+            end = bisect.bisect_right(extra, block[-1], pos)
+            if end > pos:
+                # Dos tramos ya ordenados: timsort los intercala en tiempo lineal
+                block = array('Q', sorted(block.tolist() + extra[pos:end]))
+                pos = end
+            yield block
+        if pos < len(extra):
+            yield array('Q', extra[pos:])
+
+    def _write(self, blocks, count, bloom=None):
+        csv_size = os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+        if self.use_bloom and bloom is None:
+            # Doble de capacidad para que los appends siguientes no obliguen a reconstruirlo
+            new_bloom = _BloomFilter.for_capacity(count * 2)
+        else:
+            new_bloom = None
+
+        index_tmp = f"{self.index_path}.tmp"
+        with open(index_tmp, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, count, csv_size))
+            for block in blocks:
+                if new_bloom is not None:
+                    for h in block:
+                        new_bloom.add(h)
+                if sys.byteorder == 'big': block.byteswap()
+                f.write(block.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self.use_bloom:
+            bloom = bloom or new_bloom
+            with open(f"{self.bloom_path}.tmp", 'wb') as f:
+                f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, _VERSION, count))
+                f.write(bloom.bits)
+
+        # Los archivos nuevos ya están escritos: las consultas solo esperan el reemplazo y el mmap nuevo
+        with self._lock:
+            self.close()
+            os.replace(index_tmp, self.index_path)
+            if self.use_bloom:
+                os.replace(f"{self.bloom_path}.tmp", self.bloom_path)
+            if os.path.exists(self.delta_path):
+                os.remove(self.delta_path)
+            self.open()
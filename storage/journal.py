@@ -0,0 +1,109 @@
+import os
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JournalState:
+    """Lo que quedó registrado de una corrida anterior que no terminó de guardarse."""
+    jobs: list = field(default_factory=list)                 # dicts de JobOffer aceptados
+    last_pages: dict = field(default_factory=dict)           # (plataforma, keyword) -> última página completa
+    completed_keywords: set = field(default_factory=set)     # (plataforma, keyword) terminadas
+
+    def resume_page(self, platform, keyword):
+        """Página desde la que hay que retomar (1 si nunca se empezó)."""
+        return self.last_pages.get((platform, keyword), 0) + 1
+
+
+class RunJournal:
+    """Write-ahead journal de la corrida (JSON Lines con fsync).
+    Cada página procesada se escribe en UNA sola línea con sus ofertas nuevas y su checkpoint,
+    así una línea cortada por un crash simplemente se ignora al leer."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._truncate_torn_tail()
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _truncate_torn_tail(self, chunk_size=65536):
+        """Si un crash dejó la última línea sin "\n", se corta hasta el último "\n" antes de seguir escribiendo
+        (con --resume se reabre en modo 'a': el primer registro nuevo quedaría pegado al fragmento y se perdería)."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = end
+            while pos > 0:
+                start = max(pos - chunk_size, 0)
+                f.seek(start)
+                cut = f.read(pos - start).rfind(b"\n")
+                if cut != -1:
+                    pos = start + cut + 1
+                    break
+                pos = start
+            logger.warning(f"Journal: se descarta una línea incompleta al final de '{self.path}' ({end - pos} bytes).")
+            f.truncate(pos)
+
+    def record_page(self, platform, keyword, page, jobs):
+        self._write({
+            'type': 'page', 'platform': platform, 'keyword': keyword, 'page': page,
+            'jobs': [job.__dict__ if hasattr(job, '__dict__') else job for job in jobs],
+        })
+
+    def record_keyword_done(self, platform, keyword):
+        self._write({'type': 'keyword_done', 'platform': platform, 'keyword': keyword})
+
+    def load(self) -> JournalState:
+        state = JournalState()
+        if not os.path.exists(self.path):
+            return state
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Journal: línea {line_num} incompleta (probable crash). Se ignora.")
+                    continue
+
+                key = (record.get('platform'), record.get('keyword'))
+                if record.get('type') == 'page':
+                    state.jobs.extend(record.get('jobs', []))
+                    state.last_pages[key] = max(state.last_pages.get(key, 0), record.get('page', 0))
+                elif record.get('type') == 'keyword_done':
+                    state.completed_keywords.add(key)
+        return state
+
+    def has_data(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Se llama cuando todo quedó guardado en el storage: el journal ya no hace falta."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+from core.minhash import MinHasher, offer_shingles
+
+logger = logging.getLogger(__name__)
+
+
+class NearDupIndex:
+    """Índice LSH persistente de firmas MinHash de todo el histórico (SQLite):
+    - clusters: cluster_id + firma representativa (num_perm × uint32, la de su primera oferta)
+    - buckets: (hash de banda, cluster); cada firma se parte en `bands` bandas y un cluster es candidato
+      si comparte al menos un bucket con la oferta. Solo los candidatos se comparan con la firma completa.
+    - offers: job_id -> cluster_id (para no reprocesar lo que ya está)
+    Una oferta nueva se une al cluster más parecido (Jaccard estimado >= `threshold`)
+    o abre uno propio: cluster_id = <plataforma>-<job_id> de la primera oferta del grupo."""
+
+    def __init__(self, path, num_perm=64, bands=16, threshold=0.7):
+        if num_perm % bands:
+            raise ValueError(f"near_duplicates: num_perm ({num_perm}) debe ser múltiplo de bands ({bands}).")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    @classmethod
+    def from_config(cls, config):
+        nd_cfg = config['general'].get('near_duplicates', {})
+        if not nd_cfg.get('enabled', False):
+            return None
+        return cls(
+            nd_cfg.get('index_file', 'near_dups.sqlite'), nd_cfg.get('num_perm', 64),
+            nd_cfg.get('bands', 16), nd_cfg.get('threshold', 0.7)
+        )
+
+    def _create_schema(self):
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            layout = f"{self.num_perm}/{self.bands}"
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+            if row and row[0] != layout:
+                # Firmas de otro tamaño no son comparables: se empieza de nuevo (bootstrap desde el histórico)
+                logger.warning(f"El índice de casi-duplicados usa {row[0]} (num_perm/bands) y el config {layout}. Se reconstruye.")
+                for table in ('offers', 'clusters', 'buckets'):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('layout', ?)", (layout,))
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS clusters (
+                    id INTEGER PRIMARY KEY, cluster_id TEXT NOT NULL UNIQUE, sig BLOB NOT NULL
+                )""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS offers (
+                    job_id TEXT PRIMARY KEY, platform TEXT, cluster_id TEXT NOT NULL
+                ) WITHOUT ROWID""")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    bucket INTEGER NOT NULL, cluster INTEGER NOT NULL, PRIMARY KEY (bucket, cluster)
+                ) WITHOUT ROWID""")
+
+    @staticmethod
+    def own_cluster(job):
+        """cluster_id que tendría la oferta si fuera la primera de su grupo."""
+        return f"{str(job.get('platform') or '').lower()}-{job.get('job_id')}"
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+    def _bucket_keys(self, sig):
+        """Un entero de 64 bits por banda (el índice de banda va en el hash para que no crucen entre bandas)."""
+        keys = []
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, 'little') + chunk, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def _best_match(self, sig, keys):
+        placeholders = ", ".join("?" for _ in keys)
+        rows = self._conn.execute(
+            f"SELECT cluster_id, sig FROM clusters WHERE id IN "
+            f"(SELECT DISTINCT cluster FROM buckets WHERE bucket IN ({placeholders}))", keys
+        ).fetchall()
+        if not rows:
+            return None
+        # Todas las candidatas de una vez: matriz (candidatas × num_perm) contra la firma nueva
+        sigs = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.uint32).reshape(len(rows), self.num_perm)
+        scores = np.count_nonzero(sigs == sig, axis=1) / self.num_perm
+        best = int(scores.argmax())
+        return rows[best][0] if scores[best] >= self.threshold else None
+
+    def _add(self, job):
+        """Agrega una oferta (dict) y retorna su cluster_id. Se llama con el lock tomado y dentro de una transacción."""
+        job_id = str(job.get('job_id'))
+        row = self._conn.execute("SELECT cluster_id FROM offers WHERE job_id = ?", (job_id,)).fetchone()
+        if row:
+            return row[0]
+        sig = self.hasher.signature(offer_shingles(job.get('title'), job.get('company'), job.get('salary')))
+        keys = self._bucket_keys(sig)
+        platform = str(job.get('platform') or '')
+        cluster_id = self._best_match(sig, keys)
+        if cluster_id is None:
+            # Cluster nuevo: su firma representativa es la de esta oferta y solo ella entra a los buckets
+            cluster_id = self.own_cluster(job)
+            cur = self._conn.execute("INSERT INTO clusters (cluster_id, sig) VALUES (?, ?)", (cluster_id, sig.tobytes()))
+            self._conn.executemany("INSERT OR IGNORE INTO buckets VALUES (?, ?)", [(k, cur.lastrowid) for k in keys])
+        self._conn.execute("INSERT INTO offers VALUES (?, ?, ?)", (job_id, platform, cluster_id))
+        return cluster_id
+
+    def assign(self, jobs):
+        """Pone `cluster_id` a cada oferta (dicts) contra todo el histórico y contra las del mismo lote.
+        Retorna cuántas cayeron en un cluster que ya existía (casi-duplicadas)."""
+        matched = 0
+        with self._lock, self._conn:
+            for job in jobs:
+                if job.get('job_id') in (None, '', 'None'):
+                    continue
+                job['cluster_id'] = self._add(job)
+                matched += job['cluster_id'] != self.own_cluster(job)
+        return matched
+
+    def bootstrap(self, df, batch_size=20000):
+        """Llena el índice desde el histórico (solo la primera vez; después se actualiza con cada guardado)."""
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        logger.info(f"🧬 Construyendo el índice de casi-duplicados con {len(records)} ofertas del histórico...")
+        matched = 0
+        for start in range(0, len(records), batch_size):
+            matched += self.assign(records[start:start + batch_size])
+        logger.info(f"🧬 Índice listo: {len(records)} ofertas, {matched} casi-duplicadas dentro del histórico.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
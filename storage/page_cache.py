@@ -0,0 +1,128 @@
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """Caché en disco de páginas de resultados, direccionada por contenido.
+    - blobs/<xx>/<sha256>.html.gz: el HTML comprimido (páginas idénticas se guardan una sola vez)
+    - index.sqlite: (plataforma, keyword, página) -> url, sha256, fecha y tamaño
+    Con TTL y un tope de tamaño total: al pasarse se borran primero las entradas más viejas."""
+
+    def __init__(self, cache_dir, ttl_hours=168, max_mb=500):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                platform TEXT NOT NULL, keyword TEXT NOT NULL, page INTEGER NOT NULL,
+                url TEXT, digest TEXT NOT NULL, fetched_at REAL NOT NULL, size INTEGER NOT NULL,
+                PRIMARY KEY (platform, keyword, page)
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched ON pages (fetched_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config):
+        cache_cfg = config['general'].get('page_cache', {})
+        if not cache_cfg.get('enabled', False):
+            return None
+        return cls(cache_cfg.get('dir', 'cache/pages'), cache_cfg.get('ttl_hours', 168), cache_cfg.get('max_mb', 500))
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.html.gz")
+
+    def _write_blob(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+            f.write(data)
+        return tmp_path
+
+    def put(self, platform, keyword, page, url, html):
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        # Se comprime fuera del lock; el blob se publica y se registra bajo el lock, igual que evict borra:
+        # así evict nunca borra un blob que una sesión está por registrar
+        tmp_path = self._write_blob(path, data) if not os.path.exists(path) else None
+        with self._lock:
+            if tmp_path is not None:
+                os.replace(tmp_path, path)
+            elif not os.path.exists(path):
+                os.replace(self._write_blob(path, data), path)   # Lo borró un evict entre la revisión y el lock
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (platform, keyword, page, url, digest, time.time(), os.path.getsize(path))
+            )
+            self._conn.commit()
+
+    def get(self, digest):
+        with gzip.open(self._blob_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def pages(self, platform, keyword):
+        """[(página, url, sha256)] vigentes (dentro del TTL), en orden de página."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT page, url, digest FROM pages WHERE platform = ? AND keyword = ? AND fetched_at >= ? ORDER BY page",
+                (platform, keyword, time.time() - self.ttl_seconds)
+            ).fetchall()
+
+    def keywords(self, platform):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT keyword FROM pages WHERE platform = ? AND fetched_at >= ? ORDER BY keyword",
+                (platform, time.time() - self.ttl_seconds)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def evict(self):
+        """Quita entradas vencidas y, si el caché excede `max_mb`, las más viejas. Luego borra blobs huérfanos."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            rows = self._conn.execute(
+                "SELECT digest, MAX(size), MAX(fetched_at) AS last FROM pages GROUP BY digest ORDER BY last DESC"
+            ).fetchall()
+            keep, total = set(), 0
+            for digest, size, _ in rows:
+                if total + size > self.max_bytes:
+                    break
+                keep.add(digest)
+                total += size
+            dropped = [r[0] for r in rows if r[0] not in keep]
+            self._conn.executemany("DELETE FROM pages WHERE digest = ?", [(d,) for d in dropped])
+            self._conn.commit()
+
+            # Bajo el mismo lock que put(): un blob recién publicado ya tiene su fila en `pages`.
+            # Los .tmp son escrituras en curso de otras sesiones (solo se limpian los abandonados)
+            removed = 0
+            stale_tmp = time.time() - 3600
+            for root, _, files in os.walk(self.blob_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        if name.endswith('.tmp'):
+                            if os.path.getmtime(path) < stale_tmp:
+                                os.remove(path)
+                        elif name.split('.', 1)[0] not in keep:
+                            os.remove(path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+        if removed:
+            logger.info(f"Caché de páginas: {removed} blob(s) eliminados ({total / 1024 / 1024:.1f} MB en uso).")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
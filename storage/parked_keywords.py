@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ParkedKeywords:
+    """Keywords que quedaron pendientes porque el circuit breaker de su plataforma se abrió.
+    Se guardan entre corridas y la siguiente corrida las toma antes que las demás."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._parked = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._parked = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Archivo de keywords estacionadas ilegible ({path}): {e}. Se ignora.")
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['general'].get('circuit_breaker', {}).get('parked_file', 'parked_keywords.json'))
+
+    def pending(self):
+        """{(plataforma, keyword)} estacionadas en corridas anteriores."""
+        with self._lock:
+            return {(platform, kw) for platform, kws in self._parked.items() for kw in kws}
+
+    def park(self, platform, keyword, reason):
+        with self._lock:
+            entry = self._parked.setdefault(platform, {}).get(keyword, {'attempts': 0})
+            entry['attempts'] += 1
+            entry['reason'] = reason
+            entry['parked_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self._parked[platform][keyword] = entry
+
+    def done(self, platform, keyword):
+        with self._lock:
+            if self._parked.get(platform, {}).pop(keyword, None) is not None and not self._parked[platform]:
+                del self._parked[platform]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(kws) for kws in self._parked.values())
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._parked, ensure_ascii=False, indent=2)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,128 @@
+import os
+import uuid
+import logging
+from datetime import datetime
+
+import pandas as pd
+
+from .base import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+
+def _pyarrow():
+    """pyarrow es opcional: solo se importa si el backend parquet está en uso."""
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("El backend 'parquet' necesita pyarrow: pip install pyarrow") from None
+    return pa, ds, pq
+
+
+class ParquetStorage(BaseStorage):
+    """Dataset Parquet particionado estilo Hive: <dir>/platform=<Plataforma>/date=<YYYY-MM-DD>/part-*.parquet
+    Las consultas por plataforma/fecha solo abren las particiones que tocan (pruning + pushdown de filtros)
+    y solo leen las columnas pedidas."""
+    name = 'parquet'
+
+    def __init__(self, directory, columns):
+        super().__init__(columns)
+        self.directory = directory
+        self.pa, self.ds, self.pq = _pyarrow()
+        self.partitioning = self.ds.partitioning(
+            self.pa.schema([('platform', self.pa.string()), ('date', self.pa.string())]), flavor='hive'
+        )
+        # Esquema fijo (todo texto): los archivos escritos antes de agregar una columna la leen como nula
+        self.schema = self.pa.schema(
+            [(c, self.pa.string()) for c in columns if c != 'platform'] + [('platform', self.pa.string()), ('date', self.pa.string())]
+        )
+        self.existing_ids = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _dataset(self):
+        return self.ds.dataset(self.directory, schema=self.schema, format='parquet', partitioning=self.partitioning)
+
+    def _has_data(self):
+        for _, _, files in os.walk(self.directory):
+            if any(f.endswith('.parquet') for f in files):
+                return True
+        return False
+
+    def get_existing_ids(self):
+        # Solo se lee la columna job_id de todos los archivos
+        ids = set()
+        if self._has_data():
+            ids = set(self._dataset().to_table(columns=['job_id']).column('job_id').to_pylist())
+        self.existing_ids = ids
+        logger.info(f"Se cargaron {len(ids)} IDs existentes (Parquet '{self.directory}').")
+        return ids
+
+    def save_jobs(self, new_jobs_dicts: list):
+        if self.existing_ids is None:
+            self.get_existing_ids()
+        df = pd.DataFrame(new_jobs_dicts)
+        if df.empty:
+            return
+        df['job_id'] = df['job_id'].astype(str)
+        df = df[~df['job_id'].isin(['None', '', 'nan'])]
+        df = df[~df['job_id'].isin(self.existing_ids)].drop_duplicates(subset=['job_id'])
+        if df.empty:
+            logger.info("Todas las ofertas ya estaban en el dataset. Nada que agregar.")
+            return
+
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = None
+        df = df[self.columns].astype('string')
+        dates = df['timestamp_found'].str.slice(0, 10).fillna(datetime.now().strftime('%Y-%m-%d'))
+
+        for (platform, date), part in df.groupby([df['platform'], dates], dropna=False):
+            self._write_part(part.drop(columns=['platform']), str(platform), str(date))
+        self.existing_ids.update(df['job_id'])
+        logger.info(f"Se agregaron {len(df)} ofertas nuevas al dataset '{self.directory}'.")
+
+    def _write_part(self, part, platform, date):
+        """Cada guardado escribe un archivo nuevo por partición."""
+        part_dir = os.path.join(self.directory, f"platform={platform}", f"date={date}")
+        os.makedirs(part_dir, exist_ok=True)
+        table = self.pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+        self._write_table(part_dir, f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet", table)
+
+    def _write_table(self, part_dir, name, table):
+        # Escritura atómica; el temporal empieza con '.' para que el dataset lo ignore si queda huérfano
+        tmp_path = os.path.join(part_dir, f".{name}.tmp")
+        self.pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, os.path.join(part_dir, name))
+
+    def load_jobs(self, platform=None, since=None, columns=None):
+        if not self._has_data():
+            return pd.DataFrame(columns=columns or self.columns)
+        field = self.ds.field
+        expr = None
+        if platform:
+            expr = field('platform') == platform
+        if since:
+            since_expr = field('date') >= str(since)[:10]
+            expr = since_expr if expr is None else expr & since_expr
+        table = self._dataset().to_table(columns=columns or self.columns, filter=expr)
+        df = table.to_pandas()
+        if since and 'timestamp_found' in df.columns and len(str(since)) > 10:
+            df = df[df['timestamp_found'] >= str(since)]
+        return df
+
+    def compact(self):
+        """Junta los archivos pequeños de cada partición en uno solo."""
+        merged = 0
+        for root, _, files in os.walk(self.directory):
+            parts = sorted(f for f in files if f.endswith('.parquet'))
+            if len(parts) < 2:
+                continue
+            tables = [self.pq.read_table(os.path.join(root, f), partitioning=None) for f in parts]
+            table = self.pa.concat_tables(tables, promote_options='default')
+            self._write_table(root, f"compact-{uuid.uuid4().hex[:8]}.parquet", table)
+            for f in parts:
+                os.remove(os.path.join(root, f))
+            merged += len(parts)
+        logger.info(f"Dataset Parquet compactado: {merged} archivo(s) fusionados.")
@@ -0,0 +1,120 @@
+import sqlite3
+import logging
+import threading
+import pandas as pd
+
+from .base import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+_KEY = ('platform', 'job_id')
+
+
+def _q(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class _SQLiteIds:
+    """Vista de IDs sobre la tabla (consulta indexada por `in`), sin cargarlos a memoria."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __contains__(self, job_id):
+        return self.store._fetchone("SELECT 1 FROM jobs WHERE job_id = ? LIMIT 1", (str(job_id),)) is not None
+
+    def __len__(self):
+        return self.store._fetchone("SELECT COUNT(*) FROM jobs")[0]
+
+
+class SQLiteStorage(BaseStorage):
+    """Ofertas en una tabla SQLite con llave (platform, job_id) e índices por job_id y por (platform, fecha).
+    Los guardados son upserts por lotes dentro de una sola transacción."""
+    name = 'sqlite'
+
+    def __init__(self, path, columns, batch_size=1000):
+        super().__init__(columns)
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        cols = list(dict.fromkeys(list(_KEY) + list(self.columns)))
+        with self._lock, self._conn:
+            col_defs = ", ".join(f"{_q(c)} TEXT" + (" NOT NULL" if c in _KEY else "") for c in cols)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS jobs ({col_defs}, PRIMARY KEY (platform, job_id))")
+            # Columnas nuevas en final_columns_to_save se agregan sin reescribir la tabla
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for c in cols:
+                if c not in existing:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {_q(c)} TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON jobs (job_id)")
+            if 'timestamp_found' in cols:
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_platform_ts ON jobs (platform, timestamp_found)")
+        self._table_columns = cols
+
+    def _fetchone(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def get_existing_ids(self):
+        ids = _SQLiteIds(self)
+        logger.info(f"Se cargaron {len(ids)} IDs existentes (SQLite '{self.path}').")
+        return ids
+
+    def save_jobs(self, new_jobs_dicts: list):
+        cols = self._table_columns
+        rows = [
+            tuple(None if job.get(c) is None else str(job.get(c)) for c in cols)
+            for job in new_jobs_dicts if job.get('job_id') not in (None, '', 'None')
+        ]
+        if not rows:
+            logger.info("No hay ofertas válidas para guardar.")
+            return
+
+        # En un upsert se conserva la fecha en que la oferta se vio por primera vez
+        updates = ", ".join(f"{_q(c)} = excluded.{_q(c)}" for c in cols if c not in _KEY and c != 'timestamp_found')
+        sql = (f"INSERT INTO jobs ({', '.join(_q(c) for c in cols)}) "
+               f"VALUES ({', '.join('?' for _ in cols)}) ON CONFLICT (platform, job_id) DO "
+               + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            for start in range(0, len(rows), self.batch_size):
+                self._conn.executemany(sql, rows[start:start + self.batch_size])
+            changed = self._conn.total_changes - before
+        logger.info(f"Se guardaron {changed} ofertas en '{self.path}' (upsert por platform + job_id).")
+
+    def load_jobs(self, platform=None, since=None, columns=None):
+        cols = [c for c in (columns or self.columns) if c in self._table_columns]
+        where, params = [], []
+        if platform:
+            where.append("platform = ?")
+            params.append(platform)
+        if since:
+            where.append("timestamp_found >= ?")
+            params.append(str(since))
+        sql = f"SELECT {', '.join(_q(c) for c in cols)} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if 'timestamp_found' in self._table_columns:
+            sql += " ORDER BY timestamp_found"
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def compact(self):
+        with self._lock:
+            self._conn.execute("VACUUM")
+        logger.info(f"Base SQLite compactada ('{self.path}').")
+
+    def rebuild_index(self):
+        with self._lock:
+            self._conn.execute("REINDEX jobs")
+        logger.info(f"Índices de '{self.path}' reconstruidos.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+
+class _QueueIds:
+    """Vista de IDs ya conocidos por el cluster (histórico del coordinador + resultados de todos los nodos)."""
+
+    def __init__(self, task_queue):
+        self.task_queue = task_queue
+
+    def __contains__(self, job_id):
+        return self.task_queue._fetchone(
+            "SELECT 1 FROM known_ids WHERE job_id = ? UNION ALL SELECT 1 FROM results WHERE job_id = ? LIMIT 1",
+            (str(job_id), str(job_id))
+        ) is not None
+
+    def __len__(self):
+        return self.task_queue._fetchone("SELECT (SELECT COUNT(*) FROM known_ids) + (SELECT COUNT(*) FROM results)")[0]
+
+
+class TaskQueue:
+    """Cola de tareas compartida entre nodos: un archivo SQLite en almacenamiento compartido, sin broker.
+    - tasks: (plataforma, keyword, págs desde-hasta) por ronda; pending | leased | done | skipped | failed
+    - un nodo toma una tarea con un lease de `lease_seconds` y lo renueva mientras trabaja; si el nodo muere
+      el lease vence y otra sesión la retoma desde `next_page` (checkpoint de la última página terminada)
+    - results: ofertas por (plataforma, job_id) con INSERT OR IGNORE: reintentos y tareas repetidas no duplican
+    - known_ids: IDs del histórico del coordinador, para deduplicar en los nodos sin tocar su almacenamiento
+    Se usa journal_mode=DELETE (WAL necesita memoria compartida entre procesos del mismo host)."""
+
+    def __init__(self, path, lease_seconds=300, max_attempts=5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._create_schema()
+
+    @classmethod
+    def from_config(cls, config):
+        d_cfg = config['general'].get('distributed', {})
+        return cls(d_cfg.get('queue_file', 'shared/task_queue.sqlite'), d_cfg.get('lease_seconds', 300), d_cfg.get('max_attempts', 5))
+
+    @contextlib.contextmanager
+    def _tx(self):
+        """Transacción con lock de escritura desde el inicio (BEGIN IMMEDIATE): dos nodos no toman la misma tarea."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _fetchone(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _create_schema(self):
+        with self._tx() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY, round INTEGER NOT NULL, platform TEXT NOT NULL, keyword TEXT NOT NULL,
+                    start_page INTEGER NOT NULL, end_page INTEGER NOT NULL, next_page INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending', worker TEXT, lease_until REAL, not_before REAL DEFAULT 0,
+                    attempts INTEGER DEFAULT 0, new_jobs INTEGER DEFAULT 0, updated_at REAL,
+                    UNIQUE (round, platform, keyword, start_page)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (platform, status)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    platform TEXT NOT NULL, job_id TEXT NOT NULL, data TEXT NOT NULL, task_id INTEGER, worker TEXT,
+                    merged INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (platform, job_id)
+                ) WITHOUT ROWID""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_job_id ON results (job_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_merged ON results (merged)")
+            conn.execute("CREATE TABLE IF NOT EXISTS known_ids (job_id TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    # --- Coordinador ---
+
+    def enqueue(self, tasks):
+        """Abre una ronda nueva con [(plataforma, keyword, pág desde, pág hasta)]. Lo pendiente de rondas
+        anteriores se descarta (la ronda nueva lo cubre); lo que esté en curso termina normalmente."""
+        now = time.time()
+        with self._tx() as conn:
+            round_num = conn.execute("SELECT COALESCE(MAX(round), 0) + 1 FROM tasks").fetchone()[0]
+            conn.execute("UPDATE tasks SET status = 'skipped', updated_at = ? WHERE status = 'pending'", (now,))
+            conn.executemany(
+                "INSERT INTO tasks (round, platform, keyword, start_page, end_page, next_page, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(round_num, platform, kw, start, end, start, now) for platform, kw, start, end in tasks]
+            )
+        return round_num
+
+    def add_known_ids(self, job_ids, batch_size=50000):
+        job_ids = [(str(i),) for i in job_ids if i not in (None, '', 'None')]
+        for start in range(0, len(job_ids), batch_size):
+            with self._tx() as conn:
+                conn.executemany("INSERT OR IGNORE INTO known_ids VALUES (?)", job_ids[start:start + batch_size])
+
+    def unmerged(self, limit=5000):
+        """[(plataforma, job_id, oferta)] de los nodos que aún no pasan al almacenamiento del coordinador."""
+        with self._lock:
+            rows = self._conn.execute("SELECT platform, job_id, data FROM results WHERE merged = 0 LIMIT ?", (limit,)).fetchall()
+        return [(platform, job_id, json.loads(data)) for platform, job_id, data in rows]
+
+    def mark_merged(self, keys):
+        with self._tx() as conn:
+            conn.executemany("UPDATE results SET merged = 1 WHERE platform = ? AND job_id = ?", keys)
+            conn.executemany("INSERT OR IGNORE INTO known_ids VALUES (?)", [(job_id,) for _, job_id in keys])
+
+    def status(self):
+        """{estado: tareas} de la ronda actual (los leases vencidos salen como 'expired')."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_until < ? THEN 'expired' ELSE status END, COUNT(*) "
+                "FROM tasks WHERE round = (SELECT MAX(round) FROM tasks) GROUP BY 1", (time.time(),)
+            ).fetchall()
+        return dict(rows)
+
+    # --- Workers ---
+
+    def known_ids(self):
+        return _QueueIds(self)
+
+    def open_tasks(self, platform):
+        """Tareas de la plataforma que todavía pueden correr (pendientes, en espera o con lease de algún nodo)."""
+        return self._fetchone(
+            "SELECT COUNT(*) FROM tasks WHERE platform = ? AND status IN ('pending', 'leased') AND attempts < ?",
+            (platform, self.max_attempts)
+        )[0]
+
+    def lease(self, platform, worker):
+        """Toma la siguiente tarea disponible de la plataforma (pendiente o con lease vencido). None si no hay."""
+        now = time.time()
+        with self._tx() as conn:
+            # Las que agotaron sus intentos (siempre bloqueadas, nodo que muere con ellas...) ya no se reparten
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', updated_at = ? WHERE platform = ? AND attempts >= ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))",
+                (now, platform, self.max_attempts, now)
+            )
+            row = conn.execute(
+                "SELECT id, keyword, start_page, end_page, next_page FROM tasks WHERE platform = ? AND "
+                "((status = 'pending' AND not_before <= ?) OR (status = 'leased' AND lease_until < ?)) "
+                "ORDER BY round, id LIMIT 1", (platform, now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row[0])
+            )
+        task_id, keyword, start_page, end_page, next_page = row
+        return {'id': task_id, 'platform': platform, 'keyword': keyword, 'start_page': start_page,
+                'end_page': end_page, 'next_page': next_page}
+
+    def renew(self, task_ids, worker):
+        if not task_ids:
+            return
+        now = time.time()
+        with self._tx() as conn:
+            conn.executemany(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                [(now + self.lease_seconds, task_id, worker) for task_id in task_ids]
+            )
+
+    def record_page(self, task_id, worker, platform, page_num, jobs):
+        """Ofertas nuevas de una página + checkpoint de la tarea, en la misma transacción.
+        El checkpoint y el lease solo se mueven si la tarea sigue siendo de `worker`: si su lease venció y
+        otro nodo la tomó, las ofertas se guardan igual (INSERT OR IGNORE) pero no se pisa al nodo nuevo.
+        Retorna False en ese caso."""
+        now = time.time()
+        rows = [
+            (platform, str(job['job_id']), json.dumps(job, ensure_ascii=False), task_id, worker)
+            for job in jobs if job.get('job_id') not in (None, '', 'None')
+        ]
+        with self._tx() as conn:
+            inserted = conn.executemany("INSERT OR IGNORE INTO results (platform, job_id, data, task_id, worker) VALUES (?, ?, ?, ?, ?)", rows).rowcount
+            owned = conn.execute(
+                "UPDATE tasks SET next_page = MAX(next_page, ?), new_jobs = new_jobs + ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (page_num + 1, max(inserted, 0), now + self.lease_seconds, now, task_id, worker)
+            ).rowcount
+        return owned > 0
+
+    def release(self, task_id, worker, next_page=None, delay=0):
+        """Devuelve la tarea a pendiente (bloqueo, circuito abierto o el nodo se apaga); se retoma desde `next_page`."""
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, lease_until = NULL, not_before = ?, "
+                "next_page = COALESCE(?, next_page), updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (now + delay, next_page, now, task_id, worker)
+            )
+
+    def complete(self, task_id, worker, ended_early=False):
+        """Marca la tarea terminada. Si la keyword se acabó antes del final del rango (sin resultados, fin de
+        paginación o corte incremental), los rangos siguientes de la misma keyword ya no hacen falta."""
+        now = time.time()
+        with self._tx() as conn:
+            owned = conn.execute("UPDATE tasks SET status = 'done', lease_until = NULL, updated_at = ? WHERE id = ? AND worker = ?",
+                                 (now, task_id, worker)).rowcount
+            if ended_early and owned:
+                conn.execute(
+                    "UPDATE tasks SET status = 'skipped', updated_at = ? WHERE status = 'pending' AND (round, platform, keyword) = "
+                    "(SELECT round, platform, keyword FROM tasks WHERE id = ?) AND start_page > (SELECT start_page FROM tasks WHERE id = ?)",
+                    (now, task_id, task_id)
+                )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,94 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class YieldStats:
+    """Rendimiento histórico por (plataforma, keyword) para el modo --daemon:
+    - interval: cada cuánto se revisa (se acorta si salen ofertas nuevas, se alarga si no)
+    - depth: cuántas páginas vale la pena cargar en la siguiente pasada
+    - next_due: cuándo toca la siguiente pasada (epoch)
+    - ewma: ofertas nuevas por pasada (promedio exponencial), para priorizar las keywords "calientes"."""
+
+    def __init__(self, path, min_interval=1800, max_interval=172800, initial_interval=3600,
+                 min_pages=1, alpha=0.3):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.min_pages = min_pages
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._stats = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Estadísticas de rendimiento ilegibles ({path}): {e}. Se empieza de cero.")
+
+    @classmethod
+    def from_config(cls, config):
+        d_cfg = config['general'].get('daemon', {})
+        return cls(
+            d_cfg.get('state_file', 'yield_stats.json'),
+            min_interval=d_cfg.get('min_interval_minutes', 30) * 60,
+            max_interval=d_cfg.get('max_interval_hours', 48) * 3600,
+            initial_interval=d_cfg.get('initial_interval_minutes', 60) * 60,
+            min_pages=d_cfg.get('min_pages', 1),
+            alpha=d_cfg.get('ewma_alpha', 0.3),
+        )
+
+    @staticmethod
+    def _key(platform, keyword):
+        return f"{platform}|{keyword}"
+
+    def get(self, platform, keyword, max_pages):
+        """Estadísticas del par; uno nuevo empieza a la profundidad completa y vence de inmediato."""
+        with self._lock:
+            entry = self._stats.setdefault(self._key(platform, keyword), {
+                'interval': self.initial_interval, 'depth': max_pages, 'next_due': 0.0,
+                'ewma': 0.0, 'crawls': 0, 'total_new': 0, 'last_new_at': None,
+            })
+            entry['depth'] = min(max(entry['depth'], self.min_pages), max_pages)
+            return dict(entry)
+
+    def record(self, platform, keyword, new_jobs, pages, deepest_new_page, max_pages):
+        """Ajusta intervalo y profundidad con el resultado de una pasada (AIMD, como el limitador de ritmo)."""
+        now = time.time()
+        with self._lock:
+            entry = self._stats[self._key(platform, keyword)]
+            entry['ewma'] = self.alpha * new_jobs + (1 - self.alpha) * entry['ewma']
+            entry['crawls'] += 1
+            entry['total_new'] += new_jobs
+            if new_jobs:
+                entry['last_new_at'] = now
+                entry['interval'] = max(self.min_interval, entry['interval'] / 2)
+                # Si hubo nuevas hasta la última página cargada, hay que ir más hondo; si no, basta un poco más allá
+                if deepest_new_page >= pages:
+                    entry['depth'] = min(max_pages, max(entry['depth'] * 2, self.min_pages))
+                else:
+                    entry['depth'] = min(max_pages, max(deepest_new_page + 1, self.min_pages))
+            else:
+                entry['interval'] = min(self.max_interval, entry['interval'] * 2)
+                entry['depth'] = max(self.min_pages, entry['depth'] - 1)
+            entry['next_due'] = now + entry['interval']
+            return dict(entry)
+
+    def postpone(self, platform, keyword, seconds):
+        with self._lock:
+            self._stats[self._key(platform, keyword)]['next_due'] = time.time() + seconds
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._stats, ensure_ascii=False)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,146 @@
+"""Motor HTTP (fetch_mode: http | auto) contra un servidor HTTP local que sirve benchmarks/fixtures.
+
+    python -m pytest -q tests
+"""
+import os
+import copy
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from benchmarks.fake_driver import FakeDriver
+from benchmarks.pages import build_page
+from core.config_loader import load_config
+from scrapers.generic import GenericScraper
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLATFORM = 'occ'
+CARDS = 5
+COMPANY_TAG = '<div class="flex flex-row justify-between items-center"><span>'
+
+
+class FixtureSite:
+    """Lo que sirve el servidor: `pages` páginas de la fixture de OCC (la última con el marcador de fin
+    si `last_marker`), después páginas sin tarjetas; con `blocked` todo responde 403."""
+
+    def __init__(self, pages=3, last_marker=True, blocked=False):
+        self.pages = pages
+        self.last_marker = last_marker
+        self.blocked = blocked
+        self.content_type = 'text/html; charset=utf-8'
+        self.company_prefix = ''
+        self.requests = []
+
+    def respond(self, page_num):
+        self.requests.append(page_num)
+        if self.blocked:
+            return 403, "<html><title>Just a moment...</title></html>"
+        if page_num > self.pages:
+            return 200, "<html><body><main></main></body></html>"
+        html = build_page(PLATFORM, page_num, CARDS, last=self.last_marker and page_num == self.pages)
+        return 200, html.replace(COMPANY_TAG, COMPANY_TAG + self.company_prefix)
+
+
+@pytest.fixture
+def server():
+    site = FixtureSite()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page_num = int(parse_qs(urlparse(self.path).query).get('page', ['1'])[-1])
+            status, body = site.respond(page_num)
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', site.content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield site, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def local_config(port, fetch_mode):
+    config = copy.deepcopy(load_config(os.path.join(REPO_DIR, 'config.yaml')))
+    config['general']['debug_mode'] = False
+    config['general']['http'] = {'retries': 0, 'timeout': 5}
+    p_cfg = config['platforms'][PLATFORM]
+    p_cfg.update(
+        base_url=f"http://127.0.0.1:{port}/empleos/de-{{keyword}}?tm=7", fetch_mode=fetch_mode, max_pages=10,
+        pagination={'param': 'page', 'start': 1, 'increment': 1},
+        rate_limit={'pages_per_minute': 1e9, 'burst': 1e9, 'jitter': 0},
+    )
+    rules = p_cfg.setdefault('selenium_rules', {})
+    rules.update(extraction='html', poll_interval=0)
+    return config
+
+
+def no_browser():
+    raise AssertionError("No se debió levantar el navegador")
+
+
+def test_http_mode_paginates_until_end_marker(server):
+    site, port = server
+    scraper = GenericScraper(local_config(port, 'http'), PLATFORM, driver_factory=no_browser)
+    pages = []
+    jobs, _ = scraper.scrape_keyword('devops', set(), on_page=lambda kw, page_num, new: pages.append(page_num))
+    scraper.close()
+
+    assert pages == [1, 2, 3]
+    assert site.requests == [1, 2, 3]
+    assert jobs and all(job.platform == 'Occ' for job in jobs)
+    assert len({job.job_id for job in jobs}) == len(jobs)
+
+
+def test_auto_mode_stays_on_http_for_an_empty_last_page(server):
+    site, port = server
+    site.last_marker = False   # Sin marcador: la pág 4 llega vacía
+    scraper = GenericScraper(local_config(port, 'auto'), PLATFORM, driver_factory=no_browser)
+    jobs, _ = scraper.scrape_keyword('devops', set())
+    # Una segunda keyword tampoco cambia a navegador
+    scraper.scrape_keyword('sre', set())
+    scraper.close()
+
+    assert jobs
+    assert site.requests == [1, 2, 3, 4, 1, 2, 3, 4]
+    assert not scraper.browser_fallback
+
+
+def test_auto_mode_falls_back_to_browser_on_challenge(server):
+    site, port = server
+    site.blocked = True
+    config = local_config(port, 'auto')
+    drivers = []
+
+    def driver_factory():
+        drivers.append(FakeDriver(PLATFORM, config['platforms'][PLATFORM], pages=2, cards=CARDS))
+        return drivers[-1]
+
+    scraper = GenericScraper(config, PLATFORM, driver_factory=driver_factory)
+    jobs, _ = scraper.scrape_keyword('devops', set())
+    scraper.close()
+
+    assert scraper.browser_fallback
+    assert site.requests == [1]          # Tras el challenge ya no se insiste por HTTP
+    assert len(drivers) == 1 and drivers[0].gets >= 2
+    assert jobs
+
+
+def test_http_mode_decodes_utf8_without_charset_header(server):
+    site, port = server
+    site.content_type = 'text/html'   # Sin charset: requests asumiría ISO-8859-1
+    site.company_prefix = 'Compañía '
+    scraper = GenericScraper(local_config(port, 'http'), PLATFORM, driver_factory=no_browser)
+    jobs, _ = scraper.scrape_keyword('devops', set())
+    scraper.close()
+
+    assert jobs and all(job.company.startswith('Compañía') for job in jobs)
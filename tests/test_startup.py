@@ -0,0 +1,19 @@
+"""`import main` debe quedarse ligero: cada comando importa lo suyo (ver main.py).
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'selenium', 'docker', 'lxml', 'requests', 'pyarrow', 'bs4')
+
+
+def test_import_main_does_not_load_heavy_modules():
+    # En un proceso nuevo: en este ya están cargados por las otras pruebas
+    loaded = subprocess.check_output(
+        [sys.executable, "-c", f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        cwd=REPO_DIR, text=True
+    ).strip()
+    assert not loaded, f"`import main` carga módulos pesados: {loaded}"
@@ -0,0 +1,47 @@
+"""Cola compartida del modo worker: una sesión que se cae devuelve su tarea.
+
+    python -m pytest -q tests
+"""
+import os
+import copy
+
+from core.config_loader import load_config
+from core.pipeline import QueueResultSink
+from core.runner import scraper_worker
+from core.scheduler import QueueScheduler
+from core.seen_ids import SeenIds
+from scrapers.generic import GenericScraper
+from storage.journal import JournalState
+from storage.parked_keywords import ParkedKeywords
+from storage.task_queue import TaskQueue
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLATFORM = 'occ'
+
+
+def test_crashed_session_releases_its_task(tmp_path, monkeypatch):
+    config = copy.deepcopy(load_config(os.path.join(REPO_DIR, 'config.yaml')))
+    config['platforms'][PLATFORM]['fetch_mode'] = 'http'
+    task_queue = TaskQueue(str(tmp_path / 'queue.sqlite'))
+    task_queue.enqueue([(PLATFORM, 'devops', 1, 10)])
+    scheduler = QueueScheduler(config, [PLATFORM], task_queue, 'nodo-a')
+
+    def crash(self, keyword, seen_ids, start_page=None, on_page=None, **kwargs):
+        on_page(keyword, start_page, [])
+        on_page(keyword, start_page + 1, [])
+        raise RuntimeError("se cayó el parser")
+    monkeypatch.setattr(GenericScraper, 'scrape_keyword', crash)
+
+    try:
+        scraper_worker(
+            PLATFORM, 1, config, scheduler, SeenIds(set()), QueueResultSink(scheduler), JournalState(),
+            None, None, None, None, ParkedKeywords(str(tmp_path / 'parked.json'))
+        )
+        status, worker, next_page = task_queue._fetchone("SELECT status, worker, next_page FROM tasks")
+        assert (status, worker, next_page) == ('pending', None, 3)
+        assert not scheduler._active          # El heartbeat ya no renueva su lease
+        # Otro nodo la toma de inmediato, desde el checkpoint
+        assert task_queue.lease(PLATFORM, 'nodo-b')['next_page'] == 3
+    finally:
+        scheduler.stop()
+        task_queue.close()
@@ -1,19 +1,29 @@
+import os
 import time
 import socket
 import docker
 import logging
 import requests
 import atexit
+import threading
+import concurrent.futures
 
 logger = logging.getLogger(__name__)
 
 _active_managers = []
 
+# Etiquetas con las que el pool reconoce SUS contenedores (para reusarlos entre corridas)
+POOL_LABEL = "jobs_scrapping.pool"
+SLOT_LABEL = "jobs_scrapping.slot"
+SESSIONS_LABEL = "jobs_scrapping.sessions"
+OWNER_LABEL = "jobs_scrapping.owner_pid"   # Contenedores de una sola corrida: nadie más los adopta ni los toca
+
 def _cleanup_all_containers():
     if _active_managers:
         logger.info(f"🧹 Limpieza de emergencia: Pulverizando {len(_active_managers)} contenedor(es) de Selenium...")
         for manager in list(_active_managers):
-            manager.stop()
+            # Un contenedor caliente que estaba en uso puede quedar con una sesión colgada: ese sí se mata
+            manager.stop(force=manager.in_use)
 
 atexit.register(_cleanup_all_containers)
 
@@ -23,16 +33,58 @@ def get_free_port():
         return s.getsockname()[1]
 
 class SeleniumContainerManager:
-    def __init__(self, scraper_name, image_name="selenium/standalone-chrome:latest"):
+    def __init__(self, scraper_name, image_name="selenium/standalone-chrome:latest", client=None,
+                 pool_name=None, slot=None, keep_warm=False, ready_timeout=30, max_sessions=1, shm_mb_per_session=1024):
+        """Con `pool_name`/`slot` el contenedor lleva etiquetas del pool. Con `keep_warm` el nombre es fijo por slot,
+        no se destruye al terminar y la siguiente corrida lo adopta si sigue sano; sin `keep_warm` el nombre y
+        las etiquetas llevan el pid, así dos corridas (o dos workers) en el mismo host no se pisan.
+        `max_sessions` navegadores pueden correr a la vez dentro del contenedor (SE_NODE_MAX_SESSIONS);
+        cada sesión de WebDriver es un Chrome aparte con su propio perfil temporal (cookies y CDP aislados)."""
         self.scraper_name = scraper_name
         self.image_name = image_name
-        self.client = docker.from_env()
+        self.client = client or docker.from_env()
         self.container = None
-        self.port = get_free_port()
+        self.pool_name = pool_name
+        self.slot = slot
+        self.keep_warm = keep_warm
+        self.ready_timeout = ready_timeout
+        self.max_sessions = max(int(max_sessions), 1)
+        self.shm_mb_per_session = shm_mb_per_session
+        self.leases = 0             # Sesiones prestadas ahora mismo (las lleva el ContainerPool)
+        self.ready = None           # Future del arranque cuando lo maneja el pool
+        self.ready_seconds = None   # Cuánto tardó Selenium en reportar "ready" (para las métricas)
+        self.port = None
         _active_managers.append(self)
 
+    @property
+    def in_use(self):
+        return self.leases > 0
+
+    @property
+    def executor_url(self):
+        return f"http://host.docker.internal:{self.port}/wd/hub"
+
+    def _labels(self):
+        if self.pool_name is None:
+            return {}
+        labels = {POOL_LABEL: self.pool_name, SESSIONS_LABEL: str(self.max_sessions)}
+        if self.keep_warm:
+            labels[SLOT_LABEL] = str(self.slot)
+        else:
+            labels[OWNER_LABEL] = str(os.getpid())
+        return labels
+
     def start(self):
-        container_name = f"selenium-{self.scraper_name}-{self.port}"
+        if self.pool_name is not None and self.keep_warm and self._adopt():
+            return self.executor_url
+
+        self.port = get_free_port()
+        if self.pool_name is not None and self.keep_warm:
+            container_name = f"selenium-{self.pool_name}-{self.slot}"
+        elif self.pool_name is not None:
+            container_name = f"selenium-{self.pool_name}-{self.slot}-{os.getpid()}"
+        else:
+            container_name = f"selenium-{self.scraper_name}-{self.port}"
         logger.info(f"Iniciando contenedor '{container_name}' en puerto {self.port}...")
         try:
             self.container = self.client.containers.run(
@@ -40,39 +92,213 @@ class SeleniumContainerManager:
                 name=container_name,  # Bautizamos el contenedor
                 detach=True,
                 ports={'4444/tcp': self.port},
+                labels=self._labels(),
+                environment={
+                    'SE_NODE_MAX_SESSIONS': str(self.max_sessions),
+                    'SE_NODE_OVERRIDE_MAX_SESSIONS': 'true',
+                },
                 remove=True,
-                shm_size="2g" 
+                # /dev/shm compartido por todos los Chrome del contenedor (mínimo 2 GB como antes)
+                shm_size=f"{max(2048, self.shm_mb_per_session * self.max_sessions)}m"
             )
-            self._wait_for_ready()
-            return f"http://host.docker.internal:{self.port}/wd/hub"
-            
+            self._wait_for_ready(self.ready_timeout)
+            return self.executor_url
+
         except Exception as e:
             logger.error(f"Error al iniciar el contenedor Docker: {e}")
-            self.stop()
+            self.stop(force=True)
             raise
 
-    def _wait_for_ready(self, timeout=30):
-        url = f"http://host.docker.internal:{self.port}/wd/hub/status"
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+    def _adopt(self):
+        """Con keep_warm: reusa el contenedor de este slot si quedó vivo de una corrida anterior (se busca por etiqueta, no por puerto)."""
+        filters = {'label': [f"{POOL_LABEL}={self.pool_name}", f"{SLOT_LABEL}={self.slot}"]}
+        wanted = self._labels()
+        for container in self.client.containers.list(all=True, filters=filters):
             try:
-                response = requests.get(url, timeout=2)
-                if response.status_code == 200 and response.json().get('value', {}).get('ready'):
-                    logger.info(f"Contenedor '{self.scraper_name}' en puerto {self.port} listo.")
-                    return
-            except requests.exceptions.RequestException:
-                pass
-            time.sleep(1)
+                bindings = container.attrs['NetworkSettings']['Ports'].get('4444/tcp') or []
+                self.port = int(bindings[0]['HostPort']) if bindings and container.status == 'running' else None
+                # Un contenedor creado con otro número de sesiones no sirve: se reemplaza
+                same_setup = container.labels.get(SESSIONS_LABEL) == wanted[SESSIONS_LABEL]
+                if self.port and same_setup and self._is_ready(timeout=1):
+                    self.container = container
+                    self.ready_seconds = 0.0
+                    logger.info(f"♨️ Reusando contenedor caliente '{container.name}' (puerto {self.port}).")
+                    return True
+                logger.info(f"Contenedor '{container.name}' no está sano. Se reemplaza...")
+                container.remove(force=True)
+            except Exception as e:
+                logger.warning(f"No se pudo revisar el contenedor '{container.name}': {e}")
+        self.port = None
+        return False
+
+    def _is_ready(self, timeout=2):
+        try:
+            response = requests.get(f"http://host.docker.internal:{self.port}/wd/hub/status", timeout=timeout)
+            return response.status_code == 200 and response.json().get('value', {}).get('ready')
+        except (requests.exceptions.RequestException, ValueError):
+            return False
+
+    def _wait_for_ready(self, timeout=30):
+        """Polling rápido al principio (Selenium suele tardar 1-3 s) con backoff hasta 1 s entre intentos."""
+        start_time = time.monotonic()
+        delay = 0.1
+        while time.monotonic() - start_time < timeout:
+            if self._is_ready(timeout=min(2, delay * 4)):
+                self.ready_seconds = time.monotonic() - start_time
+                logger.info(f"Contenedor '{self.scraper_name}' en puerto {self.port} listo ({self.ready_seconds:.1f}s).")
+                return
+            time.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
         raise Exception("Timeout esperando a que el contenedor de Selenium estuviera listo.")
 
-    def stop(self):
-        if self.container:
+    def stop(self, force=False):
+        if self.container and self.keep_warm and not force:
+            # Se deja vivo para la siguiente corrida
+            logger.info(f"♨️ Contenedor '{self.container.name}' queda caliente para la próxima corrida.")
+            self.container = None
+        elif self.container:
             try:
                 self.container.stop(timeout=2)
             except Exception:
                 pass
             finally:
                 self.container = None
-                
+
         if self in _active_managers:
-            _active_managers.remove(self)
\ No newline at end of file
+            _active_managers.remove(self)
+
+
+class ContainerPool:
+    """Pool de contenedores de Selenium:
+    - descarga la imagen una sola vez antes de arrancar nada
+    - arranca en paralelo los contenedores que se sabe que se van a necesitar (prewarm)
+    - cada contenedor aloja hasta `sessions_per_container` sesiones de WebDriver, que se prestan a los workers bajo demanda
+    - con `keep_warm`, los contenedores sobreviven entre corridas y se reconocen por etiqueta"""
+
+    def __init__(self, image_name, pool_name="default", keep_warm=False, ready_timeout=60, pull=True,
+                 sessions_per_container=1, shm_mb_per_session=1024):
+        self.image_name = image_name
+        self.pool_name = pool_name
+        self.keep_warm = keep_warm
+        self.ready_timeout = ready_timeout
+        self.pull = pull
+        self.sessions_per_container = max(int(sessions_per_container), 1)
+        self.shm_mb_per_session = shm_mb_per_session
+        self.client = None
+        self._lock = threading.Lock()
+        self._prepared = False
+        self._next_slot = 0
+        self._managers = []   # Contenedores arrancando o listos que aún aceptan préstamos
+        self._starter = None
+
+    @classmethod
+    def from_config(cls, config):
+        pool_cfg = config['selenium'].get('pool', {})
+        return cls(
+            config['selenium']['image'], pool_name=pool_cfg.get('name', 'default'),
+            keep_warm=pool_cfg.get('keep_warm', False), ready_timeout=pool_cfg.get('ready_timeout', 60),
+            pull=pool_cfg.get('pull', True), sessions_per_container=pool_cfg.get('sessions_per_container', 1),
+            shm_mb_per_session=pool_cfg.get('shm_mb_per_session', 1024)
+        )
+
+    def containers_for(self, sessions):
+        """Contenedores necesarios para `sessions` navegadores simultáneos."""
+        return -(-sessions // self.sessions_per_container)
+
+    def _prepare(self):
+        with self._lock:
+            if self._prepared:
+                return
+            self.client = docker.from_env()
+            try:
+                self.client.images.get(self.image_name)
+            except docker.errors.ImageNotFound:
+                if not self.pull:
+                    raise
+                logger.info(f"⬇️ Descargando imagen '{self.image_name}' (solo la primera vez)...")
+                self.client.images.pull(self.image_name)
+            self._starter = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="selenium-start")
+            self._prepared = True
+
+    def _launch(self, owner):
+        """Crea un manager y lo arranca en segundo plano (se llama con el lock tomado)."""
+        slot = self._next_slot
+        self._next_slot += 1
+        manager = SeleniumContainerManager(
+            owner, self.image_name, client=self.client, pool_name=self.pool_name, slot=slot,
+            keep_warm=self.keep_warm, ready_timeout=self.ready_timeout,
+            max_sessions=self.sessions_per_container, shm_mb_per_session=self.shm_mb_per_session
+        )
+        manager.ready = self._starter.submit(manager.start)
+        self._managers.append(manager)
+        return manager
+
+    def prewarm(self, count):
+        """Arranca `count` contenedores en paralelo sin bloquear (los workers piden sesiones con acquire)."""
+        if count <= 0:
+            return
+        self._prepare()
+        with self._lock:
+            for _ in range(count):
+                self._launch("prewarm")
+        logger.info(f"🔥 Arrancando {count} contenedor(es) de Selenium en paralelo ({self.sessions_per_container} sesión(es) c/u)...")
+
+    def acquire(self, owner):
+        """Presta una sesión a `owner`: en un contenedor con lugar (prefiriendo los ya listos) o en uno nuevo.
+        Si el contenedor aún está arrancando, espera a que esté listo."""
+        self._prepare()
+        while True:
+            with self._lock:
+                free = [m for m in self._managers if m.leases < m.max_sessions]
+                free.sort(key=lambda m: not m.ready.done())
+                launched = not free
+                manager = self._launch(owner) if launched else free[0]
+                manager.leases += 1
+            try:
+                manager.ready.result()
+                return manager
+            except Exception as e:
+                with self._lock:
+                    manager.leases -= 1
+                    if manager in self._managers:
+                        self._managers.remove(manager)
+                # Si falla uno que arrancamos nosotros no tiene caso seguir intentando
+                if launched:
+                    raise
+                logger.warning(f"Un contenedor del pool falló al arrancar ({e}). Se intenta con otro...")
+
+    def release(self, manager, healthy=True):
+        """Devuelve la sesión. Si terminó mal el contenedor deja de prestarse y se destruye al quedar vacío."""
+        with self._lock:
+            manager.leases -= 1
+            if not healthy and manager in self._managers:
+                self._managers.remove(manager)
+            retired = manager not in self._managers and manager.leases == 0
+        if retired:
+            manager.stop(force=True)
+
+    def close(self):
+        """Al final de la corrida: los contenedores se apagan (o quedan calientes con keep_warm)."""
+        with self._lock:
+            managers, self._managers = self._managers, []
+        for manager in managers:
+            try:
+                manager.ready.result()
+            except Exception:
+                continue
+            manager.stop(force=manager.leases > 0)
+        if self._starter is not None:
+            self._starter.shutdown(wait=True)
+
+
+def stop_pool_containers(pool_name=None):
+    """Destruye los contenedores calientes del pool (o de todos los pools si no se indica)."""
+    client = docker.from_env()
+    label = f"{POOL_LABEL}={pool_name}" if pool_name else POOL_LABEL
+    containers = client.containers.list(all=True, filters={'label': label})
+    for container in containers:
+        try:
+            container.remove(force=True)
+        except Exception as e:
+            logger.warning(f"No se pudo eliminar '{container.name}': {e}")
+    logger.info(f"🧹 {len(containers)} contenedor(es) del pool eliminados.")
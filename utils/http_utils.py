@@ -0,0 +1,72 @@
+import os
+import json
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Respuestas que en la práctica significan "bloqueado / challenge", no "error de red"
+BLOCK_STATUS_CODES = (403, 429, 503)
+
+
+def read_cookie_file(platform_name):
+    """Lee cookies/<plataforma>.json (formato exportado del navegador). Retorna [] si no existe."""
+    cookie_path = f"cookies/{platform_name}.json"
+    if not os.path.exists(cookie_path):
+        return []
+    try:
+        with open(cookie_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error leyendo cookies para {platform_name}: {e}")
+        return []
+
+
+class HttpFetcher:
+    """Descarga páginas renderizadas en servidor con `requests`:
+    sesión keep-alive con pool de conexiones, cabeceras de `general.headers` y cookies de la plataforma."""
+
+    def __init__(self, config, platform_name):
+        http_cfg = config['general'].get('http', {})
+        p_cfg = config['platforms'][platform_name]
+        self.platform_name = platform_name
+        self.timeout = p_cfg.get('request_timeout', http_cfg.get('timeout', 20))
+
+        self.session = requests.Session()
+        retries = Retry(
+            total=http_cfg.get('retries', 2), backoff_factor=http_cfg.get('backoff_factor', 0.5),
+            status_forcelist=(500, 502, 504), allowed_methods=("GET",)
+        )
+        pool_size = http_cfg.get('pool_size', 4)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(config['general'].get('headers', {}))
+
+        count = 0
+        for cookie in read_cookie_file(platform_name):
+            if 'name' not in cookie or 'value' not in cookie: continue
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+            )
+            count += 1
+        if count:
+            logger.info(f"🍪 Se cargaron {count} cookies HTTP para {platform_name.upper()}.")
+
+    def get(self, url):
+        """Retorna (status_code, html, url_final). Errores de red -> (None, None, url)."""
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if 'charset' not in response.headers.get('Content-Type', '').lower():
+                # Sin charset, requests asume ISO-8859-1 para text/html y los acentos salen rotos: se detecta del contenido
+                response.encoding = response.apparent_encoding
+            return response.status_code, response.text, response.url
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"[{self.platform_name.upper()}] Error HTTP en {url}: {e}")
+            return None, None, url
+
+    def close(self):
+        self.session.close()
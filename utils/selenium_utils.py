@@ -1,17 +1,21 @@
-import os
 import json
-import time
+import fnmatch
 import logging
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 
+from utils.http_utils import read_cookie_file
+
 logger = logging.getLogger(__name__)
 
-def setup_driver(command_executor_url):
-    """Conecta al contenedor Docker a través de Remote WebDriver con camuflaje."""
+def setup_driver(command_executor_url, session_name=None, network_log=False):
+    """Conecta al contenedor Docker a través de Remote WebDriver con camuflaje.
+    Cada llamada abre un Chrome nuevo con perfil temporal propio: varias sesiones en el mismo
+    contenedor no comparten cookies, scripts de stealth ni URLs bloqueadas.
+    Con `network_log` se activa el log de rendimiento (eventos CDP Network) que lee `network_usage`."""
     chrome_options = ChromeOptions()
     chrome_options.page_load_strategy = 'eager'
     chrome_options.add_argument('--disable-gpu')
@@ -24,6 +28,12 @@ def setup_driver(command_executor_url):
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     chrome_options.add_argument("--start-maximized")
+    if session_name:
+        # Visible en la UI del grid (http://<host>:<puerto>/ui) para saber qué worker tiene cada sesión
+        chrome_options.set_capability('se:name', session_name)
+    if network_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
 
     
     try:
@@ -52,14 +62,11 @@ def apply_stealth(driver):
 
 def load_cookies(driver, platform_name):
     """CAPA 3: Inyecta las cookies de sesión guardadas en JSON."""
-    cookie_path = f"cookies/{platform_name}.json"
-    if not os.path.exists(cookie_path):
+    cookies = read_cookie_file(platform_name)
+    if not cookies:
         return False
         
     try:
-        with open(cookie_path, 'r', encoding='utf-8') as f:
-            cookies = json.load(f)
-            
         count = 0
         for cookie in cookies:
             # Eliminar campos que Selenium no acepta o causan conflicto
@@ -81,20 +88,100 @@ def load_cookies(driver, platform_name):
         logger.error(f"Error cargando cookies para {platform_name}: {e}")
         return False
 
-def block_heavy_content(driver):
+# Tipos de recurso que se pueden bloquear (general/platforms.*.resource_blocking.types)
+RESOURCE_TYPE_PATTERNS = {
+    'image': ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif"],
+    'font': ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    'media': ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.m3u8"],
+    'stylesheet': ["*.css"],
+}
+
+def resource_blocking(config, platform_name):
+    """Configuración de bloqueo de la plataforma: `general.resource_blocking` con lo de la plataforma encima."""
+    blocking = dict(config['general'].get('resource_blocking', {}))
+    blocking.update(config['platforms'][platform_name].get('resource_blocking', {}))
+    return blocking
+
+def blocked_url_patterns(blocking):
+    """Patrones comodín a bloquear: extensiones de los tipos elegidos + dominios de analítica/anuncios + extras."""
+    patterns = []
+    for resource_type in blocking.get('types', ['image']):
+        if resource_type not in RESOURCE_TYPE_PATTERNS:
+            logger.warning(f"Tipo de recurso desconocido en resource_blocking.types: '{resource_type}'")
+            continue
+        # Forma válida como comodín (urls) y como URLPattern (urlPatterns); también con query string (app.css?v=3)
+        for pattern in RESOURCE_TYPE_PATTERNS[resource_type]:
+            patterns += [f"*://*/{pattern}", f"*://*/{pattern}?*"]
+    patterns += [f"*://*{domain}/*" for domain in blocking.get('domains', [])]
+    patterns += blocking.get('extra_patterns', [])
+    return list(dict.fromkeys(patterns))
+
+def block_heavy_content(driver, blocking=None):
+    """Bloquea por CDP las peticiones que nunca se parsean. Lo de `allow` se deja pasar aunque coincida
+    con un patrón bloqueado (para no romper los selectores). Retorna True si el bloqueo quedó activo.
+    Es por patrón de URL (setBlockedURLs), no por tipo de recurso: lo servido sin extensión reconocible pasa.
+    Fetch.enable con resourceType pausa cada petición hasta responder a su evento, y el driver remoto no
+    entrega eventos CDP."""
+    blocking = blocking or {}
+    if not blocking.get('enabled', True):
+        return False
+    patterns = blocked_url_patterns(blocking)
+    allow = blocking.get('allow', [])
     try:
-        driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg"]})
         driver.execute_cdp_cmd('Network.enable', {})
+        if not allow:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": patterns})
+            return True
+        try:
+            # El primer patrón que coincide decide: las excepciones van primero
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {"urlPatterns": (
+                [{"urlPattern": p, "block": False} for p in allow] + [{"urlPattern": p, "block": True} for p in patterns]
+            )})
+        except Exception as e:
+            # Chrome viejo sin urlPatterns: se bloquea todo menos los patrones que chocan con la lista blanca
+            logger.warning(f"Chrome no soporta excepciones en setBlockedURLs ({e}). Se omiten los patrones que tapan la lista blanca.")
+            patterns = [p for p in patterns if not any(fnmatch.fnmatch(a, p) for a in allow)]
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": patterns})
+        return True
+    except Exception as e:
+        logger.warning(f"No se pudo activar el bloqueo de recursos: {e}")
+        return False
+
+def network_usage(driver):
+    """Consume el log de rendimiento (eventos CDP Network.*) acumulado desde la última llamada.
+    Retorna {'requests', 'bytes', 'blocked', 'blocked_types'} o None si el driver no tiene el log activo."""
+    try:
+        entries = driver.execute(Command.GET_LOG, {"type": "performance"})['value']
     except Exception:
-        pass
+        return None
+    usage = {'requests': 0, 'bytes': 0, 'blocked': 0, 'blocked_types': {}}
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        method, params = message.get('method'), message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            usage['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            usage['bytes'] += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            usage['blocked'] += 1
+            resource_type = params.get('type', 'Other')
+            usage['blocked_types'][resource_type] = usage['blocked_types'].get(resource_type, 0) + 1
+    return usage
 
 def close_cookie_popup(driver, wait_short):
+    """Cierra el banner de cookies. Sin `wait_short` solo revisa si ya está visible (no bloquea)."""
     if not driver: return
     xpath_accept = "//button[contains(@aria-label, 'Accept cookies') or contains(@aria-label,'Aceptar cookies') or contains(text(), 'Accept') or contains(text(), 'Aceptar') or contains(@id, 'onetrust-accept')]"
     try:
-        if not wait_short: wait_short = WebDriverWait(driver, 2)
-        cookie_button = wait_short.until(EC.element_to_be_clickable((By.XPATH, xpath_accept)))
+        if wait_short:
+            cookie_button = wait_short.until(EC.element_to_be_clickable((By.XPATH, xpath_accept)))
+        else:
+            buttons = [b for b in driver.find_elements(By.XPATH, xpath_accept) if b.is_displayed() and b.is_enabled()]
+            if not buttons: return
+            cookie_button = buttons[0]
         cookie_button.click()
-        time.sleep(1)
     except:
         pass
\ No newline at end of file